@@ -0,0 +1,177 @@
+"""
+Latencias (p50/p95/p99) de los endpoints de la API sobre los datos de
+DATABASE_URL o, con --seasons, sobre ligas sintéticas de distinto tamaño para
+ver cómo escala cada endpoint con el número de temporadas.
+
+Las peticiones se lanzan de una en una contra la app ASGI en proceso. Cada
+endpoint se mide en dos modos:
+    cold  cachés de respuestas y de resultados vacías antes de cada petición
+    warm  cachés llenas (lo que ve quien repite la página)
+Los almacenes en memoria (game log, leaderboards, métricas de jugadores, top
+performers) se cargan antes de medir, como tras el arranque de la API.
+
+Uso (desde backend/):
+    python -m benchmarks.api --requests 50 --out report.json                 # datos actuales
+    python -m benchmarks.api --seasons 1,5,10,20 --reset --out scaling.json  # vacía DATABASE_URL
+    python -m benchmarks.api --baseline report.json --threshold 10           # compara (ver benchmarks.compare)
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.harness import (
+    asgi_client, clear_caches, environment, latency_summary, league_pools, prepare_app, quiet_logging, write_report
+)
+from benchmarks.synthetic_league import LeagueConfig, load_league
+
+MODES = ("cold", "warm")
+
+def endpoint_templates() -> List[str]:
+    """Endpoints medidos; los avanzados se leen de los routers para no dejarse ninguno"""
+    from routers import players, teams
+
+    def advanced(router, placeholder: str) -> List[str]:
+        return [route.path.replace("{id}", placeholder) for route in router.routes if "/advanced/" in route.path]
+
+    return [
+        "/teams/", "/teams/{team_id}", *advanced(teams.router, "{team_id}"),
+        *advanced(players.router, "{player_id}"), "/search/suggestions?q={query}", "/home/top-performers",
+    ]
+
+async def load_samples(requests: int, seed: int) -> List[Dict[str, Any]]:
+    """Parámetros de cada petición: equipos en orden, jugadores con estadísticas y prefijos de nombres"""
+    pools = await league_pools()
+    rng = random.Random(seed)
+    players = rng.sample(pools.player_ids, min(requests, len(pools.player_ids)))
+    samples = []
+    for index in range(requests):
+        name = rng.choice(pools.names).lower()
+        samples.append({
+            "team_id": pools.team_ids[index % len(pools.team_ids)],
+            "player_id": players[index % len(players)],
+            "query": quote(name[:rng.randint(2, 4)]),
+        })
+    return samples
+
+async def measure_endpoint(
+    client: httpx.AsyncClient, template: str, samples: Sequence[Dict[str, Any]], mode: str
+) -> Dict[str, Any]:
+    paths = [template.format(**sample) for sample in samples]
+    if mode == "warm":
+        for path in paths:
+            await client.get(path)
+
+    latencies, errors = [], 0
+    for path in paths:
+        if mode == "cold":
+            await clear_caches()
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += response.status_code >= 400
+    # Las muestras en bruto permiten comparar informes (benchmarks.compare)
+    return {**latency_summary(latencies, errors), "samples_ms": [round(value, 3) for value in latencies]}
+
+async def run_endpoints(requests: int, seed: int, modes: Sequence[str] = MODES) -> Dict[str, Dict[str, Any]]:
+    """{endpoint: {modo: resumen de latencias}} sobre los datos actuales"""
+    samples = await load_samples(requests, seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with asgi_client() as client:
+        for template in endpoint_templates():
+            await client.get(template.format(**samples[0]))  # primera petición fuera de la medida
+            results[template] = {mode: await measure_endpoint(client, template, samples, mode) for mode in modes}
+    return results
+
+def print_run(title: str, endpoints: Dict[str, Dict[str, Any]]):
+    print(f"\n📊 {title}")
+    print(f"{'endpoint':<58} {'modo':<5} {'p50':>9} {'p95':>9} {'p99':>9} {'errores':>8}")
+    for template, modes in endpoints.items():
+        for mode, summary in modes.items():
+            print(
+                f"{template:<58} {mode:<5} {summary['p50_ms']:>7.1f}ms {summary['p95_ms']:>7.1f}ms "
+                f"{summary['p99_ms']:>7.1f}ms {summary['errors']:>8}"
+            )
+
+def scaling_table(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, list]]]:
+    """Percentiles de cada endpoint y modo por número de temporadas (para graficar)"""
+    table: Dict[str, Dict[str, Dict[str, list]]] = {}
+    for run in runs:
+        for template, modes in run["endpoints"].items():
+            for mode, summary in modes.items():
+                series = table.setdefault(template, {}).setdefault(
+                    mode, {"seasons": [], "p50_ms": [], "p95_ms": [], "p99_ms": []}
+                )
+                series["seasons"].append(run["seasons"])
+                for key in ("p50_ms", "p95_ms", "p99_ms"):
+                    series[key].append(summary[key])
+    return table
+
+async def run_benchmark(
+    requests: int, seed: int, seasons: Optional[List[int]] = None,
+    league: Optional[LeagueConfig] = None, force: bool = False
+) -> Dict[str, Any]:
+    runs = []
+    for season_count in seasons or [None]:
+        league_summary = None
+        if season_count is not None:
+            league_summary = await load_league(league._replace(seasons=season_count), force=force)
+            print(
+                f"🏀 Liga de {season_count} temporadas: {league_summary['matches']} partidos, "
+                f"{league_summary['match_statistics']} estadísticas"
+            )
+        await prepare_app()
+        endpoints = await run_endpoints(requests, seed)
+        print_run(f"{season_count} temporadas" if season_count else "Datos actuales", endpoints)
+        runs.append({"seasons": season_count, "league": league_summary, "endpoints": endpoints})
+
+    report = {
+        **environment(),
+        "config": {
+            "requests": requests,
+            "seed": seed,
+            "modes": list(MODES),
+            "league": league._asdict() if seasons else None,
+        },
+        "runs": runs,
+    }
+    if len(runs) > 1:
+        report["scaling"] = scaling_table(runs)
+    return report
+
+def main():
+    defaults = LeagueConfig()
+    parser = argparse.ArgumentParser(description="Benchmark de latencias de los endpoints de la API")
+    parser.add_argument("--requests", type=int, default=50, help="Peticiones medidas por endpoint y modo")
+    parser.add_argument("--seasons", help="Temporadas de las ligas sintéticas, p.ej. 1,5,10,20")
+    parser.add_argument("--teams", type=int, default=defaults.teams)
+    parser.add_argument("--players-per-team", type=int, default=defaults.players_per_team)
+    parser.add_argument("--games-per-team", type=int, default=defaults.games_per_team)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--reset", action="store_true", help="Confirma que se vacíen las tablas de la liga")
+    parser.add_argument("--force", action="store_true", help="Vacía la base de datos aunque tenga usuarios")
+    parser.add_argument("--out", default="benchmark_report.json", help="Informe JSON")
+    parser.add_argument("--baseline", help="Informe con el que comparar (termina con error si hay regresiones)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento tolerado en %%")
+    args = parser.parse_args()
+
+    seasons = [int(value) for value in args.seasons.split(",")] if args.seasons else None
+    if seasons and not args.reset:
+        parser.error("--seasons vacía las tablas de la liga de DATABASE_URL: confírmalo con --reset")
+    league = LeagueConfig(args.teams, 1, args.players_per_team, args.games_per_team, args.seed)
+
+    quiet_logging()
+    report = asyncio.run(run_benchmark(args.requests, args.seed, seasons, league, args.force))
+    write_report(args.out, report)
+    if args.baseline:
+        from benchmarks.compare import compare_with_baseline
+
+        sys.exit(compare_with_baseline(args.baseline, report, args.threshold))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Compara un informe de benchmarks con otro de referencia (baseline) y falla si
+algo ha empeorado más de un umbral.
+
+Sirve para los informes de benchmarks.api (una serie por endpoint, modo y
+tamaño de liga), de benchmarks.micro (una serie por función) y de
+benchmarks.startup (import main, startup, primera petición, arranque en frío
+completo y proceso). Cada serie se compara por la mediana de sus muestras: el
+cambio es new/base - 1 y su intervalo de confianza sale de un bootstrap (se
+remuestrean las dos series con reemplazo y se recalcula el cociente de
+medianas). Veredictos:
+    regression   el intervalo queda por encima de 0 y el cambio supera el umbral
+    slower       más lento con significación, pero dentro del umbral
+    unchanged    el intervalo contiene el 0
+    faster       más rápido con significación, pero dentro del umbral
+    improvement  el intervalo queda por debajo de 0 y la mejora supera el umbral
+
+Uso (desde backend/):
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+    python -m benchmarks.api --requests 50 --baseline baseline.json  # mide y compara
+
+Termina con código 1 si hay alguna regresión. Los informes de benchmarks.load
+no guardan muestras y no se pueden comparar.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 10.0
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+
+VERDICT_LABELS = {
+    "regression": "🔴 regresión",
+    "slower": "🟠 más lento",
+    "unchanged": "⚪ sin cambios",
+    "faster": "🟢 más rápido",
+    "improvement": "🚀 mejora",
+}
+
+class Comparison(NamedTuple):
+    key: str
+    base_p50_ms: float
+    new_p50_ms: float
+    change_pct: float
+    ci_low_pct: float
+    ci_high_pct: float
+    verdict: str
+
+def flatten(report: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """{serie: muestras en ms} de un informe de benchmarks.api, benchmarks.micro o benchmarks.startup"""
+    series = {}
+    for name, summary in {**report.get("functions", {}), **report.get("cold_start", {})}.items():
+        series[name] = np.asarray(summary.get("samples_ms", []), dtype=np.float64)
+    for run in report.get("runs", []):
+        prefix = f"[{run['seasons']} temp.] " if run.get("seasons") else ""
+        for template, modes in run["endpoints"].items():
+            for mode, summary in modes.items():
+                series[f"{prefix}{template} ({mode})"] = np.asarray(summary.get("samples_ms", []), dtype=np.float64)
+    return series
+
+def bootstrap_change(
+    base: np.ndarray, new: np.ndarray, resamples: int, confidence: float, rng: np.random.Generator
+) -> tuple:
+    """(cambio, límite inferior, límite superior) en % del cociente de medianas new/base"""
+    base_medians = np.median(base[rng.integers(0, len(base), (resamples, len(base)))], axis=1)
+    new_medians = np.median(new[rng.integers(0, len(new), (resamples, len(new)))], axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(new_medians / base_medians, (tail, 100 - tail))
+    change = np.median(new) / np.median(base)
+    return (float(change) - 1) * 100, (float(low) - 1) * 100, (float(high) - 1) * 100
+
+def verdict(change: float, low: float, high: float, threshold: float) -> str:
+    if low > 0:
+        return "regression" if change > threshold else "slower"
+    if high < 0:
+        return "improvement" if change < -threshold else "faster"
+    return "unchanged"
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+    resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE, seed: int = 0
+) -> Dict[str, Any]:
+    base_series, new_series = flatten(baseline), flatten(current)
+    rng = np.random.default_rng(seed)
+    comparisons: List[Comparison] = []
+    skipped = []
+    for key, new in new_series.items():
+        base = base_series.get(key)
+        if base is None:
+            continue
+        # Sin muestras (informes anteriores a samples_ms) o con mediana 0 no hay cociente
+        if len(base) < 2 or len(new) < 2 or np.median(base) <= 0:
+            skipped.append(key)
+            continue
+        change, low, high = bootstrap_change(base, new, resamples, confidence, rng)
+        comparisons.append(Comparison(
+            key, round(float(np.median(base)), 4), round(float(np.median(new)), 4),
+            round(change, 2), round(low, 2), round(high, 2), verdict(change, low, high, threshold),
+        ))
+
+    return {
+        "threshold_pct": threshold,
+        "confidence": confidence,
+        "resamples": resamples,
+        "comparisons": [comparison._asdict() for comparison in comparisons],
+        "regressions": [comparison.key for comparison in comparisons if comparison.verdict == "regression"],
+        "skipped": skipped,
+        "only_in_baseline": sorted(set(base_series) - set(new_series)),
+        "only_in_current": sorted(set(new_series) - set(base_series)),
+        "config_changed": baseline.get("config") != current.get("config"),
+    }
+
+def print_comparison(result: Dict[str, Any]):
+    comparisons = result["comparisons"]
+    width = max([len(comparison["key"]) for comparison in comparisons] + [5])
+    confidence = round(result["confidence"] * 100)
+    print(f"\n📊 Comparación con la referencia (umbral {result['threshold_pct']:g}%, IC {confidence}%)")
+    print(f"{'serie':<{width}} {'base p50':>11} {'nuevo p50':>11} {'cambio':>8} {f'IC {confidence}%':>19}  veredicto")
+    for comparison in comparisons:
+        interval = f"[{comparison['ci_low_pct']:+.1f}, {comparison['ci_high_pct']:+.1f}]"
+        print(
+            f"{comparison['key']:<{width}} {comparison['base_p50_ms']:>9.3f}ms {comparison['new_p50_ms']:>9.3f}ms "
+            f"{comparison['change_pct']:>+7.1f}% {interval:>19}  {VERDICT_LABELS[comparison['verdict']]}"
+        )
+
+    if result["config_changed"]:
+        print("⚠️ Los dos informes no usan la misma configuración: las diferencias pueden no deberse al código")
+    for title, keys in (
+        ("Sin muestras para comparar", result["skipped"]),
+        ("Solo en la referencia", result["only_in_baseline"]),
+        ("Solo en el informe nuevo", result["only_in_current"]),
+    ):
+        if keys:
+            print(f"⚠️ {title}: {', '.join(keys)}")
+
+    if result["regressions"]:
+        print(f"❌ {len(result['regressions'])} regresiones por encima del {result['threshold_pct']:g}%")
+    else:
+        print("✅ Sin regresiones")
+
+def load_report(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def write_comparison(path: str, result: Dict[str, Any]):
+    # Sin pasar por benchmarks.harness: comparar no necesita la app ni la base de datos
+    Path(path).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"📝 Comparación guardada en {path}")
+
+def compare_with_baseline(
+    baseline_path: str, current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD, out: Optional[str] = None
+) -> int:
+    """Compara un informe recién medido con el de referencia; retorna el código de salida"""
+    result = compare_reports(load_report(baseline_path), current, threshold)
+    print_comparison(result)
+    if out:
+        write_comparison(out, result)
+    return 1 if result["regressions"] else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos informes de benchmarks")
+    parser.add_argument("baseline", help="Informe de referencia")
+    parser.add_argument("current", help="Informe nuevo")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Empeoramiento tolerado en %%")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES, help="Remuestreos del bootstrap")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Nivel de confianza del intervalo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Guarda la comparación en JSON")
+    args = parser.parse_args()
+
+    result = compare_reports(
+        load_report(args.baseline), load_report(args.current),
+        args.threshold, args.resamples, args.confidence, args.seed,
+    )
+    print_comparison(result)
+    if args.out:
+        write_comparison(args.out, result)
+    sys.exit(1 if result["regressions"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Utilidades comunes de los benchmarks: cliente HTTP en proceso contra la app
+ASGI, limpieza de cachés, arranque de los almacenes en memoria y resumen de
+latencias.
+"""
+import json
+import logging
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+import httpx
+import numpy as np
+from sqlalchemy.engine import make_url
+from sqlmodel import select
+
+from config import get_settings
+from database import SessionLocal
+from models import MatchStatistic, Player, Team
+from services.cache import cache_registry
+from services.data_version import data_version_service
+from services.game_log import game_log_store
+from services.http_cache import response_cache
+from services.leaderboards import leaderboard_service
+from services.player_metrics import player_metrics_service
+from services.top_performers import top_performers_service
+
+PERCENTILES = (50, 95, 99)
+
+class LeaguePools(NamedTuple):
+    team_ids: List[int]
+    player_ids: List[int]  # solo jugadores con estadísticas
+    names: List[str]  # jugadores y equipos, para las búsquedas
+
+def quiet_logging(level: int = logging.INFO):
+    """main.py registra cada petición a nivel INFO: en un benchmark solo es ruido (y coste)"""
+    logging.disable(level)
+
+def asgi_client() -> httpx.AsyncClient:
+    """Cliente contra la app en proceso: mide middlewares, consultas y serialización, sin red"""
+    from main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+async def clear_caches():
+    """Vacía la caché HTTP de respuestas y las cachés de resultados"""
+    response_cache.clear()
+    for cache in cache_registry.values():
+        await cache.clear()
+
+async def prepare_app():
+    """
+    Deja la API como tras un arranque sobre los datos actuales: versión de datos
+    releída, cachés vacías y almacenes en memoria cargados
+    """
+    from main import startup_event
+
+    data_version_service.invalidate()
+    for store in (game_log_store, leaderboard_service, player_metrics_service, top_performers_service):
+        store.invalidate()
+    await clear_caches()
+    # Como tras una ingesta (python -m services.player_metrics): la API solo lee las métricas guardadas
+    async with SessionLocal() as session:
+        await player_metrics_service.refresh(session, await data_version_service.get_version())
+    await startup_event()
+    # Como con WARM_UP_ON_STARTUP: las mediciones no incluyen la primera carga
+    await game_log_store.warm_up()
+    await player_metrics_service.warm_up()
+    async with SessionLocal() as session:
+        await leaderboard_service.get_snapshot(session)
+        await top_performers_service.get_response(session)
+
+async def league_pools() -> LeaguePools:
+    """Ids y nombres de los datos actuales con los que se construyen las peticiones"""
+    async with SessionLocal() as session:
+        team_ids = (await session.execute(select(Team.id).order_by(Team.id))).scalars().all()
+        player_ids = (await session.execute(select(MatchStatistic.player_id).distinct())).scalars().all()
+        names = (await session.execute(select(Player.name))).scalars().all()
+        names += (await session.execute(select(Team.full_name))).scalars().all()
+
+    if not team_ids or not player_ids:
+        raise RuntimeError("No hay equipos o jugadores con estadísticas: carga datos antes (benchmarks.synthetic_league)")
+    return LeaguePools(list(team_ids), sorted(player_ids), list(names))
+
+def latency_summary(latencies_ms: Iterable[float], errors: int = 0, digits: int = 2) -> Dict[str, Any]:
+    values = np.asarray(list(latencies_ms), dtype=np.float64)
+    if not len(values):
+        return {"count": 0, "errors": errors}
+    summary = {f"p{p}_ms": round(float(v), digits) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    summary.update({
+        "mean_ms": round(float(values.mean()), digits),
+        "min_ms": round(float(values.min()), digits),
+        "max_ms": round(float(values.max()), digits),
+        "count": int(len(values)),
+        "errors": errors,
+    })
+    return summary
+
+def environment() -> Dict[str, str]:
+    return {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": make_url(get_settings().DATABASE_URL).render_as_string(hide_password=True),
+    }
+
+def write_report(path: str, report: Dict[str, Any]):
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"📝 Informe guardado en {path}")
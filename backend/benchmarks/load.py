@@ -0,0 +1,371 @@
+"""
+Pruebas de carga por páginas: cada usuario virtual repite vistas completas
+tal y como las pide el frontend, con las peticiones de cada página lanzadas
+en paralelo. La ficha de un jugador son 1 + 14 peticiones y la de un equipo
+1 + 10, y los usuarios con sesión suman favoritos y perfil. La búsqueda
+manda una ráfaga de sugerencias mientras se escribe.
+
+Para cada nivel de concurrencia se mide:
+- el throughput, en páginas/s y peticiones/s;
+- la latencia de cada tipo de página y de cada endpoint (p50/p95/p99);
+- las conexiones abiertas en PostgreSQL durante la prueba.
+
+Las cachés se vacían antes de cada nivel para que los niveles sean comparables.
+
+Por defecto las peticiones van a la app ASGI en proceso. Con --url van a un
+servidor ya arrancado (uvicorn main:app) que use la misma base de datos.
+Los usuarios con sesión son cuentas premium @bench.hoopmetrics.invalid que
+se crean si no existen.
+
+Uso (desde backend/):
+    python -m benchmarks.load --concurrency 1,10,25,50 --duration 20 --out load.json
+    python -m benchmarks.load --url http://localhost:8000 --mix player=0.5,team=0.3,search=0.2
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import httpx
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import select
+
+from benchmarks.harness import (
+    LeaguePools, asgi_client, clear_caches, environment, latency_summary, league_pools,
+    prepare_app, quiet_logging, write_report
+)
+from benchmarks.synthetic_league import BENCH_EMAIL_DOMAIN
+from database import SessionLocal, engine
+from models import User, UserRole
+from security import create_access_token, hash_password
+
+# Peticiones de cada página (components/ui/player-tabs.tsx y team-tabs.tsx)
+PLAYER_PAGE = "/players/{player_id}"
+PLAYER_TABS = (
+    "/players/{player_id}/basicstats/pointsprogression",
+    "/players/{player_id}/basicstats/pointstype",
+    "/players/{player_id}/basicstats/skillprofile",
+    "/players/{player_id}/basicstats/barcompare",
+    "/players/{player_id}/basicstats/minutesprogression",
+    "/players/{player_id}/basicstats/participationrates",
+    "/players/{player_id}/advanced/impact-matrix",
+    "/players/{player_id}/advanced/position-averages",
+    "/players/{player_id}/advanced/lebron-impact",
+    "/players/{player_id}/advanced/pipm-impact",
+    "/players/{player_id}/advanced/pipm-position-averages",
+    "/players/{player_id}/advanced/raptor-war",
+    "/players/{player_id}/advanced/pace-impact-analysis",
+    "/players/{player_id}/advanced/fatigue-performance-curve",
+)
+TEAM_PAGE = "/teams/{team_id}"
+TEAM_TABS = (
+    "/teams/{team_id}/basicstats/pointsprogression",
+    "/teams/{team_id}/basicstats/points_vs_opponent",
+    "/teams/{team_id}/basicstats/pointstype",
+    "/teams/{team_id}/basicstats/teamradar",
+    "/teams/{team_id}/basicstats/shootingvolume",
+    "/teams/{team_id}/basicstats/playerscontribution",
+    "/teams/{team_id}/advanced/efficiency-rating",
+    "/teams/{team_id}/advanced/momentum-resilience-index",
+    "/teams/{team_id}/advanced/tactical-adaptability",
+    "/teams/{team_id}/advanced/clutch-dna-profile",
+)
+# Lo que añade una sesión iniciada a cualquier página (cabecera y use-favorites)
+SESSION_CALLS = ("/profile/me", "/favorites/")
+SUGGESTIONS = "/search/suggestions?q={query}"
+SEARCH_DEBOUNCE_MS = 300  # components/ui/search-bar.tsx
+
+DEFAULT_MIX = {"player": 0.4, "team": 0.25, "home": 0.1, "search": 0.15, "favorites": 0.1}
+AUTHENTICATED_ONLY = {"favorites"}
+
+class Recorder:
+    """Latencias por endpoint y por tipo de página de un nivel de concurrencia"""
+
+    def __init__(self):
+        self.requests: Dict[str, List[float]] = defaultdict(list)
+        self.pages: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def request(self, template: str, latency_ms: float, status: int):
+        self.requests[template].append(latency_ms)
+        self.statuses[status] += 1
+        if status == 0 or status >= 400:
+            self.errors[template] += 1
+
+    def page(self, name: str, latency_ms: float):
+        self.pages[name].append(latency_ms)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        total_requests = sum(len(values) for values in self.requests.values())
+        total_pages = sum(len(values) for values in self.pages.values())
+        return {
+            "duration_s": round(elapsed, 2),
+            "pages": total_pages,
+            "requests": total_requests,
+            "pages_per_s": round(total_pages / elapsed, 2),
+            "requests_per_s": round(total_requests / elapsed, 2),
+            "errors": sum(self.errors.values()),
+            "status_codes": {str(status): count for status, count in sorted(self.statuses.items())},
+            "page_latency": latency_summary(np.concatenate([values for values in self.pages.values()] or [[]])),
+            "request_latency": latency_summary(np.concatenate([values for values in self.requests.values()] or [[]])),
+            "pages_by_type": {name: latency_summary(values) for name, values in sorted(self.pages.items())},
+            "endpoints": {
+                template: latency_summary(values, self.errors[template])
+                for template, values in sorted(self.requests.items())
+            },
+        }
+
+class ConnectionSampler:
+    """Cuenta periódicamente las conexiones a la base de datos (sin contar la suya)"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop = asyncio.Event()
+
+    async def run(self):
+        async with engine.connect() as connection:
+            while not self._stop.is_set():
+                result = await connection.execute(text(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                ))
+                self.samples.append(result.scalar())
+                await connection.commit()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stop.set()
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"samples": 0}
+        values = np.asarray(self.samples)
+        return {
+            "max": int(values.max()),
+            "mean": round(float(values.mean()), 1),
+            "p95": round(float(np.percentile(values, 95)), 1),
+            "samples": len(values),
+        }
+
+class VirtualUser:
+    """Usuario que encadena páginas según el mix (sin sesión o con el token de una cuenta de pruebas)"""
+
+    def __init__(
+        self, client: httpx.AsyncClient, recorder: Recorder, pools: LeaguePools,
+        mix: Dict[str, float], token: Optional[str], think_ms: float, seed: int
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.pools = pools
+        self.rng = random.Random(seed)
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.think_ms = think_ms
+        scenarios = {name: weight for name, weight in mix.items() if token or name not in AUTHENTICATED_ONLY}
+        self.scenarios = list(scenarios)
+        self.weights = list(scenarios.values())
+
+    async def call(self, template: str, method: str = "GET", **params) -> int:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, template.format(**params), headers=self.headers)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0  # conexión rechazada o timeout
+        self.recorder.request(template, (time.perf_counter() - start) * 1000, status)
+        return status
+
+    async def fan_out(self, templates: Sequence[str], **params):
+        calls = [self.call(template, **params) for template in templates]
+        if self.headers:
+            calls += [self.call(template) for template in SESSION_CALLS]
+        await asyncio.gather(*calls)
+
+    async def player_page(self):
+        player_id = self.rng.choice(self.pools.player_ids)
+        await self.call(PLAYER_PAGE, player_id=player_id)  # render en servidor
+        await self.fan_out(PLAYER_TABS, player_id=player_id)
+
+    async def team_page(self):
+        team_id = self.rng.choice(self.pools.team_ids)
+        await self.call(TEAM_PAGE, team_id=team_id)
+        await self.fan_out(TEAM_TABS, team_id=team_id)
+
+    async def home_page(self):
+        # home-cards-wrapper.tsx y quick-stats-card.tsx (jugador aleatorio)
+        await self.fan_out(("/home/top-performers", PLAYER_PAGE), player_id=self.rng.choice(self.pools.player_ids))
+
+    async def search(self) -> float:
+        """Ráfaga de sugerencias: una petición por pausa de escritura, sin esperar a las anteriores"""
+        name = self.rng.choice(self.pools.names).lower()
+        lengths = sorted(self.rng.sample(range(2, len(name) + 1), min(self.rng.randint(1, 4), len(name) - 1)))
+        calls = []
+        for index, length in enumerate(lengths):
+            if index:
+                await asyncio.sleep(SEARCH_DEBOUNCE_MS / 1000)
+            calls.append(asyncio.create_task(self.call(SUGGESTIONS, query=quote(name[:length]))))
+        # Lo que espera el usuario es la respuesta a la última pausa
+        start = time.perf_counter()
+        await asyncio.gather(*calls)
+        return (time.perf_counter() - start) * 1000
+
+    async def favorites(self):
+        player_id = self.rng.choice(self.pools.player_ids)
+        await self.call("/favorites/")
+        await self.call("/favorites/players/{player_id}", "POST", player_id=player_id)
+        await self.call("/favorites/players/{player_id}/status", player_id=player_id)
+        await self.call("/favorites/players/{player_id}", "DELETE", player_id=player_id)
+
+    async def run(self, deadline: float):
+        pages = {
+            "player": self.player_page, "team": self.team_page, "home": self.home_page,
+            "search": self.search, "favorites": self.favorites,
+        }
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            start = time.perf_counter()
+            waited = await pages[scenario]()
+            self.recorder.page(scenario, waited if waited is not None else (time.perf_counter() - start) * 1000)
+            if self.think_ms:
+                await asyncio.sleep(self.rng.expovariate(1000 / self.think_ms))
+
+async def bench_tokens(count: int) -> List[str]:
+    """Tokens de `count` cuentas premium de pruebas (se crean las que falten)"""
+    emails = [f"loadtest{index}@{BENCH_EMAIL_DOMAIN}" for index in range(count)]
+    async with SessionLocal() as session:
+        result = await session.execute(select(User.email).where(User.email.in_(emails)))
+        existing = set(result.scalars().all())
+        missing = [email for email in emails if email not in existing]
+        if missing:
+            password_hash = hash_password("loadtest")
+            session.add_all([
+                User(username=email.split("@")[0], email=email, password_hash=password_hash, role=UserRole.premium)
+                for email in missing
+            ])
+            await session.commit()
+        # Sin favoritos de pruebas anteriores (el escenario añade y quita uno)
+        await session.execute(
+            text("DELETE FROM user_favorite_players WHERE user_id IN (SELECT id FROM users WHERE email = ANY(:emails))"),
+            {"emails": emails}
+        )
+        await session.commit()
+    return [
+        create_access_token({"sub": email, "role": UserRole.premium.value, "username": email.split("@")[0]})
+        for email in emails
+    ]
+
+async def run_level(
+    client: httpx.AsyncClient, concurrency: int, duration: float, pools: LeaguePools, mix: Dict[str, float],
+    tokens: Sequence[Optional[str]], think_ms: float, seed: int
+) -> Dict[str, Any]:
+    recorder = Recorder()
+    sampler = ConnectionSampler()
+    sampler_task = asyncio.create_task(sampler.run())
+    users = [
+        VirtualUser(client, recorder, pools, mix, tokens[index], think_ms, seed * 1000 + index)
+        for index in range(concurrency)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(user.run(start + duration) for user in users))
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+    await sampler_task
+    return {"concurrency": concurrency, **recorder.report(elapsed), "db_connections": sampler.summary()}
+
+def print_level(level: Dict[str, Any]):
+    pages = level["page_latency"]
+    requests = level["request_latency"]
+    print(
+        f"{level['concurrency']:>6} {level['pages_per_s']:>8.1f} {level['requests_per_s']:>8.1f} "
+        f"{pages.get('p50_ms', 0):>9.0f} {pages.get('p95_ms', 0):>9.0f} {pages.get('p99_ms', 0):>9.0f} "
+        f"{requests.get('p99_ms', 0):>9.0f} {level['errors']:>7} {level['db_connections'].get('max', 0):>7}"
+    )
+
+def parse_mix(value: Optional[str]) -> Dict[str, float]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Página desconocida en --mix: {name} (disponibles: {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+async def run_load_test(
+    concurrency_levels: List[int], duration: float, mix: Dict[str, float], auth_ratio: float,
+    think_ms: float, seed: int, url: Optional[str] = None
+) -> Dict[str, Any]:
+    pools = await league_pools()
+    authenticated = int(round(max(concurrency_levels) * auth_ratio))
+    tokens: List[Optional[str]] = list(await bench_tokens(authenticated)) if authenticated else []
+    # Los usuarios con sesión se reparten entre los anónimos en cada nivel
+    rng = random.Random(seed)
+    tokens += [None] * (max(concurrency_levels) - len(tokens))
+    rng.shuffle(tokens)
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=120, limits=httpx.Limits(max_connections=None))
+    else:
+        await prepare_app()
+        client = asgi_client()
+
+    levels = []
+    print(f"{'usuarios':>6} {'pág/s':>8} {'req/s':>8} {'pág p50':>9} {'pág p95':>9} {'pág p99':>9} "
+          f"{'req p99':>9} {'errores':>7} {'conex.':>7}")
+    async with client:
+        for concurrency in concurrency_levels:
+            if not url:
+                await clear_caches()
+            level = await run_level(client, concurrency, duration, pools, mix, tokens, think_ms, seed)
+            print_level(level)
+            levels.append(level)
+
+    return {
+        **environment(),
+        "target": url or "asgi",
+        "config": {
+            "concurrency": concurrency_levels,
+            "duration_s": duration,
+            "mix": mix,
+            "auth_ratio": auth_ratio,
+            "think_ms": think_ms,
+            "seed": seed,
+        },
+        "levels": levels,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de carga por páginas de la API")
+    parser.add_argument("--concurrency", default="1,5,10,25,50", help="Usuarios virtuales de cada nivel")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos por nivel")
+    parser.add_argument("--mix", help="Peso de cada página, p.ej. player=0.4,team=0.25,home=0.1,search=0.15,favorites=0.1")
+    parser.add_argument("--auth-ratio", type=float, default=0.3, help="Fracción de usuarios con sesión")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pausa media entre páginas (0 = saturación)")
+    parser.add_argument("--url", help="Servidor contra el que lanzar la carga (por defecto, la app en proceso)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="benchmark_report_load.json", help="Informe JSON")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    concurrency_levels = [int(value) for value in args.concurrency.split(",")]
+
+    quiet_logging()
+    report = asyncio.run(run_load_test(
+        concurrency_levels, args.duration, mix, args.auth_ratio, args.think_ms, args.seed, args.url
+    ))
+    write_report(args.out, report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Microbenchmarks de las fórmulas de metrics/ y de los cálculos por lotes que
+las usan (GameLogSnapshot, compute_player_metrics), sin base de datos.
+
+Las entradas salen de una liga sintética generada en memoria
+(benchmarks/synthetic_league.py) con la misma forma que las que cargan los
+servicios y los handlers: vectores de toda la liga para las métricas de
+jugadores y de eficiencia, y los partidos de un equipo para el resto.
+
+Cada función se ejecuta `number` veces por muestra (calibrado con
+timeit.autorange) y se guardan `repeat` muestras del tiempo por llamada.
+
+Uso (desde backend/):
+    python -m benchmarks.micro --seasons 1 --repeat 30 --out micro.json
+    python -m benchmarks.micro --baseline micro_base.json --threshold 10
+"""
+import argparse
+import sys
+import timeit
+from datetime import date
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import environment, latency_summary, write_report
+from benchmarks.synthetic_league import MATCH_COLUMNS, STATISTIC_COLUMNS, LeagueConfig, generate_league
+from metrics import players as player_formulas
+from metrics import teams as team_formulas
+from services.game_log import GAME_LOG_STATS, GameLogSnapshot
+from services.player_metrics import AVERAGED_STATS, LEAGUE_AVERAGES, PlayerAggregates, compute_player_metrics
+
+class LeagueInputs:
+    """Entradas de las fórmulas calculadas con NumPy a partir de una liga sintética"""
+
+    def __init__(self, config: LeagueConfig, team_id: int = 1):
+        league = generate_league(config, today=date(2026, 6, 30))
+        matches, statistics = [], []
+        for data in league.seasons:
+            matches.extend(data.matches)
+            statistics.extend(data.statistics)
+
+        match = dict(zip(MATCH_COLUMNS, zip(*matches)))
+        stat = dict(zip(STATISTIC_COLUMNS, np.array(statistics, dtype=np.float64).T))
+        match_index = stat["match_id"].astype(np.int64) - 1  # ids consecutivos desde 1
+        home_team_ids = np.array(match["home_team_id"], dtype=np.int32)
+        away_team_ids = np.array(match["away_team_id"], dtype=np.int32)
+        home_scores = np.array(match["home_score"], dtype=np.float64)
+        away_scores = np.array(match["away_score"], dtype=np.float64)
+        match_dates = np.array(match["date"], dtype="datetime64[D]")
+
+        player_ids = stat["player_id"].astype(np.int32)
+        current_team = {player[0]: player[7] for player in league.players}
+        self.game_log_args = dict(
+            stat_ids=stat["id"].astype(np.int64),
+            player_ids=player_ids,
+            match_ids=stat["match_id"].astype(np.int32),
+            dates=match_dates[match_index],
+            home_team_ids=home_team_ids[match_index],
+            away_team_ids=away_team_ids[match_index],
+            stats={name: stat[name] for name in GAME_LOG_STATS},
+            players={player[0]: (player[5], player[7]) for player in league.players},
+        )
+        self.snapshot = GameLogSnapshot(**self.game_log_args)
+        self.aggregates = self._player_aggregates(league.players, player_ids, stat)
+
+        # Totales por equipo y partido (las plantillas no cambian: el equipo es el actual)
+        row_team = np.array([current_team[int(pid)] for pid in player_ids], dtype=np.int32)
+        side = match_index * 2 + (row_team != home_team_ids[match_index])
+        sides = 2 * len(matches)
+
+        def side_sum(column):
+            return np.bincount(side, weights=stat[column], minlength=sides)
+
+        totals = {
+            "points": side_sum("points"), "fga": side_sum("field_goals_attempted"),
+            "fgm": side_sum("field_goals_made"), "tpm": side_sum("three_points_made"),
+            "fta": side_sum("free_throws_attempted"), "tov": side_sum("turnovers"),
+            "reb": side_sum("rebounds"),
+        }
+        opponent_side = np.arange(sides) ^ 1
+        side_team = np.column_stack((home_team_ids, away_team_ids)).ravel()
+        side_scores = np.column_stack((home_scores, away_scores)).ravel()
+        self.efficiency_args = (
+            [team[0] for team in league.teams],
+            {"team_id": side_team, **totals},
+            {name: totals[name][opponent_side] for name in ("points", "fga", "fta", "tov", "reb")},
+            side_scores - side_scores[opponent_side],
+            side_team,
+            side_team[opponent_side],
+        )
+
+        # Partidos de un equipo, por fecha (como los cargan los handlers)
+        team_sides = np.flatnonzero(side_team == team_id)
+        team_sides = team_sides[np.argsort(match_dates[team_sides // 2], kind="stable")]
+        team_scores = side_scores[team_sides]
+        opponent_scores = side_scores[opponent_side[team_sides]]
+        self.momentum_args = (team_scores, opponent_scores, team_sides % 2 == 0, 1.5)
+        self.tactical_args = (team_scores, opponent_scores, {
+            "field_goals_attempted": totals["fga"][team_sides], "turnovers": totals["tov"][team_sides],
+            "rebounds": totals["reb"][team_sides], "three_points_attempted": side_sum("three_points_attempted")[team_sides],
+            "points": totals["points"][team_sides],
+        })
+
+        team_rows = row_team == team_id
+        minutes = stat["minutes_played"]
+        pressure = team_rows & (stat["field_goals_attempted"] > 5)
+        decisions = team_rows & (minutes >= 10)
+        roster = np.unique(player_ids[team_rows])
+        star_rows = team_rows & (minutes >= 15)
+        starters = np.unique(player_ids[star_rows])
+        star_points = np.array([stat["points"][star_rows & (player_ids == pid)].mean() for pid in starters])
+        stars = starters[np.argsort(-star_points)[:5]]
+        collective = {
+            name: np.array([stat[column][decisions & (player_ids == pid)].mean() for pid in stars])
+            for name, column in (("points", "points"), ("assists", "assists"),
+                                 ("turnovers", "turnovers"), ("minutes", "minutes_played"))
+        }
+        self.clutch_args = (
+            team_scores, opponent_scores,
+            stat["field_goals_made"][pressure].sum(), stat["field_goals_attempted"][pressure].sum(),
+            stat["turnovers"][decisions].sum(), stat["assists"][decisions].sum(),
+            np.sort(star_points)[::-1][:5], collective,
+        )
+        self.predictive_args = (
+            team_scores[::-1], opponent_scores[::-1],
+            np.array([minutes[team_rows & (player_ids == pid)].mean() for pid in roster]),
+            np.array([np.count_nonzero(team_rows & (player_ids == pid)) for pid in roster]),
+        )
+
+    @staticmethod
+    def _player_aggregates(players: List[tuple], player_ids: np.ndarray, stat: Dict[str, np.ndarray]) -> PlayerAggregates:
+        """Las mismas columnas que la consulta GROUP BY de load_player_aggregates"""
+        keys, index = np.unique(player_ids, return_inverse=True)
+        counts = np.bincount(index)
+
+        def group_mean(values):
+            return np.bincount(index, weights=values) / counts
+
+        def group_stddev(values):
+            mean = group_mean(values)
+            squares = np.bincount(index, weights=(values - mean[index]) ** 2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+
+        columns = [
+            keys, counts, np.bincount(index, weights=stat["minutes_played"]),
+            group_stddev(stat["points"]), group_stddev(stat["plusminus"]),
+            *(group_mean(stat[name]) for name in AVERAGED_STATS),
+        ]
+        rows = list(zip(*(column.tolist() for column in columns)))
+        league = {label: float(stat[name].mean()) for name, (label, _) in LEAGUE_AVERAGES.items()}
+        return PlayerAggregates(rows, {player[0]: (player[2], player[5]) for player in players}, league)
+
+def benchmark_functions(inputs: LeagueInputs) -> Dict[str, Callable[[], Any]]:
+    a = inputs.aggregates
+    ages = [player_formulas.age_on(birth_date, date(2026, 6, 30)) for birth_date in a.birth_dates]
+    log = inputs.snapshot
+    player_rows = log.player_slice(int(log.player_keys[0]))
+    _, efficiency = player_formulas.game_scores(log.stats)
+
+    def quiet(func, *args):
+        def call():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return func(*args)
+        return call
+
+    return {
+        "game_log.GameLogSnapshot": lambda: GameLogSnapshot(**inputs.game_log_args),
+        "player_metrics.compute_player_metrics": quiet(compute_player_metrics, a, log),
+        "players.lebron_impact": quiet(
+            player_formulas.lebron_impact, a.box, a.league, a.games_played, a.total_minutes_raw,
+            a.points_std_raw, a.pm_std_raw
+        ),
+        "players.pipm_impact": quiet(player_formulas.pipm_impact, a.box, a.league, a.pm_std_raw),
+        "players.raptor_war": quiet(player_formulas.raptor_war, a.box, a.league, a.games_played, ages, a.positions),
+        "players.pace_impact": quiet(player_formulas.pace_impact, a.box, a.league, a.points_std_raw, a.pm_std_raw),
+        "players.game_scores": quiet(player_formulas.game_scores, log.stats),
+        "players.fatigue_curve": quiet(
+            player_formulas.fatigue_curve, log.stats["minutes_played"][player_rows],
+            efficiency[player_rows], log.days[player_rows]
+        ),
+        "teams.efficiency_ratings": quiet(team_formulas.efficiency_ratings, *inputs.efficiency_args),
+        "teams.momentum_resilience": quiet(team_formulas.momentum_resilience, *inputs.momentum_args),
+        "teams.tactical_adaptability": quiet(team_formulas.tactical_adaptability, *inputs.tactical_args),
+        "teams.clutch_dna_profile": quiet(team_formulas.clutch_dna_profile, *inputs.clutch_args),
+        "teams.predictive_performance": quiet(team_formulas.predictive_performance, *inputs.predictive_args),
+    }
+
+def time_function(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Tiempo por llamada (ms) de `repeat` muestras de `number` llamadas cada una"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = [total / number * 1000 for total in timer.repeat(repeat, number)]
+    return {**latency_summary(samples, digits=4), "number": number, "samples_ms": [round(value, 5) for value in samples]}
+
+def run_micro(config: LeagueConfig, repeat: int, only: List[str] = None) -> Dict[str, Any]:
+    inputs = LeagueInputs(config)
+    functions = {}
+    print(f"{'función':<42} {'p50':>10} {'p95':>10} {'llamadas':>9}")
+    for name, func in benchmark_functions(inputs).items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        functions[name] = time_function(func, repeat)
+        print(f"{name:<42} {functions[name]['p50_ms']:>8.3f}ms {functions[name]['p95_ms']:>8.3f}ms "
+              f"{functions[name]['number']:>9}")
+
+    return {
+        **environment(),
+        "config": {"league": config._asdict(), "repeat": repeat, "game_log_rows": len(inputs.snapshot)},
+        "functions": functions,
+    }
+
+def main():
+    defaults = LeagueConfig()
+    parser = argparse.ArgumentParser(description="Microbenchmarks de las fórmulas de métricas")
+    parser.add_argument("--seasons", type=int, default=defaults.seasons)
+    parser.add_argument("--teams", type=int, default=defaults.teams)
+    parser.add_argument("--players-per-team", type=int, default=defaults.players_per_team)
+    parser.add_argument("--games-per-team", type=int, default=defaults.games_per_team)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=30, help="Muestras por función")
+    parser.add_argument("--only", action="append", help="Solo las funciones cuyo nombre contenga este texto")
+    parser.add_argument("--out", default="benchmark_report_micro.json", help="Informe JSON")
+    parser.add_argument("--baseline", help="Informe con el que comparar (termina con error si hay regresiones)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento tolerado en %%")
+    args = parser.parse_args()
+
+    config = LeagueConfig(args.teams, args.seasons, args.players_per_team, args.games_per_team, args.seed)
+    report = run_micro(config, args.repeat, args.only)
+    write_report(args.out, report)
+    if args.baseline:
+        from benchmarks.compare import compare_with_baseline
+
+        sys.exit(compare_with_baseline(args.baseline, report, args.threshold))
+
+if __name__ == "__main__":
+    main()
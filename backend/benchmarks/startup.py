@@ -0,0 +1,232 @@
+"""
+Arranque en frío de la API: lo que espera el primer usuario de cada instancia
+serverless desde que arranca el proceso hasta que recibe la respuesta, y en qué
+se va ese tiempo, al estilo de `python -X importtime`.
+
+Cada muestra es un intérprete nuevo que mide:
+    import main    tiempo de importar la app (settings, modelos, routers...)
+    startup        app.router.startup(): startup_event (comprobación de
+                   migraciones, precargas si WARM_UP_ON_STARTUP...)
+    first request  primera petición a --path con un cliente ASGI en proceso
+                   (cargas perezosas de los almacenes en memoria incluidas)
+    cold start     suma de las tres anteriores
+    process        vida del proceso completo, incluido el arranque del intérprete
+Aparte se hacen unas pocas ejecuciones con -X importtime (que añade su propio
+coste, por eso no cuentan para las muestras) para el desglose por paquete y
+por módulo.
+
+startup y first request usan la base de datos de DATABASE_URL (p.ej. la liga
+de benchmarks.synthetic_league). Con --import-only solo se mide import main y
+no hace falta base de datos.
+
+Uso (desde backend/):
+    python -m benchmarks.startup --runs 20 --target-ms 900 --out startup.json
+    python -m benchmarks.startup --path /players/1/advanced/lebron-impact
+    python -m benchmarks.startup --import-only --target-ms 600
+    python -m benchmarks.startup --baseline startup_base.json  # ver benchmarks.compare
+
+Termina con código 1 si la mediana de `cold start` (o de `import main` con
+--import-only) supera --target-ms.
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.harness import environment, latency_summary, write_report
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Objetivo del arranque en frío completo en un proceso nuevo
+DEFAULT_TARGET_MS = 900.0
+
+# Primera petición por defecto: la landing
+DEFAULT_PATH = "/home/top-performers"
+
+# Paquetes que solo deben cargarse en su primer uso (ver security, spaces_config,
+# image_processing y services/admin_metrics)
+LAZY_PACKAGES = ("boto3", "botocore", "psutil", "passlib", "jose", "cryptography", "PIL")
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(f"@@import_ms={{elapsed * 1000:.3f}}")
+print("@@loaded=" + ",".join(sorted(name for name in {lazy} if name in sys.modules)))
+path = {path!r}
+if path:
+    import asyncio
+    import httpx
+
+    async def cold_start():
+        start = time.perf_counter()
+        await main.app.router.startup()
+        print(f"@@startup_ms={{(time.perf_counter() - start) * 1000:.3f}}")
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            start = time.perf_counter()
+            response = await client.get(path)
+            print(f"@@request_ms={{(time.perf_counter() - start) * 1000:.3f}}")
+            print(f"@@status={{response.status_code}}")
+        await main.app.router.shutdown()
+
+    asyncio.run(cold_start())
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+class Sample(NamedTuple):
+    import_ms: float
+    startup_ms: Optional[float]
+    request_ms: Optional[float]
+    process_ms: float
+    loaded: List[str]  # paquetes perezosos cargados al importar main
+    stderr: str
+
+def run_import(path: Optional[str] = None, importtime: bool = False) -> Sample:
+    """Mide un proceso nuevo; sin `path` solo importa main"""
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c",
+               IMPORT_SCRIPT.format(lazy=LAZY_PACKAGES, path=path)]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=False)
+    process_ms = (time.perf_counter() - start) * 1000
+    import_ms = re.search(r"@@import_ms=([\d.]+)", completed.stdout)
+    if completed.returncode != 0 or not import_ms:
+        raise RuntimeError(f"No se pudo arrancar la app:\n{completed.stderr[-2000:]}")
+    loaded = re.search(r"@@loaded=(.*)", completed.stdout).group(1)
+
+    startup_ms = request_ms = None
+    if path:
+        status = int(re.search(r"@@status=(\d+)", completed.stdout).group(1))
+        if status >= 400:
+            raise RuntimeError(f"La primera petición a {path} ha respondido {status}:\n{completed.stderr[-2000:]}")
+        startup_ms = float(re.search(r"@@startup_ms=([\d.]+)", completed.stdout).group(1))
+        request_ms = float(re.search(r"@@request_ms=([\d.]+)", completed.stdout).group(1))
+    return Sample(
+        float(import_ms.group(1)), startup_ms, request_ms, process_ms,
+        [name for name in loaded.split(",") if name], completed.stderr
+    )
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[float, float, int]]:
+    """{módulo: (ms propios, ms acumulados, profundidad)} de la salida de -X importtime"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2)
+    return modules
+
+def is_app_module(name: str) -> bool:
+    root = BACKEND_DIR / name.split(".")[0]
+    return root.with_suffix(".py").exists() or root.is_dir()
+
+def import_profile(runs: int, top: int) -> Dict[str, Any]:
+    """Desglose mediano de varias ejecuciones con -X importtime"""
+    profiles = [parse_importtime(run_import(importtime=True).stderr) for _ in range(runs)]
+
+    packages = defaultdict(list)
+    for profile in profiles:
+        totals = defaultdict(float)
+        for name, (self_ms, _, _) in profile.items():
+            totals[name.split(".")[0]] += self_ms
+        for package, total in totals.items():
+            packages[package].append(total)
+    by_package = sorted(
+        ((package, float(np.median(values))) for package, values in packages.items()), key=lambda item: -item[1]
+    )
+
+    # Módulos de la app importados directamente por main, por tiempo acumulado
+    app_modules = [name for name, (_, _, depth) in profiles[0].items() if depth == 1 and is_app_module(name)]
+    by_module = sorted(
+        ((name, float(np.median([profile[name][1] for profile in profiles if name in profile])))
+         for name in app_modules),
+        key=lambda item: -item[1],
+    )
+    return {
+        "runs": runs,
+        "packages": [{"package": package, "self_ms": round(ms, 2)} for package, ms in by_package[:top]],
+        "app_modules": [{"module": name, "cumulative_ms": round(ms, 2)} for name, ms in by_module[:top]],
+        "total_ms": round(float(np.median([profile["main"][1] for profile in profiles if "main" in profile])), 2),
+    }
+
+def run_startup(runs: int, profile_runs: int, top: int, target_ms: float, path: Optional[str]) -> Dict[str, Any]:
+    series = defaultdict(list)
+    loaded = set()
+    for _ in range(runs):
+        sample = run_import(path)
+        series["import main"].append(sample.import_ms)
+        if path:
+            series["startup"].append(sample.startup_ms)
+            series["first request"].append(sample.request_ms)
+            series["cold start"].append(sample.import_ms + sample.startup_ms + sample.request_ms)
+        series["process"].append(sample.process_ms)
+        loaded.update(sample.loaded)
+
+    cold_start = {
+        name: {**latency_summary(samples), "samples_ms": [round(value, 3) for value in samples]}
+        for name, samples in series.items()
+    }
+    profile = import_profile(profile_runs, top)
+
+    print(f"{'medida':<14} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name, summary in cold_start.items():
+        print(f"{name:<14} {summary['p50_ms']:>7.1f}ms {summary['p95_ms']:>7.1f}ms {summary['max_ms']:>7.1f}ms")
+    print(f"\n📦 Paquetes por tiempo propio (-X importtime, mediana de {profile_runs} ejecuciones)")
+    for row in profile["packages"]:
+        print(f"  {row['package']:<30} {row['self_ms']:>8.1f}ms")
+    print("\n🧩 Módulos de la app por tiempo acumulado")
+    for row in profile["app_modules"]:
+        print(f"  {row['module']:<30} {row['cumulative_ms']:>8.1f}ms")
+    if loaded:
+        print(f"\n⚠️ Paquetes que deberían cargarse en su primer uso y se importan con la app: {', '.join(sorted(loaded))}")
+
+    measured = "cold start" if path else "import main"
+    p50 = cold_start[measured]["p50_ms"]
+    within_target = p50 <= target_ms
+    print(f"\n{'✅' if within_target else '❌'} {measured} p50 {p50:.1f}ms (objetivo {target_ms:g}ms)")
+    return {
+        **environment(),
+        "config": {"runs": runs, "profile_runs": profile_runs, "target_ms": target_ms, "path": path},
+        "cold_start": cold_start,
+        "within_target": within_target,
+        "eager_lazy_packages": sorted(loaded),
+        "import_profile": profile,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío (import, startup y primera petición)")
+    parser.add_argument("--runs", type=int, default=20, help="Procesos medidos")
+    parser.add_argument("--profile-runs", type=int, default=3, help="Procesos con -X importtime para el desglose")
+    parser.add_argument("--top", type=int, default=15, help="Filas del desglose")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="Ruta de la primera petición")
+    parser.add_argument(
+        "--import-only", action="store_true", help="Mide solo import main (sin startup ni base de datos)"
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=DEFAULT_TARGET_MS,
+        help="Objetivo para la mediana de cold start (de import main con --import-only)"
+    )
+    parser.add_argument("--out", default="benchmark_report_startup.json", help="Informe JSON")
+    parser.add_argument("--baseline", help="Informe con el que comparar (termina con error si hay regresiones)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento tolerado en %%")
+    args = parser.parse_args()
+
+    report = run_startup(args.runs, args.profile_runs, args.top, args.target_ms, None if args.import_only else args.path)
+    write_report(args.out, report)
+    status = 0 if report["within_target"] else 1
+    if args.baseline:
+        from benchmarks.compare import compare_with_baseline
+
+        status = max(status, compare_with_baseline(args.baseline, report, args.threshold))
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Liga sintética para los benchmarks: equipos, plantillas, temporadas de
+partidos y box scores coherentes con el esquema (Team/Player/Match/MatchStatistic).
+
+Los puntos de cada jugador salen de sus tiros (2·FGM + 3PM + FTM), el marcador
+de cada equipo es la suma de su box score, los rebotes son ofensivos +
+defensivos y el plus/minus sigue al margen final según los minutos jugados.
+Las plantillas no cambian entre temporadas y cada jornada juegan todos los
+equipos (hay back-to-backs, como en el calendario real).
+
+La carga VACÍA las tablas de la liga de la base de datos de DATABASE_URL
+(usa una base de datos dedicada) y vuelca los datos con COPY. Después
+recalcula team_game_stats e incrementa la versión de datos, como una ingesta.
+
+Uso (desde backend/):
+    python -m benchmarks.synthetic_league --seasons 3 --reset
+    python -m benchmarks.synthetic_league --seasons 20 --teams 30 --players-per-team 15 --reset
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from database import SessionLocal, engine
+from migrations.runner import run_migrations
+from models import UserRole
+from services.data_version import bump_data_version
+
+CITIES = [
+    "Boston", "Brooklyn", "New York", "Philadelphia", "Toronto", "Chicago", "Cleveland", "Detroit",
+    "Indiana", "Milwaukee", "Atlanta", "Charlotte", "Miami", "Orlando", "Washington", "Denver",
+    "Minnesota", "Oklahoma City", "Portland", "Utah", "Golden State", "Los Angeles", "Phoenix",
+    "Sacramento", "San Diego", "Dallas", "Houston", "Memphis", "New Orleans", "San Antonio",
+]
+NICKNAMES = [
+    "Comets", "Hawks", "Pioneers", "Rangers", "Storm", "Bulls", "Foxes", "Engines", "Pacers", "Stags",
+    "Falcons", "Hornets", "Tides", "Magic", "Wizards", "Peaks", "Wolves", "Thunder", "Blazers", "Canyons",
+    "Warriors", "Stars", "Suns", "Kings", "Waves", "Riders", "Rockets", "Bears", "Pelicans", "Spurs",
+]
+SYLLABLES = [
+    "ka", "lo", "mi", "dar", "ren", "jo", "an", "te", "vin", "sha", "qui", "el",
+    "ro", "ma", "nu", "bi", "za", "ton", "lee", "gio", "ste", "phen", "ky", "rie",
+]
+
+# Puesto en la rotación -> posición y minutos relativos (los 5 primeros son titulares)
+ROSTER_POSITIONS = ("PG", "SG", "SF", "PF", "C", "G", "G-F", "F", "F-C", "C", "PG", "SF", "PF", "G", "F-C")
+ROTATION_MINUTES = (34, 33, 32, 31, 30, 24, 22, 18, 14, 10, 6, 4, 2, 1, 1)
+
+# Perfil medio por tipo de posición: (tasa de triples, rebotes/min, asistencias/min, tapones/min)
+POSITION_PROFILES = {
+    "guard": (0.45, 0.12, 0.20, 0.010),
+    "wing": (0.40, 0.17, 0.09, 0.015),
+    "big": (0.15, 0.27, 0.07, 0.040),
+}
+POSITION_KIND = {
+    "PG": "guard", "SG": "guard", "G": "guard", "G-F": "wing", "SF": "wing",
+    "F": "wing", "PF": "big", "F-C": "big", "C": "big",
+}
+
+SEASON_DAYS = 170  # de finales de octubre a mediados de abril
+HOME_ADVANTAGE = 1.015
+
+TEAM_COLUMNS = ("id", "rapidapi_id", "full_name", "abbreviation", "conference", "division", "stadium", "city")
+PLAYER_COLUMNS = ("id", "name", "birth_date", "height", "weight", "position", "number", "current_team_id")
+MATCH_COLUMNS = (
+    "id", "rapidapi_id", "date", "season", "home_team_id", "home_team_rapidapi_id",
+    "away_team_id", "away_team_rapidapi_id", "home_score", "away_score",
+)
+STATISTIC_COLUMNS = (
+    "id", "match_id", "match_rapidapi_id", "player_id", "player_rapidapi_id",
+    "points", "rebounds", "assists", "steals", "blocks", "minutes_played",
+    "field_goals_attempted", "field_goals_made", "three_points_made", "three_points_attempted",
+    "free_throws_made", "free_throws_attempted", "fouls", "turnovers",
+    "off_rebounds", "def_rebounds", "minutes", "plusminus",
+)
+
+# Dominio de los usuarios que crean las pruebas de carga (no cuentan como usuarios reales)
+BENCH_EMAIL_DOMAIN = "bench.hoopmetrics.invalid"
+
+# Tablas que se vacían antes de cargar (las derivadas se recalculan o se regeneran solas)
+LEAGUE_TABLES = (
+    "user_favorite_players", "user_favorite_teams", "player_advanced_metrics", "match_top_performers",
+    "team_game_stats", "ingest_state", "match_statistics", "matches", "players", "teams",
+)
+
+class LeagueConfig(NamedTuple):
+    teams: int = 30
+    seasons: int = 1
+    players_per_team: int = 15
+    games_per_team: int = 82
+    seed: int = 42
+
+class SeasonData(NamedTuple):
+    matches: List[tuple]
+    statistics: List[tuple]
+
+class SyntheticLeague(NamedTuple):
+    teams: List[tuple]  # filas con TEAM_COLUMNS
+    players: List[tuple]  # filas con PLAYER_COLUMNS
+    seasons: Iterator[SeasonData]
+
+class PlayerProfiles:
+    """Ratings fijos de cada jugador (arrays indexados por player_id - 1)"""
+
+    def __init__(self, rng: np.random.Generator, positions: List[str]):
+        kinds = [POSITION_PROFILES[POSITION_KIND[position]] for position in positions]
+        three_rate, rebounds, assists, blocks = (np.array(column) for column in zip(*kinds))
+        size = len(positions)
+        self.usage = rng.lognormal(np.log(0.34), 0.2, size)  # intentos de campo por minuto
+        self.three_rate = np.clip(three_rate + rng.normal(0, 0.06, size), 0.02, 0.7)
+        self.fg2_pct = np.clip(rng.normal(0.52, 0.04, size), 0.38, 0.68)
+        self.fg3_pct = np.clip(rng.normal(0.36, 0.03, size), 0.25, 0.45)
+        self.ft_rate = np.clip(rng.normal(0.22, 0.06, size), 0.05, 0.45)
+        self.ft_pct = np.clip(rng.normal(0.78, 0.07, size), 0.5, 0.95)
+        self.rebounds = rebounds * rng.lognormal(0, 0.2, size)
+        self.assists = assists * rng.lognormal(0, 0.3, size)
+        self.blocks = blocks * rng.lognormal(0, 0.3, size)
+
+def synthetic_name(rng: np.random.Generator) -> str:
+    def word(low: int, high: int) -> str:
+        return "".join(SYLLABLES[i] for i in rng.integers(0, len(SYLLABLES), rng.integers(low, high + 1)))
+    return f"{word(1, 3).capitalize()} {word(2, 4).capitalize()}"
+
+def build_teams(config: LeagueConfig) -> List[tuple]:
+    teams = []
+    for index in range(config.teams):
+        city = CITIES[index % len(CITIES)]
+        nickname = NICKNAMES[index % len(NICKNAMES)]
+        suffix = f" {index // len(CITIES) + 1}" if index >= len(CITIES) else ""
+        abbreviation = (city.replace(" ", "")[:2] + nickname[0]).upper() + suffix.strip()
+        conference = "East" if index < config.teams / 2 else "West"
+        teams.append((
+            index + 1, index + 1, f"{city} {nickname}{suffix}", abbreviation,
+            conference, f"{conference} {index % 3 + 1}", f"{city} Arena", city,
+        ))
+    return teams
+
+def build_players(config: LeagueConfig, rng: np.random.Generator, today: date) -> List[tuple]:
+    players = []
+    for index in range(config.teams * config.players_per_team):
+        slot = index % config.players_per_team
+        position = ROSTER_POSITIONS[slot % len(ROSTER_POSITIONS)]
+        kind = POSITION_KIND[position]
+        height = {"guard": 191, "wing": 201, "big": 210}[kind] + float(rng.normal(0, 4))
+        age_days = int(rng.integers(19 * 365, 38 * 365))
+        players.append((
+            index + 1, synthetic_name(rng), today - timedelta(days=age_days),
+            round(height, 1), round(height - 100 + float(rng.normal(0, 6)), 1),
+            position, int(rng.integers(0, 100)), index // config.players_per_team + 1,
+        ))
+    return players
+
+def round_robin(teams: int, rounds: int) -> Iterator[List[Tuple[int, int]]]:
+    """Jornadas (pares local/visitante, índices 0..teams-1) por el método del círculo"""
+    slots = list(range(teams + teams % 2))  # con un número impar de equipos, el último descansa
+    for round_index in range(rounds):
+        cycle, offset = divmod(round_index, len(slots) - 1)
+        rotated = [slots[0]] + slots[1:][offset:] + slots[1:][:offset]
+        pairs = []
+        for i in range(len(rotated) // 2):
+            first, second = rotated[i], rotated[-1 - i]
+            if first >= teams or second >= teams:
+                continue
+            pairs.append((first, second) if (i + cycle) % 2 == 0 else (second, first))
+        yield pairs
+
+def generate_season(
+    config: LeagueConfig, rng: np.random.Generator, profiles: PlayerProfiles, team_strength: np.ndarray,
+    year: int, first_match_id: int, first_statistic_id: int
+) -> SeasonData:
+    """Partidos y box scores de una temporada (ids consecutivos a partir de los indicados)"""
+    start = date(year, 10, 22)
+    rotation = np.array(ROTATION_MINUTES[:config.players_per_team], dtype=np.float64)
+
+    match_rows: List[Tuple[int, int, int]] = []  # (jornada, local, visitante)
+    for round_index, pairs in enumerate(round_robin(config.teams, config.games_per_team)):
+        match_rows.extend((round_index, home, away) for home, away in pairs)
+
+    # Participaciones: quién juega cada partido y cuántos minutos
+    side_of, player_of, minutes_of = [], [], []
+    for match_index, (_, home, away) in enumerate(match_rows):
+        for side, team in enumerate((home, away)):
+            active = int(rng.integers(9, min(13, config.players_per_team - 1) + 1))
+            slots = np.arange(active)
+            if rng.random() < 0.05:  # descanso de un titular
+                slots = np.delete(np.arange(active + 1), rng.integers(0, 5))[:active]
+            weights = rotation[slots] * rng.lognormal(0, 0.15, len(slots))
+            side_of.extend([match_index * 2 + side] * len(slots))
+            player_of.extend(team * config.players_per_team + slots)
+            minutes_of.extend(np.round(weights / weights.sum() * 240, 1))
+
+    side_of = np.array(side_of)
+    p = np.array(player_of)
+    minutes = np.array(minutes_of)
+    teams_of_sides = np.array([team for _, home, away in match_rows for team in (home, away)])
+    shooting = team_strength[teams_of_sides[side_of]] * np.where(side_of % 2 == 0, HOME_ADVANTAGE, 1.0)
+
+    fga = rng.poisson(profiles.usage[p] * minutes)
+    tpa = rng.binomial(fga, profiles.three_rate[p])
+    tpm = rng.binomial(tpa, np.clip(profiles.fg3_pct[p] * shooting, 0, 1))
+    fgm = tpm + rng.binomial(fga - tpa, np.clip(profiles.fg2_pct[p] * shooting, 0, 1))
+    fta = rng.poisson(profiles.ft_rate[p] * fga + 0.02 * minutes)
+    ftm = rng.binomial(fta, profiles.ft_pct[p])
+    off_rebounds = rng.poisson(profiles.rebounds[p] * 0.25 * minutes)
+    def_rebounds = rng.poisson(profiles.rebounds[p] * 0.75 * minutes)
+    assists = rng.poisson(profiles.assists[p] * minutes)
+    steals = rng.poisson(0.035 * minutes)
+    blocks = rng.poisson(profiles.blocks[p] * minutes)
+    turnovers = rng.poisson(0.045 * minutes)
+    fouls = np.minimum(rng.poisson(0.07 * minutes), 6)
+
+    # Sin empates: la prórroga se resuelve con un tiro libre del primer jugador local
+    side_points = np.bincount(side_of, weights=2 * fgm + tpm + ftm, minlength=2 * len(match_rows))
+    tied = np.flatnonzero(side_points[0::2] == side_points[1::2])
+    first_of_side = np.searchsorted(side_of, tied * 2)
+    fta[first_of_side] += 1
+    ftm[first_of_side] += 1
+    side_points[tied * 2] += 1
+
+    points = 2 * fgm + tpm + ftm
+    margins = side_points - side_points.reshape(-1, 2)[:, ::-1].ravel()
+    plusminus = np.round(margins[side_of] * minutes / 48 + rng.normal(0, 4, len(p)))
+
+    matches = [
+        (
+            first_match_id + index, first_match_id + index,
+            start + timedelta(days=round_index * SEASON_DAYS // config.games_per_team), str(year),
+            home + 1, home + 1, away + 1, away + 1,
+            int(side_points[index * 2]), int(side_points[index * 2 + 1]),
+        )
+        for index, (round_index, home, away) in enumerate(match_rows)
+    ]
+
+    match_ids = (first_match_id + side_of // 2).tolist()
+    player_ids = (p + 1).tolist()
+    columns = [
+        points, off_rebounds + def_rebounds, assists, steals, blocks, minutes,
+        fga, fgm, tpm, tpa, ftm, fta, fouls, turnovers, off_rebounds, def_rebounds, minutes, plusminus,
+    ]
+    statistics = list(zip(
+        range(first_statistic_id, first_statistic_id + len(p)), match_ids, match_ids, player_ids, player_ids,
+        *(column.astype(np.float64).tolist() for column in columns),
+    ))
+    return SeasonData(matches, statistics)
+
+async def prepare_schema():
+    """Crea las tablas que falten (base de datos vacía) y aplica las migraciones"""
+    async with engine.begin() as connection:
+        roles = ", ".join(f"'{role.value}'" for role in UserRole)
+        await connection.execute(text(
+            f"DO $$ BEGIN CREATE TYPE user_role AS ENUM ({roles}); "
+            f"EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+        ))
+        await connection.run_sync(SQLModel.metadata.create_all)
+    await run_migrations()
+
+async def ensure_disposable(force: bool = False):
+    """Se niega a vaciar una base de datos con usuarios registrados (salvo --force)"""
+    async with engine.connect() as connection:
+        users = (await connection.execute(
+            text("SELECT count(*) FROM users WHERE email NOT LIKE :bench"), {"bench": f"%@{BENCH_EMAIL_DOMAIN}"}
+        )).scalar()
+    if users and not force:
+        raise RuntimeError(
+            f"La base de datos tiene {users} usuarios: no parece una base de datos de benchmarks "
+            f"(usa --force para vaciarla igualmente)"
+        )
+
+def generate_league(config: LeagueConfig, today: Optional[date] = None) -> SyntheticLeague:
+    """Liga completa en memoria; las temporadas se generan de una en una al iterar"""
+    rng = np.random.default_rng(config.seed)
+    today = today or date.today()
+    teams = build_teams(config)
+    players = build_players(config, rng, today)
+    profiles = PlayerProfiles(rng, [player[5] for player in players])
+    team_strength = rng.normal(1.0, 0.03, config.teams)
+    last_year = today.year - 1  # todas las temporadas ya terminadas
+
+    def seasons() -> Iterator[SeasonData]:
+        next_match_id, next_statistic_id = 1, 1
+        for season in range(config.seasons):
+            data = generate_season(
+                config, rng, profiles, team_strength, last_year - config.seasons + 1 + season,
+                next_match_id, next_statistic_id
+            )
+            next_match_id += len(data.matches)
+            next_statistic_id += len(data.statistics)
+            yield data
+
+    return SyntheticLeague(teams, players, seasons())
+
+async def load_league(config: LeagueConfig, force: bool = False) -> Dict[str, float]:
+    """
+    Vacía las tablas de la liga y carga una liga sintética. Retorna el número
+    de filas por tabla y los tiempos de generación y carga
+    """
+    await prepare_schema()
+    await ensure_disposable(force)
+
+    league = generate_league(config)
+    summary = {"teams": len(league.teams), "players": len(league.players), "matches": 0, "match_statistics": 0}
+    generate_seconds = 0.0
+    start = time.time()
+    async with engine.begin() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+
+        await driver.execute(f"TRUNCATE {', '.join(LEAGUE_TABLES)} RESTART IDENTITY CASCADE")
+        await driver.copy_records_to_table("teams", records=league.teams, columns=TEAM_COLUMNS)
+        await driver.copy_records_to_table("players", records=league.players, columns=PLAYER_COLUMNS)
+
+        season_start = time.time()
+        for data in league.seasons:
+            generate_seconds += time.time() - season_start
+            await driver.copy_records_to_table("matches", records=data.matches, columns=MATCH_COLUMNS)
+            await driver.copy_records_to_table("match_statistics", records=data.statistics, columns=STATISTIC_COLUMNS)
+            summary["matches"] += len(data.matches)
+            summary["match_statistics"] += len(data.statistics)
+            season_start = time.time()
+
+        # Los ids se han insertado explícitamente: las secuencias siguen por el final
+        for table in ("teams", "players", "matches", "match_statistics"):
+            await driver.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            )
+        await driver.execute("SELECT refresh_team_game_stats(NULL)")
+        await driver.execute("SELECT refresh_match_top_performers(NULL)")
+
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE"))
+    async with SessionLocal() as session:
+        await bump_data_version(session)
+
+    summary["generate_seconds"] = round(generate_seconds, 2)
+    summary["load_seconds"] = round(time.time() - start - generate_seconds, 2)
+    return summary
+
+def main():
+    defaults = LeagueConfig()
+    parser = argparse.ArgumentParser(description="Carga una liga sintética para los benchmarks")
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=defaults.teams)
+    parser.add_argument("--players-per-team", type=int, default=defaults.players_per_team)
+    parser.add_argument("--games-per-team", type=int, default=defaults.games_per_team)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--reset", action="store_true", help="Confirma que se vacíen las tablas de la liga")
+    parser.add_argument("--force", action="store_true", help="Vacía la base de datos aunque tenga usuarios")
+    args = parser.parse_args()
+
+    if not args.reset:
+        parser.error("la carga vacía las tablas de la liga de DATABASE_URL: confírmalo con --reset")
+    config = LeagueConfig(args.teams, args.seasons, args.players_per_team, args.games_per_team, args.seed)
+    summary = asyncio.run(load_league(config, force=args.force))
+    print(
+        f"🏀 Liga sintética cargada: {summary['teams']} equipos, {summary['players']} jugadores, "
+        f"{summary['matches']} partidos, {summary['match_statistics']} estadísticas "
+        f"(generación {summary['generate_seconds']}s, carga {summary['load_seconds']}s)"
+    )
+
+if __name__ == "__main__":
+    main()
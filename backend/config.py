@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 
 
 
@@ -22,7 +23,16 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: str
     STRIPE_WEBHOOK_SECRET: str
 
+    # Opcional: backend compartido para la caché de resultados (p.ej. redis://...)
+    CACHE_BACKEND_URL: Optional[str] = None
 
-# @lru_cache
+    # Precarga de los almacenes en memoria (registro de partidos, métricas
+    # avanzadas) al arrancar. Solo para despliegues de larga duración: en
+    # serverless cada arranque en frío esperaría a la carga antes de responder
+    WARM_UP_ON_STARTUP: bool = False
+
+
+@lru_cache
 def get_settings():
-    return Settings()
\ No newline at end of file
+    """Settings del proceso: .env y el entorno se leen una sola vez"""
+    return Settings()
@@ -5,6 +5,7 @@ from database import get_db  # Change from get_session to get_db
 from security import decode_access_token
 from models import User, UserRole
 from crud import get_user_by_email
+from services.activity import activity_tracker
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_d
     user = await get_user_by_email(db, email)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
+    # Solo en memoria: last_seen_at se guarda por lotes en segundo plano
+    activity_tracker.mark_active(user.id)
     return user
 
 def require_role(*roles: UserRole):
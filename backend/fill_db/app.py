@@ -1,59 +1,37 @@
 import os
 import time
 import requests
-import psycopg2
 from psycopg2.extras import execute_values
-import re
-import csv
-import sys
-from difflib import SequenceMatcher
-
-# Usar dotenv directamente para el script de fill_db
-from dotenv import load_dotenv, find_dotenv
-
-# Cargar variables de entorno desde el archivo .env en el directorio backend
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-load_dotenv(env_path)
-
-print(f"Cargando .env desde: {env_path}")
-
-# Variables necesarias para el script
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-
-# Verificar que tenemos las variables esenciales
-required_vars = {
-    "DB_NAME": DB_NAME,
-    "DB_USER": DB_USER,
-    "DB_PASSWORD": DB_PASSWORD,
-    "DB_HOST": DB_HOST,
-    "DB_PORT": DB_PORT
-}
-
-missing_vars = [var for var, value in required_vars.items() if not value]
-if missing_vars:
-    print(f"❌ Faltan variables de entorno: {', '.join(missing_vars)}")
-    print("Variables encontradas:")
-    for var, value in required_vars.items():
-        print(f"  {var}: {'✅' if value else '❌'}")
-    sys.exit(1)
-
-print("✅ Variables de entorno cargadas correctamente")
-
-# Configuración de base de datos
-DB_CONFIG = {
-    'dbname': DB_NAME,
-    'user': DB_USER,
-    'password': DB_PASSWORD,
-    'host': DB_HOST,
-    'port': DB_PORT
-}
-
-# Conexión a PostgreSQL
-conn = psycopg2.connect(**DB_CONFIG)
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from db import get_connection
+from name_matcher import NameIndex, normalize_name
+from players_dataset import load_players_dataset
+
+# Ruta al archivo CSV del dataset de jugadores (NBA_PLAYERS_CSV o --dataset; '-' para stdin)
+DATASET_CSV_PATH = os.getenv("NBA_PLAYERS_CSV", r"C:\Users\practicas\Downloads\archive (6)\players.csv")
+
+# Fotos de NBA.com; la URL base se puede apuntar a un servidor local para pruebas
+NBA_HEADSHOT_BASE_URL = os.getenv(
+    "NBA_HEADSHOT_BASE_URL", "https://cdn.nba.com/headshots/nba/latest/1040x760"
+).rstrip("/")
+PLACEHOLDER_IMAGE_URL = f"{NBA_HEADSHOT_BASE_URL}/logoman.png"
+
+# Peticiones HEAD simultáneas como máximo (también es el tamaño del pool de conexiones)
+IMAGE_CHECK_WORKERS = int(os.getenv("IMAGE_CHECK_WORKERS", "16"))
+IMAGE_CHECK_TIMEOUT = 5
+
+# Conexión a PostgreSQL (se abre la primera vez que se necesita)
+_conn = None
+
+def get_conn():
+    global _conn
+    if _conn is None or _conn.closed:
+        _conn = get_connection()
+    return _conn
 
 # def fetch_teams():
 #     url = f"https://{API_HOST}/teams"
@@ -351,39 +329,13 @@ conn = psycopg2.connect(**DB_CONFIG)
 
 # print("Carga de match_statistics completada.")
 
-try:
-    conn = psycopg2.connect(**DB_CONFIG)
-    print("✅ Conexión a base de datos exitosa")
-except Exception as e:
-    print(f"❌ Error conectando a la base de datos: {e}")
-    sys.exit(1)
-
 def load_nba_players_dataset(csv_path):
     """
-    Carga el dataset CSV y crea un mapeo de nombres a playerid
+    Carga el dataset CSV (ruta, '-' para stdin, admite gzip) y crea un mapeo
+    compacto de nombres normalizados a playerid
     """
-    player_mapping = {}
-    
     try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Crear nombre completo
-                full_name = f"{row['fname']} {row['lname']}".strip()
-                player_id = row['playerid']
-                
-                # Almacenar en el mapeo
-                player_mapping[full_name.lower()] = player_id
-                
-                # También almacenar versiones alternativas del nombre
-                # Sin sufijos (Jr., Sr., etc.)
-                clean_name = re.sub(r'\s+(Jr\.?|Sr\.?|III|II|IV)$', '', full_name, flags=re.IGNORECASE)
-                if clean_name.lower() != full_name.lower():
-                    player_mapping[clean_name.lower()] = player_id
-        
-        print(f"✅ Cargados {len(player_mapping)} jugadores del dataset")
-        return player_mapping
-        
+        return load_players_dataset(csv_path)
     except FileNotFoundError:
         print(f"❌ No se encontró el archivo CSV: {csv_path}")
         return {}
@@ -395,75 +347,100 @@ def normalize_name_for_matching(name):
     """
     Normaliza nombres para mejorar el matching
     """
-    # Eliminar sufijos
-    name = re.sub(r'\s+(Jr\.?|Sr\.?|III|II|IV)$', '', name, flags=re.IGNORECASE)
-    
-    # Limpiar caracteres especiales y convertir a minúsculas
-    name = re.sub(r'[^\w\s]', '', name.lower())
-    
-    # Eliminar espacios extra
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    return name
+    return normalize_name(name)
 
-def find_best_match(db_name, player_mapping, threshold=0.8):
+def find_best_match(db_name, name_index, threshold=0.8):
     """
-    Encuentra la mejor coincidencia para un nombre de la base de datos
+    Encuentra la mejor coincidencia para un nombre de la base de datos.
+    Retorna un NameMatch (id, nombre, similitud) o None
     """
-    normalized_db_name = normalize_name_for_matching(db_name)
-    
-    # Búsqueda exacta primero
-    if normalized_db_name in player_mapping:
-        return player_mapping[normalized_db_name]
-    
-    # Búsqueda por similitud
-    best_match = None
-    best_score = 0
-    
-    for csv_name, player_id in player_mapping.items():
-        # Calcular similitud
-        similarity = SequenceMatcher(None, normalized_db_name, csv_name).ratio()
-        
-        if similarity > best_score and similarity >= threshold:
-            best_score = similarity
-            best_match = player_id
-    
-    return best_match
+    return name_index.match(db_name, threshold)
+
+def nba_image_url(player_id):
+    return f"{NBA_HEADSHOT_BASE_URL}/{player_id}.png"
 
-def verify_nba_image_exists(player_id):
+def create_http_session(pool_size=IMAGE_CHECK_WORKERS):
+    """
+    Sesión HTTP compartida: keep-alive con un pool del tamaño de la concurrencia
+    y reintentos con backoff exponencial ante errores transitorios o 429
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["HEAD"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def verify_nba_image_exists(player_id, session=None):
     """
     Verifica si existe la imagen de NBA.com para el ID dado
     """
-    image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
+    http = session or requests
     try:
-        response = requests.head(image_url, timeout=5)
+        response = http.head(nba_image_url(player_id), timeout=IMAGE_CHECK_TIMEOUT)
         return response.status_code == 200
-    except:
+    except requests.RequestException:
         return False
 
-def update_player_images_with_dataset():
+def verify_nba_images(player_ids, max_workers=IMAGE_CHECK_WORKERS, session=None):
+    """
+    Verifica en paralelo (como mucho max_workers peticiones a la vez) las
+    imágenes de varios IDs de NBA.com. Retorna {player_id: existe}
+    """
+    unique_ids = list(dict.fromkeys(player_ids))
+    own_session = session is None
+    if own_session:
+        session = create_http_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nba-img") as executor:
+            results = executor.map(lambda player_id: verify_nba_image_exists(player_id, session), unique_ids)
+            return dict(zip(unique_ids, results))
+    finally:
+        if own_session:
+            session.close()
+
+def update_player_image_urls(cur, updates):
+    """
+    Guarda las URLs [(id, url_pic), ...] con un único UPDATE ... FROM (VALUES ...)
+    """
+    if not updates:
+        return 0
+    execute_values(cur, """
+        UPDATE players AS p
+        SET url_pic = v.url_pic
+        FROM (VALUES %s) AS v(id, url_pic)
+        WHERE p.id = v.id
+    """, updates, page_size=1000)
+    return len(updates)
+
+def update_player_images_with_dataset(csv_path=DATASET_CSV_PATH, limit=None, max_workers=IMAGE_CHECK_WORKERS):
     """
     Actualiza las URLs de imágenes usando el dataset CSV para mapear nombres a IDs de NBA.com
     """
-    # Ruta al archivo CSV (ajustar según tu ubicación)
-    csv_path = r"C:\Users\practicas\Downloads\archive (6)\players.csv"
-    
     # Cargar el mapeo de jugadores
     player_mapping = load_nba_players_dataset(csv_path)
     
     if not player_mapping:
         print("❌ No se pudo cargar el dataset. Abortando.")
         return
+    name_index = NameIndex(player_mapping)
     
+    conn = get_conn()
     with conn.cursor() as cur:
         # Obtener jugadores sin imagen
         cur.execute("""
-            SELECT id, name, rapidapi_id 
+            SELECT id, name 
             FROM players 
             WHERE url_pic IS NULL OR url_pic = ''
             ORDER BY id
-            LIMIT 500
-        """)  # Procesar más jugadores ya que es más eficiente
+            LIMIT %s
+        """, (limit,))  # LIMIT NULL = todos
         
         players = cur.fetchall()
         
@@ -472,85 +449,66 @@ def update_player_images_with_dataset():
             return
         
         print(f"Procesando {len(players)} jugadores...")
-        
-        updated_count = 0
+
+        # 1) Matching de nombres (local, con el índice)
+        start = time.perf_counter()
+        matches = dict(zip(
+            (player_id for player_id, _ in players),
+            name_index.match_many(name for _, name in players)
+        ))
+        print(f"🔎 {len(players)} nombres emparejados en {time.perf_counter() - start:.2f}s")
+
+        # 2) Verificación de imágenes en paralelo
+        start = time.perf_counter()
+        exists = verify_nba_images(
+            [match.player_id for match in matches.values() if match], max_workers=max_workers
+        )
+        elapsed = time.perf_counter() - start
+        print(f"🌐 {len(exists)} imágenes verificadas en {elapsed:.2f}s ({len(exists) / elapsed if elapsed else 0:.0f}/s)")
+
+        updates = []
         exact_matches = 0
         fuzzy_matches = 0
         failed_count = 0
         
-        for player_id, name, rapidapi_id in players:
-            print(f"🏀 Procesando: {name}")
+        for player_id, name in players:
+            match = matches[player_id]
+            nba_player_id = match.player_id if match else None
             
-            # Buscar coincidencia en el dataset
-            nba_player_id = find_best_match(name, player_mapping)
-            
-            if nba_player_id:
-                # Verificar si la imagen existe
-                if verify_nba_image_exists(nba_player_id):
-                    image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{nba_player_id}.png"
-                    print(f"  ✅ Imagen encontrada con ID {nba_player_id}: {image_url}")
-                    
-                    # Actualizar en base de datos
-                    cur.execute("""
-                        UPDATE players 
-                        SET url_pic = %s 
-                        WHERE id = %s
-                    """, (image_url, player_id))
-                    
-                    updated_count += 1
-                    
-                    # Verificar tipo de coincidencia
-                    normalized_name = normalize_name_for_matching(name)
-                    if normalized_name in player_mapping:
-                        exact_matches += 1
-                    else:
-                        fuzzy_matches += 1
+            if nba_player_id and exists.get(nba_player_id):
+                updates.append((player_id, nba_image_url(nba_player_id)))
+                
+                # Verificar tipo de coincidencia
+                if match.score == 1.0:
+                    exact_matches += 1
                 else:
-                    print(f"  ⚠️ ID encontrado ({nba_player_id}) pero imagen no existe para: {name}")
-                    failed_count += 1
+                    fuzzy_matches += 1
             else:
-                print(f"  ❌ No se encontró coincidencia para: {name}")
+                if nba_player_id:
+                    print(f"  ⚠️ ID encontrado ({nba_player_id}) pero imagen no existe para: {name}")
+                else:
+                    print(f"  ❌ No se encontró coincidencia para: {name}")
+                # Los jugadores que no encontramos se quedan con el placeholder
+                updates.append((player_id, PLACEHOLDER_IMAGE_URL))
                 failed_count += 1
-            
-            # Pausa breve para no sobrecargar
-            time.sleep(0.5)
         
-        # Actualizar jugadores que no encontramos con placeholder
-        if failed_count > 0:
-            print(f"\n🔄 Actualizando {failed_count} jugadores sin imagen con placeholder...")
-            
-            cur.execute("""
-                SELECT id, name 
-                FROM players 
-                WHERE url_pic IS NULL OR url_pic = ''
-                LIMIT %s
-            """, (failed_count,))
-            
-            failed_players = cur.fetchall()
-            
-            for player_id, name in failed_players:
-                placeholder_url = "https://cdn.nba.com/headshots/nba/latest/1040x760/logoman.png"
-                cur.execute("""
-                    UPDATE players 
-                    SET url_pic = %s 
-                    WHERE id = %s
-                """, (placeholder_url, player_id))
+        update_player_image_urls(cur, updates)
     
     conn.commit()
     
+    updated_count = len(players) - failed_count
     print(f"\n📊 Resumen:")
     print(f"  - Imágenes encontradas: {updated_count}")
     print(f"    • Coincidencias exactas: {exact_matches}")
     print(f"    • Coincidencias aproximadas: {fuzzy_matches}")
-    print(f"  - No encontrados: {failed_count}")
+    print(f"  - No encontrados (placeholder): {failed_count}")
     print(f"  - Total procesados: {len(players)}")
     print(f"  - Tasa de éxito: {(updated_count/len(players)*100):.1f}%")
 
-def test_dataset_matching():
+def test_dataset_matching(csv_path=DATASET_CSV_PATH):
     """
     Función de prueba para verificar el matching del dataset
     """
-    csv_path = r"C:\Users\practicas\Downloads\archive (6)\players.csv"
     player_mapping = load_nba_players_dataset(csv_path)
     
     # Algunos nombres de prueba
@@ -562,21 +520,33 @@ def test_dataset_matching():
         "Giannis Antetokounmpo"
     ]
     
+    name_index = NameIndex(player_mapping)
+    matches = {name: find_best_match(name, name_index) for name in test_names}
+    exists = verify_nba_images([match.player_id for match in matches.values() if match])
+
     print("\n🧪 Probando matching del dataset:")
-    for name in test_names:
-        player_id = find_best_match(name, player_mapping)
-        if player_id:
-            image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
-            exists = verify_nba_image_exists(player_id)
-            print(f"  {name} → ID: {player_id}, Imagen existe: {'✅' if exists else '❌'}")
+    for name, match in matches.items():
+        if match:
+            player_id = match.player_id
+            print(
+                f"  {name} → ID: {player_id} ({match.score:.2f}), "
+                f"Imagen existe: {'✅' if exists.get(player_id) else '❌'}"
+            )
         else:
             print(f"  {name} → ❌ No encontrado")
 
 # Ejecutar la función automáticamente
 if __name__ == "__main__":
-    # Primero hacer una prueba
-    test_dataset_matching()
+    parser = argparse.ArgumentParser(description="Actualiza las fotos de los jugadores con el dataset de NBA.com")
+    parser.add_argument("--dataset", default=DATASET_CSV_PATH, help="CSV del dataset (o .csv.gz, o '-' para stdin)")
+    parser.add_argument("--limit", type=int, help="Máximo de jugadores a procesar")
+    parser.add_argument("--skip-test", action="store_true", help="No ejecutar la prueba de matching previa")
+    args = parser.parse_args()
+
+    # Primero hacer una prueba (stdin solo se puede leer una vez)
+    if not args.skip_test and args.dataset != "-":
+        test_dataset_matching(args.dataset)
     
     # Luego ejecutar la actualización completa
     print("\n" + "="*50)
-    update_player_images_with_dataset()
\ No newline at end of file
+    update_player_images_with_dataset(args.dataset, limit=args.limit)
@@ -0,0 +1,125 @@
+"""
+Benchmark de precisión y rendimiento de NameIndex con nombres sintéticos.
+
+Genera un dataset de N jugadores y consultas con variaciones realistas
+(erratas, acentos, sufijos, iniciales, nombres ausentes) y compara el índice
+con la búsqueda lineal de SequenceMatcher sobre una muestra.
+
+Uso:
+    python bench_name_matcher.py --dataset 5000 --queries 2000
+"""
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from name_matcher import NameIndex, normalize_name
+
+SYLLABLES = [
+    "ka", "lo", "mi", "dar", "ren", "jo", "an", "te", "vin", "sha", "qui", "el",
+    "ro", "ma", "nu", "bi", "za", "ton", "lee", "gio", "ste", "phen", "ky", "rie",
+]
+ACCENTS = str.maketrans("aeioun", "áéíóúñ")
+
+def synthetic_name(rng):
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+    last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{first} {last}"
+
+def typo(rng, name):
+    position = rng.randrange(1, len(name) - 1)
+    operation = rng.choice(("drop", "swap", "replace"))
+    if operation == "drop":
+        return name[:position] + name[position + 1:]
+    if operation == "swap":
+        return name[:position - 1] + name[position] + name[position - 1] + name[position + 1:]
+    return name[:position] + rng.choice("aeiou") + name[position + 1:]
+
+def variant(rng, name):
+    kind = rng.choice(("exact", "typo", "accent", "suffix", "punctuation"))
+    if kind == "typo":
+        return typo(rng, name)
+    if kind == "accent":
+        return name.translate(ACCENTS)
+    if kind == "suffix":
+        return f"{name} {rng.choice(('Jr.', 'III', 'Sr'))}"
+    if kind == "punctuation":
+        first, last = name.split(" ", 1)
+        return f"{first[0]}.{first[1:]} {last}"
+    return name
+
+def build_dataset(size, queries, seed):
+    rng = random.Random(seed)
+    names = {}
+    while len(names) < size:
+        names.setdefault(synthetic_name(rng), len(names) + 1)
+    dataset = list(names.items())
+
+    cases = []
+    for _ in range(queries):
+        if rng.random() < 0.1:
+            cases.append((synthetic_name(rng) + " Zz", None))  # jugador que no está en el dataset
+        else:
+            name, player_id = rng.choice(dataset)
+            cases.append((variant(rng, name), player_id))
+    return names, cases
+
+def linear_match(name, mapping, threshold):
+    """La búsqueda lineal original (para comparar)"""
+    normalized = normalize_name(name)
+    if normalized in mapping:
+        return mapping[normalized]
+    best_match, best_score = None, 0
+    for csv_name, player_id in mapping.items():
+        similarity = SequenceMatcher(None, normalized, csv_name).ratio()
+        if similarity > best_score and similarity >= threshold:
+            best_score, best_match = similarity, player_id
+    return best_match
+
+def accuracy(results, cases):
+    return sum(1 for result, (_, expected) in zip(results, cases) if result == expected) / len(cases) * 100
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice de nombres")
+    parser.add_argument("--dataset", type=int, default=5000, help="Jugadores en el dataset")
+    parser.add_argument("--queries", type=int, default=2000, help="Nombres a emparejar")
+    parser.add_argument("--linear-sample", type=int, default=200, help="Consultas para la búsqueda lineal")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    names, cases = build_dataset(args.dataset, args.queries, args.seed)
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = index.match_many((name for name, _ in cases), args.threshold)
+    index_seconds = time.perf_counter() - start
+    index_results = [match.player_id if match else None for match in matches]
+
+    sample = cases[:args.linear_sample]
+    mapping = {normalize_name(name): player_id for name, player_id in names.items()}
+    start = time.perf_counter()
+    linear_results = [linear_match(name, mapping, args.threshold) for name, _ in sample]
+    linear_seconds = time.perf_counter() - start
+
+    index_per_query = index_seconds / len(cases) * 1000
+    linear_per_query = linear_seconds / len(sample) * 1000
+    print(f"📚 Dataset: {len(index)} nombres (índice construido en {build_seconds:.2f}s)")
+    print(
+        f"⚡ Índice: {len(cases)} consultas en {index_seconds:.2f}s "
+        f"({len(cases) / index_seconds:,.0f}/s, {index_per_query:.3f}ms/consulta), "
+        f"precisión {accuracy(index_results, cases):.1f}%"
+    )
+    print(
+        f"🐢 Lineal: {len(sample)} consultas en {linear_seconds:.2f}s "
+        f"({linear_per_query:.3f}ms/consulta), precisión {accuracy(linear_results, sample):.1f}%"
+    )
+    agreement = sum(1 for a, b in zip(index_results, linear_results) if a == b) / len(sample) * 100
+    print(f"🤝 Coincidencia índice/lineal en la muestra: {agreement:.1f}%")
+    print(f"🚀 Aceleración por consulta: x{linear_per_query / index_per_query:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import psycopg2
+
+# Usar dotenv directamente para los scripts de fill_db
+from dotenv import load_dotenv
+
+# Cargar variables de entorno desde el archivo .env en el directorio backend
+env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+load_dotenv(env_path)
+
+REQUIRED_VARS = ("DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST", "DB_PORT")
+
+def get_db_config():
+    """
+    Devuelve la configuración de conexión a PostgreSQL o termina el script
+    si falta alguna variable de entorno
+    """
+    values = {var: os.getenv(var) for var in REQUIRED_VARS}
+
+    missing_vars = [var for var, value in values.items() if not value]
+    if missing_vars:
+        print(f"❌ Faltan variables de entorno: {', '.join(missing_vars)} (cargando .env desde: {env_path})")
+        print("Variables encontradas:")
+        for var, value in values.items():
+            print(f"  {var}: {'✅' if value else '❌'}")
+        sys.exit(1)
+
+    return {
+        'dbname': values["DB_NAME"],
+        'user': values["DB_USER"],
+        'password': values["DB_PASSWORD"],
+        'host': values["DB_HOST"],
+        'port': values["DB_PORT"]
+    }
+
+def get_connection():
+    """Abre una conexión nueva a PostgreSQL"""
+    try:
+        conn = psycopg2.connect(**get_db_config())
+        print("✅ Conexión a base de datos exitosa")
+        return conn
+    except psycopg2.Error as e:
+        print(f"❌ Error conectando a la base de datos: {e}")
+        sys.exit(1)
@@ -0,0 +1,655 @@
+"""
+Ingesta masiva de equipos, jugadores, partidos y estadísticas.
+
+Cada fichero CSV se vuelca con COPY FROM STDIN a una tabla temporal y después
+se fusiona con la tabla real mediante UPSERTs por conjuntos, todo en una
+única transacción. Los ficheros usan los ids de la API (rapidapi_id) y la
+cabecera puede traer las columnas en cualquier orden; las opcionales pueden
+omitirse.
+
+Con --incremental solo se procesan los partidos (y sus estadísticas) posteriores
+a la marca de agua de su temporada menos unos días de margen, de modo que la
+ingesta diaria del fichero de temporada completo solo toca lo nuevo o cambiado.
+Los totales por equipo y partido (team_game_stats, migración 003) y los top
+performers de la landing (match_top_performers, migración 007) se recalculan
+para los partidos tocados dentro de la misma transacción.
+Los ids de partidos, jugadores y equipos afectados se pueden volcar a JSON
+para refrescar agregados y cachés de forma selectiva.
+
+Uso:
+    python ingest.py --dir ./season_2024        # teams.csv, players.csv, matches.csv, statistics.csv
+    python ingest.py --statistics stats.csv.gz  # cualquier subconjunto de ficheros
+    python ingest.py --dir ./season_2024 --dry-run
+    python ingest.py --dir ./season_2024 --incremental --affected-out affected.json
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+
+import psycopg2
+
+from db import get_connection
+
+DEFAULT_BIRTH = "1970-01-01"
+
+# Días anteriores a la marca de agua que se vuelven a revisar en modo incremental
+# (correcciones de marcadores y estadísticas que llegan tarde)
+DEFAULT_LOOKBACK_DAYS = 3
+
+STAT_COLUMNS = (
+    "points", "rebounds", "assists", "steals", "blocks", "minutes_played",
+    "field_goals_attempted", "field_goals_made", "three_points_made",
+    "three_points_attempted", "free_throws_made", "free_throws_attempted",
+    "fouls", "turnovers", "off_rebounds", "def_rebounds", "minutes", "plusminus",
+)
+
+# Tablas de staging: columnas admitidas (con su tipo), obligatorias y clave natural
+STAGES = {
+    "teams": {
+        "columns": {
+            "rapidapi_id": "integer", "full_name": "text", "abbreviation": "text",
+            "conference": "text", "division": "text", "stadium": "text", "city": "text",
+        },
+        "required": ("rapidapi_id", "full_name", "abbreviation"),
+        "key": ("rapidapi_id",),
+    },
+    "players": {
+        "columns": {
+            "rapidapi_id": "integer", "name": "text", "birth_date": "date", "height": "double precision",
+            "weight": "double precision", "position": "text", "number": "integer",
+            "team_rapidapi_id": "integer", "url_pic": "text",
+        },
+        "required": ("rapidapi_id", "name"),
+        "key": ("rapidapi_id",),
+    },
+    "matches": {
+        "columns": {
+            "rapidapi_id": "integer", "date": "date", "season": "text",
+            "home_team_rapidapi_id": "integer", "away_team_rapidapi_id": "integer",
+            "home_score": "integer", "away_score": "integer",
+        },
+        "required": ("rapidapi_id", "date", "home_team_rapidapi_id", "away_team_rapidapi_id"),
+        "key": ("rapidapi_id",),
+    },
+    "statistics": {
+        "columns": {
+            "match_rapidapi_id": "integer", "player_rapidapi_id": "integer",
+            **{column: "double precision" for column in STAT_COLUMNS},
+        },
+        "required": ("match_rapidapi_id", "player_rapidapi_id"),
+        "key": ("match_rapidapi_id", "player_rapidapi_id"),
+    },
+}
+
+# Ventana con la que refresh_team_game_stats() deduce el equipo de cada jugador
+# (SIDE_WINDOW_DAYS en services/match_sides.py)
+SIDE_WINDOW_DAYS = 30
+
+# Mismo UPSERT que services/data_version.py: invalida las cachés de la API
+BUMP_DATA_VERSION_SQL = """
+    INSERT INTO data_versions (name, version, updated_at)
+    VALUES ('global', 1, now())
+    ON CONFLICT (name) DO UPDATE
+    SET version = data_versions.version + 1, updated_at = now()
+    RETURNING version
+"""
+
+class IngestReport:
+    """Filas leídas/insertadas/actualizadas/descartadas por fichero y tiempos"""
+
+    def __init__(self):
+        self.rows = {}
+        self.timings = {}
+        self.affected_match_ids = set()
+        self.affected_player_ids = set()
+        self.affected_team_ids = set()
+
+    def add(self, stage, **counts):
+        stage_counts = self.rows.setdefault(
+            stage, {"read": 0, "filtered": 0, "inserted": 0, "updated": 0, "skipped": 0}
+        )
+        for name, value in counts.items():
+            stage_counts[name] += value
+
+    def timed(self, name, start):
+        self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def changed(self):
+        return any(counts["inserted"] or counts["updated"] for counts in self.rows.values())
+
+    def affected(self):
+        return {
+            "match_ids": sorted(self.affected_match_ids),
+            "player_ids": sorted(self.affected_player_ids),
+            "team_ids": sorted(self.affected_team_ids),
+        }
+
+    def print_summary(self, total_seconds):
+        print("\n📊 Resumen de la ingesta:")
+        for stage, counts in self.rows.items():
+            print(
+                f"  - {stage}: {counts['read']} leídas, {counts['filtered']} anteriores a la marca de agua, "
+                f"{counts['inserted']} insertadas, "
+                f"{counts['updated']} actualizadas, {counts['skipped']} descartadas"
+            )
+        for name, seconds in self.timings.items():
+            print(f"  ⏱️ {name}: {seconds:.2f}s")
+        total_rows = sum(counts["read"] for counts in self.rows.values())
+        rate = total_rows / total_seconds if total_seconds > 0 else 0
+        print(f"  - Total: {total_rows} filas en {total_seconds:.2f}s ({rate:,.0f} filas/s)")
+        print(
+            f"  - Afectados: {len(self.affected_match_ids)} partidos, "
+            f"{len(self.affected_player_ids)} jugadores, {len(self.affected_team_ids)} equipos"
+        )
+
+def open_csv(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+def create_stage_table(cur, stage):
+    spec = STAGES[stage]
+    columns = ", ".join(f"{name} {sql_type}" for name, sql_type in spec["columns"].items())
+    cur.execute(f"CREATE TEMP TABLE stage_{stage} ({columns}) ON COMMIT DROP")
+
+def copy_stage(cur, stage, path, report):
+    """Vuelca un CSV a su tabla de staging con COPY; retorna las filas copiadas"""
+    spec = STAGES[stage]
+    start = time.perf_counter()
+    with open_csv(path) as file:
+        header = [column.strip() for column in next(csv.reader([file.readline()]), [])]
+        unknown = [column for column in header if column not in spec["columns"]]
+        missing = [column for column in spec["required"] if column not in header]
+        if unknown or missing:
+            raise ValueError(
+                f"{path}: columnas desconocidas {unknown or '-'}, columnas obligatorias ausentes {missing or '-'}"
+            )
+        # COPY continúa desde la posición actual del fichero (la cabecera ya se ha leído)
+        cur.copy_expert(f"COPY stage_{stage} ({', '.join(header)}) FROM STDIN WITH (FORMAT csv)", file)
+        copied = cur.rowcount
+
+    # Si una clave aparece varias veces gana la última fila del fichero
+    key_match = " AND ".join(f"a.{column} = b.{column}" for column in spec["key"])
+    cur.execute(f"DELETE FROM stage_{stage} a USING stage_{stage} b WHERE {key_match} AND a.ctid < b.ctid")
+    cur.execute(f"DELETE FROM stage_{stage} WHERE {' OR '.join(f'{column} IS NULL' for column in spec['key'])}")
+
+    report.add(stage, read=copied)
+    report.timed(f"COPY {stage}", start)
+    print(f"📥 {stage}: {copied} filas copiadas desde {path}")
+    return copied
+
+def count_inserted_updated(rows):
+    inserted = sum(1 for row in rows if row[0])
+    return inserted, len(rows) - inserted
+
+def merge_teams(cur, report):
+    cur.execute("""
+        INSERT INTO teams (rapidapi_id, full_name, abbreviation, conference, division, stadium, city)
+        SELECT rapidapi_id, full_name, abbreviation, conference, division, stadium, city
+        FROM stage_teams
+        ON CONFLICT (rapidapi_id) DO UPDATE
+        SET full_name = EXCLUDED.full_name,
+            abbreviation = EXCLUDED.abbreviation,
+            conference = COALESCE(EXCLUDED.conference, teams.conference),
+            division = COALESCE(EXCLUDED.division, teams.division),
+            stadium = COALESCE(EXCLUDED.stadium, teams.stadium),
+            city = COALESCE(EXCLUDED.city, teams.city)
+        WHERE (teams.full_name, teams.abbreviation, teams.conference, teams.division, teams.stadium, teams.city)
+              IS DISTINCT FROM
+              (EXCLUDED.full_name, EXCLUDED.abbreviation,
+               COALESCE(EXCLUDED.conference, teams.conference), COALESCE(EXCLUDED.division, teams.division),
+               COALESCE(EXCLUDED.stadium, teams.stadium), COALESCE(EXCLUDED.city, teams.city))
+        RETURNING (xmax = 0), id
+    """)
+    rows = cur.fetchall()
+    inserted, updated = count_inserted_updated(rows)
+    report.affected_team_ids.update(row[1] for row in rows)
+    report.add("teams", inserted=inserted, updated=updated)
+
+def build_player_map(cur, staged):
+    """
+    players no guarda el id de la API: la correspondencia rapidapi → interno
+    se obtiene de match_statistics (solo para los ids que trae la ingesta)
+    """
+    sources = []
+    if "players" in staged:
+        sources.append("SELECT rapidapi_id FROM stage_players")
+    if "statistics" in staged:
+        sources.append("SELECT player_rapidapi_id FROM stage_statistics")
+    cur.execute(f"""
+        CREATE TEMP TABLE player_map ON COMMIT DROP AS
+        SELECT DISTINCT ON (player_rapidapi_id) player_rapidapi_id AS rapidapi_id, player_id
+        FROM match_statistics
+        WHERE player_rapidapi_id IN ({' UNION '.join(sources)})
+        ORDER BY player_rapidapi_id, id DESC
+    """)
+    cur.execute("CREATE UNIQUE INDEX ON player_map (rapidapi_id)")
+
+def merge_players(cur, report):
+    cur.execute("ALTER TABLE stage_players ADD COLUMN player_id integer, ADD COLUMN is_new boolean DEFAULT false")
+    cur.execute("UPDATE stage_players s SET player_id = m.player_id FROM player_map m WHERE m.rapidapi_id = s.rapidapi_id")
+
+    # Jugadores sin estadísticas todavía: por nombre, si es único y no pertenece a otro id de la API
+    cur.execute("""
+        UPDATE stage_players s
+        SET player_id = p.id
+        FROM (SELECT min(id) AS id, lower(name) AS name FROM players GROUP BY lower(name) HAVING count(*) = 1) p
+        WHERE s.player_id IS NULL AND p.name = lower(s.name)
+          AND NOT EXISTS (
+              SELECT 1 FROM match_statistics t WHERE t.player_id = p.id AND t.player_rapidapi_id <> s.rapidapi_id
+          )
+    """)
+
+    # Jugadores nuevos: se reservan sus ids para poder enlazar sus estadísticas en esta misma ingesta
+    cur.execute("""
+        UPDATE stage_players
+        SET player_id = nextval(pg_get_serial_sequence('players', 'id')), is_new = true
+        WHERE player_id IS NULL
+    """)
+    cur.execute("""
+        INSERT INTO player_map (rapidapi_id, player_id)
+        SELECT rapidapi_id, player_id FROM stage_players s
+        WHERE NOT EXISTS (SELECT 1 FROM player_map m WHERE m.rapidapi_id = s.rapidapi_id)
+    """)
+
+    cur.execute(f"""
+        INSERT INTO players (id, name, birth_date, height, weight, position, number, current_team_id, url_pic)
+        SELECT s.player_id, s.name, COALESCE(s.birth_date, DATE '{DEFAULT_BIRTH}'), s.height, s.weight,
+               COALESCE(s.position, ''), s.number, t.id, s.url_pic
+        FROM stage_players s
+        LEFT JOIN teams t ON t.rapidapi_id = s.team_rapidapi_id
+        WHERE s.is_new
+        RETURNING id, current_team_id
+    """)
+    inserted_rows = cur.fetchall()
+
+    cur.execute("""
+        UPDATE players p
+        SET name = s.name,
+            birth_date = COALESCE(s.birth_date, p.birth_date),
+            height = COALESCE(s.height, p.height),
+            weight = COALESCE(s.weight, p.weight),
+            position = COALESCE(s.position, p.position),
+            number = COALESCE(s.number, p.number),
+            current_team_id = COALESCE(t.id, p.current_team_id),
+            url_pic = COALESCE(s.url_pic, p.url_pic)
+        FROM stage_players s
+        LEFT JOIN teams t ON t.rapidapi_id = s.team_rapidapi_id
+        WHERE p.id = s.player_id AND NOT s.is_new
+          AND (p.name, p.birth_date, p.height, p.weight, p.position, p.number, p.current_team_id, p.url_pic)
+              IS DISTINCT FROM
+              (s.name, COALESCE(s.birth_date, p.birth_date), COALESCE(s.height, p.height),
+               COALESCE(s.weight, p.weight), COALESCE(s.position, p.position), COALESCE(s.number, p.number),
+               COALESCE(t.id, p.current_team_id), COALESCE(s.url_pic, p.url_pic))
+        RETURNING p.id, p.current_team_id
+    """)
+    updated_rows = cur.fetchall()
+
+    for player_id, team_id in inserted_rows + updated_rows:
+        report.affected_player_ids.add(player_id)
+        if team_id is not None:
+            report.affected_team_ids.add(team_id)
+    report.add("players", inserted=len(inserted_rows), updated=len(updated_rows))
+
+def merge_matches(cur, report):
+    cur.execute("""
+        SELECT count(*) FROM stage_matches s
+        WHERE NOT EXISTS (SELECT 1 FROM teams t WHERE t.rapidapi_id = s.home_team_rapidapi_id)
+           OR NOT EXISTS (SELECT 1 FROM teams t WHERE t.rapidapi_id = s.away_team_rapidapi_id)
+    """)
+    skipped = cur.fetchone()[0]
+    if skipped:
+        print(f"⚠️ {skipped} partidos sin mapeo de equipos, se omiten")
+
+    cur.execute("""
+        INSERT INTO matches (rapidapi_id, date, season, home_team_id, home_team_rapidapi_id,
+                             away_team_id, away_team_rapidapi_id, home_score, away_score)
+        SELECT s.rapidapi_id, s.date, s.season, h.id, s.home_team_rapidapi_id,
+               a.id, s.away_team_rapidapi_id, s.home_score, s.away_score
+        FROM stage_matches s
+        JOIN teams h ON h.rapidapi_id = s.home_team_rapidapi_id
+        JOIN teams a ON a.rapidapi_id = s.away_team_rapidapi_id
+        ON CONFLICT (rapidapi_id) DO UPDATE
+        SET date = EXCLUDED.date,
+            season = COALESCE(EXCLUDED.season, matches.season),
+            home_team_id = EXCLUDED.home_team_id,
+            home_team_rapidapi_id = EXCLUDED.home_team_rapidapi_id,
+            away_team_id = EXCLUDED.away_team_id,
+            away_team_rapidapi_id = EXCLUDED.away_team_rapidapi_id,
+            home_score = COALESCE(EXCLUDED.home_score, matches.home_score),
+            away_score = COALESCE(EXCLUDED.away_score, matches.away_score)
+        WHERE (matches.date, matches.season, matches.home_team_id, matches.away_team_id,
+               matches.home_score, matches.away_score)
+              IS DISTINCT FROM
+              (EXCLUDED.date, COALESCE(EXCLUDED.season, matches.season), EXCLUDED.home_team_id,
+               EXCLUDED.away_team_id, COALESCE(EXCLUDED.home_score, matches.home_score),
+               COALESCE(EXCLUDED.away_score, matches.away_score))
+        RETURNING (xmax = 0), id
+    """)
+    rows = cur.fetchall()
+    inserted, updated = count_inserted_updated(rows)
+    report.affected_match_ids.update(row[1] for row in rows)
+    report.add("matches", inserted=inserted, updated=updated, skipped=skipped)
+
+def merge_statistics(cur, report):
+    stat_list = ", ".join(STAT_COLUMNS)
+    cur.execute(f"""
+        CREATE TEMP TABLE resolved_statistics ON COMMIT DROP AS
+        SELECT m.id AS match_id, s.match_rapidapi_id, pm.player_id, s.player_rapidapi_id, {
+            ", ".join(f"s.{column}" for column in STAT_COLUMNS)
+        }
+        FROM stage_statistics s
+        JOIN matches m ON m.rapidapi_id = s.match_rapidapi_id
+        JOIN player_map pm ON pm.rapidapi_id = s.player_rapidapi_id
+    """)
+    resolved = cur.rowcount
+    cur.execute("SELECT count(*) FROM stage_statistics")
+    skipped = cur.fetchone()[0] - resolved
+    if skipped:
+        print(f"⚠️ {skipped} estadísticas sin mapeo de partido o jugador, se omiten")
+
+    cur.execute(f"""
+        UPDATE match_statistics t
+        SET {", ".join(f"{column} = COALESCE(r.{column}, t.{column})" for column in STAT_COLUMNS)}
+        FROM resolved_statistics r
+        WHERE t.match_id = r.match_id AND t.player_id = r.player_id
+          AND ({", ".join(f"t.{column}" for column in STAT_COLUMNS)})
+              IS DISTINCT FROM
+              ({", ".join(f"COALESCE(r.{column}, t.{column})" for column in STAT_COLUMNS)})
+        RETURNING t.match_id, t.player_id
+    """)
+    updated_rows = cur.fetchall()
+
+    cur.execute(f"""
+        INSERT INTO match_statistics (match_id, match_rapidapi_id, player_id, player_rapidapi_id, {stat_list})
+        SELECT r.match_id, r.match_rapidapi_id, r.player_id, r.player_rapidapi_id, {
+            ", ".join(f"r.{column}" for column in STAT_COLUMNS)
+        }
+        FROM resolved_statistics r
+        WHERE NOT EXISTS (
+            SELECT 1 FROM match_statistics t WHERE t.match_id = r.match_id AND t.player_id = r.player_id
+        )
+        RETURNING match_id, player_id
+    """)
+    inserted_rows = cur.fetchall()
+
+    for match_id, player_id in updated_rows + inserted_rows:
+        report.affected_match_ids.add(match_id)
+        report.affected_player_ids.add(player_id)
+    report.add("statistics", inserted=len(inserted_rows), updated=len(updated_rows), skipped=skipped)
+
+def ensure_ingest_state_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            season VARCHAR(20) PRIMARY KEY,
+            last_match_date DATE NOT NULL,
+            last_match_rapidapi_id INTEGER NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+        )
+    """)
+
+def apply_incremental_window(cur, staged, lookback_days, report):
+    """
+    Descarta del staging los partidos, y las estadísticas de partidos, anteriores
+    a la marca de agua de su temporada menos `lookback_days` días. Las
+    temporadas sin marca de agua se ingieren completas
+    """
+    ensure_ingest_state_table(cur)
+    cur.execute("SELECT season, last_match_date, last_match_rapidapi_id FROM ingest_state ORDER BY season")
+    for season, last_date, last_rapidapi_id in cur.fetchall():
+        print(f"🔖 Temporada {season}: marca de agua {last_date} (partido {last_rapidapi_id})")
+
+    cutoff = "st.last_match_date - %(lookback)s::integer"
+    if "statistics" in staged:
+        # La fecha del partido sale del propio fichero o, si no viene, de la tabla matches
+        match_sources = "SELECT rapidapi_id, season, date FROM matches"
+        if "matches" in staged:
+            match_sources = f"""
+                SELECT rapidapi_id, season, date FROM stage_matches
+                UNION ALL
+                {match_sources} m
+                WHERE NOT EXISTS (SELECT 1 FROM stage_matches s WHERE s.rapidapi_id = m.rapidapi_id)
+            """
+        cur.execute(f"""
+            DELETE FROM stage_statistics s
+            USING ({match_sources}) m, ingest_state st
+            WHERE m.rapidapi_id = s.match_rapidapi_id AND st.season = m.season AND m.date < {cutoff}
+        """, {"lookback": lookback_days})
+        report.add("statistics", filtered=cur.rowcount)
+
+    if "matches" in staged:
+        cur.execute(f"""
+            DELETE FROM stage_matches s
+            USING ingest_state st
+            WHERE st.season = s.season AND s.date < {cutoff}
+        """, {"lookback": lookback_days})
+        report.add("matches", filtered=cur.rowcount)
+
+def update_watermarks(cur):
+    """Avanza la marca de agua de las temporadas ingeridas al último partido con marcador"""
+    ensure_ingest_state_table(cur)
+    cur.execute("""
+        INSERT INTO ingest_state (season, last_match_date, last_match_rapidapi_id, updated_at)
+        SELECT DISTINCT ON (m.season) m.season, m.date, m.rapidapi_id, now()
+        FROM matches m
+        WHERE m.season IN (SELECT DISTINCT season FROM stage_matches)
+          AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+          AND m.rapidapi_id IS NOT NULL
+        ORDER BY m.season, m.date DESC, m.rapidapi_id DESC
+        ON CONFLICT (season) DO UPDATE
+        SET last_match_date = EXCLUDED.last_match_date,
+            last_match_rapidapi_id = EXCLUDED.last_match_rapidapi_id,
+            updated_at = EXCLUDED.updated_at
+        WHERE (ingest_state.last_match_date, ingest_state.last_match_rapidapi_id)
+              < (EXCLUDED.last_match_date, EXCLUDED.last_match_rapidapi_id)
+        RETURNING season, last_match_date
+    """)
+    for season, last_date in cur.fetchall():
+        print(f"🔖 Marca de agua de la temporada {season} avanzada a {last_date}")
+
+def collect_affected_teams(cur, report):
+    """Los equipos de cada partido afectado también lo están (marcadores, agregados de equipo)"""
+    if not report.affected_match_ids:
+        return
+    cur.execute(
+        "SELECT home_team_id, away_team_id FROM matches WHERE id = ANY(%s)",
+        (sorted(report.affected_match_ids),)
+    )
+    for home_team_id, away_team_id in cur.fetchall():
+        report.affected_team_ids.update((home_team_id, away_team_id))
+
+def related_match_ids(cur, report):
+    """
+    Partidos afectados más los partidos cercanos (±SIDE_WINDOW_DAYS) de los
+    jugadores afectados, cuyo equipo se deduce de esos mismos partidos
+    """
+    if not report.affected_match_ids:
+        return set()
+    cur.execute("""
+        SELECT array_agg(DISTINCT s.match_id)
+        FROM matches m
+        JOIN match_statistics s ON s.match_id = m.id
+        WHERE s.player_id = ANY(%(players)s)
+          AND m.date BETWEEN (SELECT min(date) FROM matches WHERE id = ANY(%(matches)s)) - %(window)s
+                         AND (SELECT max(date) FROM matches WHERE id = ANY(%(matches)s)) + %(window)s
+    """, {
+        "players": sorted(report.affected_player_ids),
+        "matches": sorted(report.affected_match_ids),
+        "window": SIDE_WINDOW_DAYS,
+    })
+    return report.affected_match_ids.union(cur.fetchone()[0] or ())
+
+def refresh_derived_table(cur, function, match_ids):
+    """
+    Ejecuta una de las funciones de recálculo de las migraciones
+    (refresh_team_game_stats, refresh_match_top_performers) sobre esos
+    partidos. Retorna el número de filas guardadas
+    """
+    if not match_ids:
+        return 0
+    cur.execute("SELECT to_regprocedure(%s) IS NOT NULL", (f"{function}(integer[])",))
+    if not cur.fetchone()[0]:
+        print(f"⚠️ Falta {function}(): aplica las migraciones (python -m migrations.runner)")
+        return 0
+    cur.execute(f"SELECT {function}(%s)", (sorted(match_ids),))
+    return cur.fetchone()[0]
+
+def refresh_team_game_stats(cur, match_ids):
+    """Recalcula team_game_stats de esos partidos (ver related_match_ids)"""
+    stored = refresh_derived_table(cur, "refresh_team_game_stats", match_ids)
+    if match_ids:
+        print(f"🏀 team_game_stats: {stored} filas recalculadas ({len(match_ids)} partidos)")
+    return stored
+
+def refresh_match_top_performers(cur, match_ids):
+    """
+    Recalcula los top performers de esos partidos, de modo que la landing los
+    lee ya calculados tras la ingesta
+    """
+    stored = refresh_derived_table(cur, "refresh_match_top_performers", match_ids)
+    if match_ids:
+        print(f"⭐ match_top_performers: {stored} filas recalculadas ({len(match_ids)} partidos)")
+    return stored
+
+def invalidate_derived_data(cur, report):
+    """
+    Incrementa la versión global de datos (invalida las cachés de la API) y
+    registra los partidos que cambian con ella en data_version_changes
+    (migración 008), de donde la API relee solo esos partidos. data_versions
+    es de la migración 001
+    """
+    cur.execute(BUMP_DATA_VERSION_SQL)
+    version = cur.fetchone()[0]
+
+    cur.execute("SELECT to_regclass('data_version_changes') IS NOT NULL")
+    if cur.fetchone()[0]:
+        cur.execute("""
+            INSERT INTO data_version_changes (version, match_ids)
+            VALUES (%s, %s)
+            ON CONFLICT (version) DO UPDATE SET match_ids = EXCLUDED.match_ids, created_at = now()
+        """, (version, sorted(report.affected_match_ids)))
+    return version
+
+def run_ingest(conn, files, dry_run=False, incremental=False, lookback_days=DEFAULT_LOOKBACK_DAYS):
+    """
+    Ingiere los ficheros indicados ({stage: ruta}) en una única transacción.
+    Retorna el IngestReport
+    """
+    report = IngestReport()
+    total_start = time.perf_counter()
+
+    try:
+        with conn.cursor() as cur:
+            for stage, path in files.items():
+                create_stage_table(cur, stage)
+                copy_stage(cur, stage, path, report)
+
+            if incremental:
+                apply_incremental_window(cur, files, lookback_days, report)
+
+            start = time.perf_counter()
+            if "teams" in files:
+                merge_teams(cur, report)
+            if "players" in files or "statistics" in files:
+                build_player_map(cur, files)
+            if "players" in files:
+                merge_players(cur, report)
+            if "matches" in files:
+                merge_matches(cur, report)
+            if "statistics" in files:
+                merge_statistics(cur, report)
+            collect_affected_teams(cur, report)
+            report.timed("merge", start)
+
+            start = time.perf_counter()
+            match_ids = related_match_ids(cur, report)
+            refresh_team_game_stats(cur, match_ids)
+            report.timed("team_game_stats", start)
+
+            start = time.perf_counter()
+            refresh_match_top_performers(cur, match_ids)
+            report.timed("top_performers", start)
+
+            if dry_run:
+                conn.rollback()
+                print("🧪 Dry run: transacción revertida")
+            else:
+                if report.changed:
+                    version = invalidate_derived_data(cur, report)
+                    print(f"🔄 Versión de datos incrementada a {version}")
+                if "matches" in files:
+                    update_watermarks(cur)
+                conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    report.print_summary(time.perf_counter() - total_start)
+    return report
+
+def resolve_files(args):
+    files = {}
+    for stage in STAGES:
+        path = getattr(args, stage)
+        if path is None and args.dir:
+            for candidate in (f"{stage}.csv", f"{stage}.csv.gz"):
+                if os.path.exists(os.path.join(args.dir, candidate)):
+                    path = os.path.join(args.dir, candidate)
+                    break
+        if path:
+            files[stage] = path
+    return files
+
+def write_affected(report, path):
+    if not path:
+        return
+    payload = json.dumps(report.affected(), indent=2)
+    if path == "-":
+        print(payload)
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(payload)
+        print(f"📝 Ids afectados guardados en {path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta masiva (COPY + UPSERT) de datos de la NBA")
+    parser.add_argument("--dir", help="Directorio con teams.csv, players.csv, matches.csv y/o statistics.csv")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage}", help=f"Fichero CSV (o .csv.gz) de {stage}")
+    parser.add_argument("--dry-run", action="store_true", help="Ejecuta la ingesta y revierte la transacción")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Solo partidos posteriores a la marca de agua de su temporada (menos --lookback-days)"
+    )
+    parser.add_argument(
+        "--lookback-days", type=int, default=DEFAULT_LOOKBACK_DAYS,
+        help=f"Días que se vuelven a revisar antes de la marca de agua (por defecto {DEFAULT_LOOKBACK_DAYS})"
+    )
+    parser.add_argument("--affected-out", help="Fichero JSON con los ids afectados ('-' para stdout)")
+    args = parser.parse_args(argv)
+    if args.lookback_days < 0:
+        parser.error("--lookback-days no puede ser negativo")
+
+    files = resolve_files(args)
+    if not files:
+        parser.error("no se ha indicado ningún fichero para ingerir")
+
+    conn = get_connection()
+    try:
+        report = run_ingest(
+            conn, files, dry_run=args.dry_run, incremental=args.incremental, lookback_days=args.lookback_days
+        )
+        write_affected(report, args.affected_out)
+    except (ValueError, OSError, psycopg2.Error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
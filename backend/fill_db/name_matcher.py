@@ -0,0 +1,118 @@
+"""
+Índice para emparejar nombres de jugadores de forma aproximada.
+
+En lugar de comparar cada nombre contra todo el dataset, los candidatos se
+obtienen por bloques (tokens y trigramas compartidos) y solo los mejores se
+puntúan con SequenceMatcher, de modo que el umbral de similitud significa lo
+mismo que con la búsqueda lineal anterior.
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+SUFFIX_RE = re.compile(r'\s+(Jr\.?|Sr\.?|III|II|IV)$', re.IGNORECASE)
+NON_WORD_RE = re.compile(r'[^\w\s]')
+SPACES_RE = re.compile(r'\s+')
+
+# Candidatos (por trigramas compartidos) que se puntúan con SequenceMatcher
+DEFAULT_MAX_CANDIDATES = 25
+TOKEN_BONUS = 3
+
+def normalize_name(name: str) -> str:
+    """
+    Normaliza un nombre: sin sufijos (Jr., III...), sin acentos ni signos,
+    en minúsculas y con espacios simples
+    """
+    name = SUFFIX_RE.sub('', name.strip())
+    if not name.isascii():
+        name = unicodedata.normalize('NFKD', name)
+        name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = NON_WORD_RE.sub('', name.lower())
+    return SPACES_RE.sub(' ', name).strip()
+
+def trigrams(name: str) -> List[str]:
+    padded = f"  {name} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+class NameMatch(NamedTuple):
+    player_id: int
+    name: str
+    score: float
+
+class NameIndex:
+    """Índice de nombres normalizados → id de jugador"""
+
+    def __init__(self, names: Mapping[str, int], max_candidates: int = DEFAULT_MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+        self.names: List[str] = []
+        self.ids: List[int] = []
+        self.exact: Dict[str, int] = {}
+        self.by_token: Dict[str, List[int]] = defaultdict(list)
+        self.by_trigram: Dict[str, List[int]] = defaultdict(list)
+
+        for raw_name, player_id in names.items():
+            name = normalize_name(raw_name)
+            if not name or name in self.exact:
+                continue
+            position = len(self.names)
+            self.names.append(name)
+            self.ids.append(player_id)
+            self.exact[name] = position
+            for token in set(name.split()):
+                self.by_token[token].append(position)
+            for trigram in set(trigrams(name)):
+                self.by_trigram[trigram].append(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, name: str) -> List[int]:
+        """
+        Entradas con más trigramas en común; compartir un token completo
+        (nombre o apellido exactos) cuenta como varios trigramas
+        """
+        shared = Counter()
+        for trigram in set(trigrams(name)):
+            shared.update(self.by_trigram.get(trigram, ()))
+        for token in set(name.split()):
+            for position in self.by_token.get(token, ()):
+                shared[position] += TOKEN_BONUS
+        return [position for position, _ in shared.most_common(self.max_candidates)]
+
+    def match(self, name: str, threshold: float = 0.8) -> Optional[NameMatch]:
+        """Mejor coincidencia con similitud >= threshold (o None)"""
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+
+        position = self.exact.get(normalized)
+        if position is not None:
+            return NameMatch(self.ids[position], self.names[position], 1.0)
+
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(normalized)  # SequenceMatcher cachea la información de seq2
+        best_position, best_score = None, threshold
+        for position in self.candidates(normalized):
+            matcher.set_seq1(self.names[position])
+            # Cotas superiores baratas antes del cálculo completo
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score or (score == best_score and best_position is None):
+                best_position, best_score = position, score
+
+        if best_position is None:
+            return None
+        return NameMatch(self.ids[best_position], self.names[best_position], best_score)
+
+    def match_many(self, names: Iterable[str], threshold: float = 0.8) -> List[Optional[NameMatch]]:
+        """Empareja una lista de nombres (en el mismo orden); los repetidos se calculan una vez"""
+        results: Dict[str, Optional[NameMatch]] = {}
+        matched = []
+        for name in names:
+            if name not in results:
+                results[name] = self.match(name, threshold)
+            matched.append(results[name])
+        return matched
@@ -0,0 +1,150 @@
+"""
+Carga en streaming del dataset de jugadores de NBA.com (columnas playerid,
+fname, lname) a un mapa compacto nombre normalizado → playerid.
+
+Acepta una ruta, '-' para stdin o un fichero ya abierto; la entrada gzip se
+detecta por su cabecera, así que funciona también desde stdin.
+
+Uso:
+    python players_dataset.py players.csv --trace-memory
+    zcat historical_players.csv.gz | python players_dataset.py -
+"""
+import argparse
+import bisect
+import csv
+import gzip
+import io
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Iterator, Optional, Tuple
+
+from name_matcher import normalize_name
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+class CompactNameMap:
+    """
+    Mapa inmutable nombre → playerid sobre una tupla ordenada de nombres y un
+    array de enteros (sin la sobrecarga por entrada de un dict). Se consulta
+    con búsqueda binaria e implementa lo necesario de la interfaz de dict
+    """
+
+    __slots__ = ("names", "ids")
+
+    def __init__(self, mapping):
+        self.names = tuple(sorted(mapping))
+        self.ids = array("L", (mapping[name] for name in self.names))
+
+    def _position(self, name) -> int:
+        position = bisect.bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            return position
+        return -1
+
+    def __getitem__(self, name) -> int:
+        position = self._position(name)
+        if position < 0:
+            raise KeyError(name)
+        return self.ids[position]
+
+    def get(self, name, default=None):
+        position = self._position(name)
+        return self.ids[position] if position >= 0 else default
+
+    def __contains__(self, name) -> bool:
+        return self._position(name) >= 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def items(self):
+        return zip(self.names, self.ids)
+
+    def nbytes(self) -> int:
+        """Tamaño aproximado en memoria (tupla, cadenas y array)"""
+        return (
+            sys.getsizeof(self.names)
+            + sum(sys.getsizeof(name) for name in self.names)
+            + sys.getsizeof(self.ids)
+        )
+
+def open_source(source):
+    """
+    Abre la fuente como texto: ruta, '-' (stdin) o un fichero binario ya
+    abierto. Descomprime gzip si la cabecera lo indica
+    """
+    if source == "-":
+        raw = sys.stdin.buffer
+    elif isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        raw = open(source, "rb")
+    else:
+        raw = source
+
+    buffered = raw if hasattr(raw, "peek") else io.BufferedReader(raw)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        buffered = gzip.GzipFile(fileobj=buffered)
+    return io.TextIOWrapper(buffered, encoding="utf-8", newline="")
+
+def iter_dataset_rows(source) -> Iterator[Tuple[str, int]]:
+    """Genera (nombre normalizado, playerid) fila a fila sin cargar el fichero"""
+    with open_source(source) as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        try:
+            id_col, first_col, last_col = (header.index(column) for column in ("playerid", "fname", "lname"))
+        except ValueError:
+            raise ValueError(f"El CSV debe tener las columnas playerid, fname y lname (cabecera: {header})")
+
+        for row in reader:
+            try:
+                player_id = int(row[id_col])
+                name = normalize_name(f"{row[first_col]} {row[last_col]}")
+            except (IndexError, ValueError):
+                continue  # filas incompletas o sin id numérico
+            if name:
+                yield name, player_id
+
+def load_players_dataset(source, trace_memory: bool = False) -> CompactNameMap:
+    """
+    Carga el dataset en un CompactNameMap e informa del tamaño del mapa. Con
+    trace_memory mide además el pico de memoria de la carga con tracemalloc
+    (bastante más lento: traza cada reserva de memoria)
+    """
+    start = time.perf_counter()
+    if trace_memory:
+        tracemalloc.start()
+
+    rows = 0
+    mapping = {}
+    for name, player_id in iter_dataset_rows(source):
+        mapping[name] = player_id  # si un nombre se repite gana la última fila
+        rows += 1
+    name_map = CompactNameMap(mapping)
+    del mapping
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Cargados {len(name_map)} jugadores del dataset ({rows} filas en {elapsed:.2f}s)")
+    memory = f"🧠 Mapa de nombres: {name_map.nbytes() / 1024 / 1024:.1f}MB"
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory += f", pico durante la carga {peak / 1024 / 1024:.1f}MB, retenidos {current / 1024 / 1024:.1f}MB"
+    print(memory)
+    return name_map
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Carga el dataset de jugadores de NBA.com")
+    parser.add_argument("source", help="Ruta al CSV (o .csv.gz), o '-' para stdin")
+    parser.add_argument("--trace-memory", action="store_true", help="Medir el pico de memoria con tracemalloc")
+    args = parser.parse_args(argv)
+    load_players_dataset(args.source, trace_memory=args.trace_memory)
+
+if __name__ == "__main__":
+    main()
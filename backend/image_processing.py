@@ -0,0 +1,66 @@
+import hashlib
+import io
+import logging
+from typing import TYPE_CHECKING, BinaryIO, Dict, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Tamaños (en px, lado del cuadrado) de las variantes de avatar que se generan
+PROFILE_IMAGE_SIZES = (64, 128, 512)
+WEBP_QUALITY = 82
+
+# Protección frente a "decompression bombs": 5MB comprimidos no deberían
+# pasar nunca de ~40 megapíxeles en una foto de perfil legítima
+MAX_IMAGE_PIXELS = 40_000_000
+
+def hash_image_file(fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """Calcula un hash del contenido leyendo el fichero por bloques"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()[:16]
+
+def build_profile_image_variants(fileobj: BinaryIO) -> Tuple[str, Dict[int, bytes]]:
+    """
+    Decodifica la imagen subida y genera las variantes WebP cuadradas.
+    Es código bloqueante (CPU): debe llamarse fuera del event loop.
+    Retorna el hash del contenido original y un dict {tamaño: bytes_webp}
+    """
+    # Pillow se importa en la primera subida, no en el arranque de la API
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    content_hash = hash_image_file(fileobj)
+
+    try:
+        with Image.open(fileobj) as img:
+            # En GIFs animados solo se usa el primer frame
+            img.seek(0)
+            # Aplicar la orientación EXIF antes de descartar los metadatos
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Imagen no válida: {e}")
+
+    variants = {}
+    for size in PROFILE_IMAGE_SIZES:
+        variant = ImageOps.fit(img, (size, size), method=Image.Resampling.LANCZOS)
+        # Sin EXIF/ICC/XMP: solo se guardan los píxeles
+        variant.info = {}
+        buffer = io.BytesIO()
+        variant.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+        variants[size] = buffer.getvalue()
+
+    logger.info(
+        f"Variantes generadas ({content_hash}): "
+        + ", ".join(f"{size}px={len(data)}B" for size, data in variants.items())
+    )
+    return content_hash, variants
+
+def _has_alpha(img: "Image.Image") -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
@@ -4,7 +4,7 @@ import time
 import traceback
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlmodel import select
 
 # Configurar logging global - solo a stdout para compatibilidad con despliegues
@@ -21,8 +21,19 @@ logger = logging.getLogger(__name__)
 from models import UserRole
 from deps import get_db, require_role
 from config import get_settings
-from routers import home, debug, players, auth, teams, favorites, profile, admin, search
+from routers import home, debug, players, auth, teams, favorites, profile, admin, search, leaders
+from migrations.runner import check_migrations
+from services.activity import activity_tracker
 from services.admin_metrics import admin_metrics_service
+from services.coalescing import response_coalescer
+from services.data_version import data_version_service
+from services.game_log import game_log_store
+from services.player_metrics import player_metrics_service
+from services.http_cache import (
+    CachedResponse, cache_headers, etag_matches, is_cacheable_path, make_etag,
+    request_tier, response_cache
+)
+from spaces_config import shutdown_spaces_executor
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 app = FastAPI(title="HoopMetrics API", version="1.0.0")
@@ -36,6 +47,50 @@ app.include_router(favorites.router)
 app.include_router(profile.router)
 app.include_router(admin.router)
 app.include_router(search.router)
+app.include_router(leaders.router)
+
+# Registrado antes que CORS para quedar por dentro: las respuestas servidas
+# desde caché también pasan por CORS y por las métricas
+@app.middleware("http")
+async def http_cache_middleware(request: Request, call_next):
+    """Caché de respuestas analíticas con ETag, invalidada por la versión de datos"""
+    if request.method != "GET" or not is_cacheable_path(request.url.path):
+        return await call_next(request)
+
+    version = await data_version_service.get_version()
+    tier = request_tier(request)
+    key = response_cache.make_key(request, tier)
+    if_none_match = request.headers.get("if-none-match")
+
+    if version is not None:
+        cached = response_cache.get(key, version)
+        if cached is not None:
+            headers = cache_headers(cached.etag, tier)
+            headers["X-Cache"] = "HIT"
+            if etag_matches(if_none_match, cached.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+    async def render():
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        return response.status_code, body, response.media_type or response.headers.get("content-type"), headers
+
+    # Peticiones idénticas concurrentes comparten una única ejecución del endpoint,
+    # haya caché o no (p.ej. si no se pudo leer la versión de datos)
+    status_code, body, media_type, inner_headers = await response_coalescer.run((key, version), render)
+    if status_code != 200 or version is None:
+        return Response(content=body, status_code=status_code, headers=inner_headers)
+
+    entry = CachedResponse(body, make_etag(body), media_type, version)
+    response_cache.set(key, entry)
+
+    headers = cache_headers(entry.etag, tier)
+    headers["X-Cache"] = "MISS"
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=entry.media_type, headers=headers)
 
 app.add_middleware(
     CORSMiddleware,
@@ -148,7 +203,18 @@ async def admin_dashboard(user=Depends(require_role(UserRole.admin))):
 @app.on_event("startup")
 async def startup_event():
     logger.info("🚀 HoopMetrics API starting up...")
+    # Los endpoints no crean tablas: si falta una migración (p.ej. la 003 de
+    # team_game_stats para /teams/*) queda registrado aquí
+    await check_migrations()
+    # Por defecto los almacenes en memoria se cargan en la primera petición que
+    # los usa: en Vercel no se paga la carga en cada arranque en frío
+    if get_settings().WARM_UP_ON_STARTUP:
+        await game_log_store.warm_up()
+        await player_metrics_service.warm_up()
+    activity_tracker.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("🛑 HoopMetrics API shutting down...")
\ No newline at end of file
+    logger.info("🛑 HoopMetrics API shutting down...")
+    await activity_tracker.stop()
+    shutdown_spaces_executor()
\ No newline at end of file
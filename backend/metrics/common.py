@@ -0,0 +1,40 @@
+"""
+Utilidades compartidas por las fórmulas de métricas: aceptan escalares o
+arrays NumPy y devuelven lo mismo que sus equivalentes escalares.
+"""
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+def or_default(values, default: float) -> np.ndarray:
+    """Equivalente vectorial de `float(x or default)`: NULL (NaN) y 0 toman el valor por defecto"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values) | (values == 0), default, values)
+
+def clip(values, low, high) -> np.ndarray:
+    """max(low, min(high, x))"""
+    return np.maximum(low, np.minimum(high, values))
+
+def league_ranks(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentil ((por debajo + 0.5 * iguales) / n * 100) y puesto (1 = mejor,
+    empates comparten puesto) de cada valor dentro del array
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side="left")
+    not_above = np.searchsorted(ordered, values, side="right")
+    percentiles = (below + 0.5 * (not_above - below)) / len(values) * 100
+    ranks = len(values) - not_above + 1
+    return percentiles, ranks
+
+def rounded(fields: Mapping[str, object], digits: Mapping[str, int], index=None) -> Dict[str, object]:
+    """
+    Campos de la respuesta redondeados como en los endpoints. Con `index` se toma
+    el elemento de esa posición de cada array; los campos sin dígitos son enteros
+    """
+    result = {}
+    for name, values in fields.items():
+        value = values[index] if index is not None else values
+        result[name] = round(float(value), digits[name]) if name in digits else int(value)
+    return result
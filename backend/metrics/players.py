@@ -0,0 +1,495 @@
+"""
+Fórmulas de las métricas avanzadas de jugadores (LEBRON, PIPM, RAPTOR WAR,
+pace impact y fatigue) como funciones puras.
+
+Las métricas de box score reciben escalares o arrays NumPy (un elemento por
+jugador) con las medias de box_averages() y devuelven los campos de la
+respuesta sin redondear; rounded(campos, FIELD_DIGITS) los deja como en los
+endpoints. Los divisores por minutos asumen minutos > 0: los jugadores sin
+minutos reciben los valores por defecto del endpoint.
+"""
+import math
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from metrics.common import clip, or_default
+
+REPLACEMENT_LEVELS = {
+    'PG': -2.0, 'SG': -2.2, 'SF': -2.1, 'PF': -2.3, 'C': -1.9,
+    'G': -2.1, 'F': -2.2, 'G-F': -2.0, 'F-C': -2.1, 'C-F': -2.2, 'F-G': -2.1
+}
+
+POSITION_VALUE_MULTIPLIERS = {
+    'PG': 1.15, 'SG': 1.05, 'SF': 1.1, 'PF': 1.0, 'C': 0.95,
+    'G': 1.1, 'F': 1.05, 'G-F': 1.1, 'F-C': 0.95, 'C-F': 0.95, 'F-G': 1.05
+}
+
+# Decimales de cada campo en las respuestas (los que no aparecen son enteros)
+FIELD_DIGITS = {
+    # LEBRON
+    "lebron_score": 2, "box_component": 2, "plus_minus_component": 2, "luck_adjustment": 3,
+    "context_adjustment": 3, "usage_adjustment": 3, "percentile_rank": 1, "minutes_per_game": 1,
+    # PIPM
+    "total_pipm": 2, "offensive_pimp": 2, "defensive_pimp": 2, "box_prior_weight": 3,
+    "plus_minus_weight": 3, "stability_factor": 3, "minutes_confidence": 3, "usage_rate": 1,
+    # RAPTOR
+    "total_war": 2, "offensive_war": 2, "defensive_war": 2, "market_value_millions": 1,
+    "positional_versatility": 3, "age_adjustment": 3, "injury_risk_factor": 3, "win_shares_comparison": 2,
+    # Pace
+    "pace_impact_rating": 2, "possessions_per_48": 1, "efficiency_on_court": 1, "tempo_control_factor": 2,
+    "transition_efficiency": 2, "usage_pace_balance": 2, "fourth_quarter_pace": 1, "pace_consistency": 2,
+    # Fatigue
+    "fatigue_resistance": 1, "peak_performance_minutes": 1, "endurance_rating": 1, "back_to_back_efficiency": 2,
+    "fourth_quarter_dropoff": 3, "rest_day_boost": 2, "load_threshold": 1, "recovery_factor": 2,
+    "average_minutes": 1,
+}
+
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+def box_averages(raw: Mapping[str, ArrayLike]) -> Dict[str, np.ndarray]:
+    """
+    Medias avg_* de SQL (NULL = NaN) tal y como las usan las fórmulas: NULL pasa
+    a 0 y, sin rebotes ofensivos/defensivos, se reparten los totales 25% / 75%
+    """
+    box = {name: np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0) for name, values in raw.items()}
+    box["avg_oreb"] = np.where(box["avg_oreb"] != 0, box["avg_oreb"], box["avg_rebounds"] * 0.25)
+    box["avg_dreb"] = np.where(box["avg_dreb"] != 0, box["avg_dreb"], box["avg_rebounds"] * 0.75)
+    return box
+
+def age_on(birth_date: date, today: date) -> int:
+    """Años cumplidos en `today`"""
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+def _by_position(positions, table: Mapping[str, float], default: float):
+    """Valor de la tabla para una posición o para cada posición de una secuencia"""
+    if positions is None or isinstance(positions, str):
+        return table.get(positions, default)
+    return np.array([table.get(position, default) for position in positions])
+
+def lebron_impact(box: Mapping[str, ArrayLike], league: Mapping[str, float], games_played: ArrayLike,
+                  total_minutes: ArrayLike, points_std: ArrayLike, pm_std: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    LEBRON-style metric: Luck-adjusted player Estimate using Box prior Regularized ON-off.
+    points_std y pm_std son las STDDEV de SQL sin tratar (NULL = NaN)
+    """
+    a, lg = box, league
+    avg_points, avg_assists = a["avg_points"], a["avg_assists"]
+    avg_steals, avg_blocks, avg_turnovers = a["avg_steals"], a["avg_blocks"], a["avg_turnovers"]
+    avg_minutes, avg_fga, avg_fta = a["avg_minutes"], a["avg_fga"], a["avg_fta"]
+    avg_plusminus, avg_oreb, avg_dreb = a["avg_plusminus"], a["avg_oreb"], a["avg_dreb"]
+    total_minutes = np.nan_to_num(np.asarray(total_minutes, dtype=np.float64), nan=0.0)
+    points_std = or_default(points_std, 5.0)
+    pm_std = or_default(pm_std, 8.0)
+
+    # 1. BOX PRIOR COMPONENT
+    shot_attempts = avg_fga + 0.44 * avg_fta
+    true_shooting = np.where(shot_attempts > 0, avg_points / (2 * shot_attempts), 0.5)
+    usage_rate = ((avg_fga + 0.44 * avg_fta + avg_turnovers) * (lg["league_mpg"] * 5)) / (avg_minutes * (lg["league_fga"] + avg_fta + lg["league_tpg"])) * 100
+    usage_rate = clip(usage_rate, 10, 40)
+
+    box_component = (
+        0.20 * (avg_points - lg["league_ppg"]) * (true_shooting / 0.56) +
+        0.14 * (avg_oreb - lg["league_rpg"] * 0.25) +
+        0.12 * (avg_dreb - lg["league_rpg"] * 0.75) +
+        0.30 * (avg_assists - lg["league_apg"]) +
+        0.52 * (avg_steals - lg["league_spg"]) +
+        0.58 * (avg_blocks - lg["league_bpg"]) +
+        -0.35 * (avg_turnovers - lg["league_tpg"]) +
+        -0.002 * np.maximum(0, usage_rate - 28) ** 1.5 +
+        0.15 * (true_shooting - 0.56) * 20
+    )
+
+    # 2. PLUS-MINUS COMPONENT - Regularizado
+    pm_component_raw = avg_plusminus / avg_minutes * 48
+    pm_reliability = np.minimum(1.0, total_minutes / 1500)
+    pm_variance_penalty = np.minimum(0.2, pm_std / 15.0)
+    plus_minus_component = pm_component_raw * pm_reliability * (1 - pm_variance_penalty)
+
+    # 3. REGULARIZACIÓN BAYESIANA
+    pm_weight = total_minutes / (total_minutes + 200)
+    box_weight = 1 - pm_weight
+
+    # 4. LUCK ADJUSTMENT
+    consistency_score = np.where(points_std > 0, 1 / (1 + points_std / 8.0), 1)
+    pm_consistency = np.where(pm_std > 0, 1 / (1 + pm_std / 10.0), 1)
+    sample_size_factor = np.minimum(1.0, total_minutes / 1000)
+    luck_adjustment = clip(consistency_score * 0.4 + pm_consistency * 0.4 + sample_size_factor * 0.2, 0.7, 1.3)
+
+    # 5. CONTEXT ADJUSTMENT
+    team_success_factor = np.where(avg_plusminus > 3, 1.1, np.where(avg_plusminus < -3, 0.95, 1.0))
+    context_adjustment = team_success_factor * (0.9 + 0.1 * np.minimum(np.asarray(games_played) / 60, 1))
+    context_adjustment = clip(context_adjustment, 0.85, 1.15)
+
+    # 6. USAGE ADJUSTMENT
+    usage_deviation = np.abs(usage_rate - 24)
+    usage_adjustment = np.where(
+        usage_rate > 30, 1.0 - (usage_rate - 30) * 0.01 + (true_shooting - 0.55) * 0.8,
+        np.where(usage_rate < 18, 0.98, 1.0 + (5 - usage_deviation) * 0.005)
+    )
+    usage_adjustment = clip(usage_adjustment, 0.85, 1.15)
+
+    # 7. LEBRON SCORE FINAL
+    raw_impact = (box_component * box_weight + plus_minus_component * pm_weight)
+    lebron_score = clip(raw_impact * luck_adjustment * context_adjustment * usage_adjustment, -12, 12)
+
+    # 8. PERCENTILE RANK (distribución aproximada: media=0, std=2.5)
+    z_scores = lebron_score / 2.5
+    percentile_rank = 50 * (1 + _erf(z_scores / math.sqrt(2)))
+    percentile_rank = clip(percentile_rank, 1, 99)
+
+    return {
+        "lebron_score": lebron_score,
+        "box_component": box_component,
+        "plus_minus_component": plus_minus_component,
+        "luck_adjustment": luck_adjustment,
+        "context_adjustment": context_adjustment,
+        "usage_adjustment": usage_adjustment,
+        "percentile_rank": percentile_rank,
+        "minutes_per_game": avg_minutes,
+    }
+
+def pipm_impact(box: Mapping[str, ArrayLike], league: Mapping[str, float], pm_std: ArrayLike) -> Dict[str, np.ndarray]:
+    """Player Impact Plus-Minus con separación ofensiva/defensiva (temporada fija de 82 partidos)"""
+    a, lg = box, league
+    avg_points, avg_assists = a["avg_points"], a["avg_assists"]
+    avg_steals, avg_blocks, avg_turnovers = a["avg_steals"], a["avg_blocks"], a["avg_turnovers"]
+    avg_minutes, avg_fga, avg_fta, avg_3pm = a["avg_minutes"], a["avg_fga"], a["avg_fta"], a["avg_3pm"]
+    avg_plusminus, avg_oreb, avg_dreb = a["avg_plusminus"], a["avg_oreb"], a["avg_dreb"]
+    pm_variance = or_default(pm_std, 8.0)
+    games_played_calc = 82  # temporada completa para los cálculos
+
+    shot_attempts = avg_fga + 0.44 * avg_fta
+    true_shooting = np.where(shot_attempts > 0, avg_points / (2 * shot_attempts), 0.5)
+    usage_rate = 100 * ((avg_fga + 0.44 * avg_fta + avg_turnovers) * (lg["league_mpg"] * 5)) / (avg_minutes * (100 * 2))
+    usage_rate = clip(usage_rate, 5, 50)
+
+    # 1. BOX PRIOR COMPONENT
+    offensive_box = (
+        0.25 * (avg_points - lg["league_ppg"]) * (true_shooting / 0.56) +
+        0.45 * (avg_assists - lg["league_apg"]) +
+        0.35 * (avg_oreb - lg["league_rpg"] * 0.25) +
+        -0.55 * (avg_turnovers - lg["league_tpg"]) +
+        -0.003 * np.maximum(0, usage_rate - 28) ** 1.8 +
+        0.08 * avg_3pm
+    )
+    defensive_box = (
+        0.25 * (avg_dreb - lg["league_rpg"] * 0.75) +
+        0.65 * (avg_steals - lg["league_spg"]) +
+        0.75 * (avg_blocks - lg["league_bpg"]) +
+        -0.01 * np.maximum(0, usage_rate - 25) +
+        -0.002 * np.maximum(0, avg_minutes - 32)
+    )
+
+    # 2. PLUS/MINUS COMPONENT
+    pm_per_48 = (avg_plusminus / avg_minutes) * 48
+    luck_factor = clip(1 - (pm_variance - 8) / 20, 0.7, 1.3)
+    pm_adjusted = pm_per_48 * luck_factor
+    pm_offensive = pm_adjusted * 0.6
+    pm_defensive = pm_adjusted * 0.4
+
+    # 3. REGULARIZACIÓN BAYESIANA
+    total_minutes = avg_minutes * games_played_calc
+    minutes_confidence = np.minimum(total_minutes / (total_minutes + 1200), 0.75)
+    box_prior_weight = 1.0 - minutes_confidence
+    plus_minus_weight = minutes_confidence
+
+    # 4. FACTOR DE ESTABILIDAD
+    games_stability = min(games_played_calc / 60, 1.0)
+    variance_stability = np.maximum(0.5, 1 - (pm_variance - 6) / 15)
+    stability_factor = (games_stability + variance_stability) / 2
+
+    # 5. PIPM FINAL
+    offensive_pimp = (offensive_box * box_prior_weight + pm_offensive * plus_minus_weight) * stability_factor
+    defensive_pimp = (defensive_box * box_prior_weight + pm_defensive * plus_minus_weight) * stability_factor
+    offensive_pimp = clip(offensive_pimp, -8, 8)
+    defensive_pimp = clip(defensive_pimp, -8, 8)
+
+    return {
+        "total_pipm": offensive_pimp + defensive_pimp,
+        "offensive_pimp": offensive_pimp,
+        "defensive_pimp": defensive_pimp,
+        "box_prior_weight": box_prior_weight,
+        "plus_minus_weight": plus_minus_weight,
+        "stability_factor": stability_factor,
+        "minutes_confidence": minutes_confidence,
+        "usage_rate": usage_rate,
+    }
+
+def raptor_war(box: Mapping[str, ArrayLike], league: Mapping[str, float], games_played: ArrayLike,
+               age: ArrayLike, positions: Union[Optional[str], Sequence[Optional[str]]]) -> Dict[str, np.ndarray]:
+    """RAPTOR-style Wins Above Replacement; age en años cumplidos (ver age_on)"""
+    a, lg = box, league
+    avg_points, avg_rebounds, avg_assists = a["avg_points"], a["avg_rebounds"], a["avg_assists"]
+    avg_steals, avg_blocks, avg_turnovers = a["avg_steals"], a["avg_blocks"], a["avg_turnovers"]
+    avg_minutes, avg_fga, avg_fta, avg_3pm = a["avg_minutes"], a["avg_fga"], a["avg_fta"], a["avg_3pm"]
+    avg_oreb, avg_dreb = a["avg_oreb"], a["avg_dreb"]
+    age = np.asarray(age, dtype=np.float64)
+    games_for_calc = 82
+
+    shot_attempts = avg_fga + 0.44 * avg_fta
+    true_shooting = np.where(shot_attempts > 0, avg_points / (2 * shot_attempts), 0.5)
+    usage_rate = 100 * ((avg_fga + 0.44 * avg_fta + avg_turnovers) * 40) / (avg_minutes * 200)
+
+    offensive_box = (
+        0.18 * (avg_points - lg["league_ppg"]) * (true_shooting / 0.56) +
+        0.35 * (avg_assists - lg["league_apg"]) +
+        0.4 * (avg_oreb - lg["league_rpg"] * 0.25) +
+        0.08 * avg_3pm +
+        -0.45 * (avg_turnovers - lg["league_tpg"]) +
+        0.12 * np.where(avg_fga > 0, avg_fta / np.where(avg_fga > 0, avg_fga, 1), 0)
+    )
+    defensive_box = (
+        0.22 * (avg_dreb - lg["league_rpg"] * 0.75) +
+        0.7 * (avg_steals - lg["league_spg"]) +
+        0.8 * (avg_blocks - lg["league_bpg"]) +
+        -0.008 * np.maximum(0, usage_rate - 25)
+    )
+
+    replacement_level = _by_position(positions, REPLACEMENT_LEVELS, -2.1)
+
+    # Ajuste de edad
+    age_adjustment = np.where(
+        age <= 21, 0.75 + (age - 19) * 0.08,
+        np.where(age <= 27, 0.91 + (27 - age) * 0.015,
+                 np.where(age <= 30, 1.0 - (age - 27) * 0.06, 0.82 - (age - 30) * 0.04))
+    )
+    age_adjustment = clip(age_adjustment, 0.3, 1.1)
+    offensive_box_adjusted = offensive_box * age_adjustment
+    defensive_box_adjusted = defensive_box * age_adjustment
+    total_rating = offensive_box_adjusted + defensive_box_adjusted
+
+    # WAR
+    player_minute_share = (avg_minutes * games_for_calc) / (48 * games_for_calc)
+    total_war = (total_rating - replacement_level) * player_minute_share * games_for_calc / 100
+    offensive_war = (offensive_box_adjusted - replacement_level * 0.55) * player_minute_share * games_for_calc / 100
+    defensive_war = (defensive_box_adjusted - replacement_level * 0.45) * player_minute_share * games_for_calc / 100
+    total_war = clip(total_war, -5, 15)
+    offensive_war = clip(offensive_war, -3, 10)
+    defensive_war = clip(defensive_war, -3, 8)
+
+    # Riesgo de lesiones
+    load_factor = (avg_minutes * np.asarray(games_played)) / (35 * 82)
+    age_injury_risk = 1.0 + np.maximum(0, age - 30) * 0.05
+    injury_risk_factor = clip(1.0 + load_factor * 0.3 + (age_injury_risk - 1.0), 1.0, 2.5)
+
+    # Versatilidad posicional
+    balance_score = (
+        1 - np.abs(avg_points / lg["league_ppg"] - 1) * 0.3
+        - np.abs(avg_rebounds / lg["league_rpg"] - 1) * 0.2
+        - np.abs(avg_assists / lg["league_apg"] - 1) * 0.3
+    )
+    shooting_versatility = np.minimum(1, true_shooting / 0.5)
+    positional_versatility = clip((balance_score + shooting_versatility) / 2, 0, 1)
+
+    # Valor de mercado
+    position_multiplier = _by_position(positions, POSITION_VALUE_MULTIPLIERS, 1.0)
+    base_value = np.where(
+        total_war <= 0, np.maximum(0.5, total_war * 8 + 15),
+        np.where(total_war <= 2, 15 + (total_war * 12),
+                 np.where(total_war <= 5, 39 + ((total_war - 2) * 15), 84 + ((total_war - 5) * 20)))
+    )
+    age_value_adjustment = np.where(
+        age <= 25, age_adjustment * 1.4,
+        np.where(age <= 28, age_adjustment * 1.2, np.where(age <= 31, age_adjustment * 1.0, age_adjustment * 0.7))
+    )
+    versatility_bonus = 1 + (positional_versatility * 0.25)
+    injury_penalty = np.maximum(0.7, 1 / (injury_risk_factor ** 0.5))
+    market_value_millions = base_value * position_multiplier * age_value_adjustment * versatility_bonus * injury_penalty
+    market_value_millions = clip(market_value_millions, 1.0, 60)
+
+    return {
+        "total_war": total_war,
+        "offensive_war": offensive_war,
+        "defensive_war": defensive_war,
+        "market_value_millions": market_value_millions,
+        "positional_versatility": positional_versatility,
+        "age_adjustment": age_adjustment,
+        "injury_risk_factor": injury_risk_factor,
+        "win_shares_comparison": total_war * 1.1,
+    }
+
+def pace_impact(box: Mapping[str, ArrayLike], league: Mapping[str, float],
+                points_std: ArrayLike, pm_std: ArrayLike) -> Dict[str, np.ndarray]:
+    """Pace Impact Rating: influencia del jugador en el ritmo y la eficiencia del equipo"""
+    a, lg = box, league
+    avg_rebounds, avg_assists = a["avg_rebounds"], a["avg_assists"]
+    avg_steals, avg_turnovers = a["avg_steals"], a["avg_turnovers"]
+    avg_minutes, avg_fga, avg_fta = a["avg_minutes"], a["avg_fga"], a["avg_fta"]
+    avg_plusminus = a["avg_plusminus"]
+    pm_variance = or_default(pm_std, 8.0)
+    points_variance = or_default(points_std, 5.0)
+
+    # 1. PACE ESTIMATION
+    actions_per_minute = (avg_fga + avg_fta + avg_turnovers + avg_assists) / avg_minutes
+    pace_multiplier = actions_per_minute / 1.8
+    base_pace = 100
+    possessions_per_48 = clip(base_pace * pace_multiplier, 85, 115)
+
+    # 2. EFFICIENCY ON COURT
+    pm_per_48 = (avg_plusminus / avg_minutes) * 48
+    efficiency_on_court = clip(100 + (pm_per_48 * 2), 80, 120)
+
+    # 3. TEMPO CONTROL FACTOR
+    assist_to_turnover = avg_assists / np.maximum(avg_turnovers, 0.5)
+    usage_rate = 100 * ((avg_fga + 0.44 * avg_fta + avg_turnovers) * (lg["league_mpg"] * 5)) / (avg_minutes * 200)
+    usage_rate = clip(usage_rate, 5, 45)
+    tempo_control_factor = clip((assist_to_turnover / 2.0) * (1 - np.abs(usage_rate - 25) / 25), 0.3, 2.0)
+
+    # 4. TRANSITION EFFICIENCY
+    transition_stats = avg_steals + (avg_rebounds * 0.3) + (avg_assists * 0.4)
+    league_transition = 1.3 + (10.2 * 0.3) + (5.5 * 0.4)
+    transition_efficiency = clip(transition_stats / league_transition, 0.5, 2.0)
+
+    # 5. USAGE-PACE BALANCE
+    usage_pace_balance = clip(1.0 - (np.abs(usage_rate - 22) / 30), 0.4, 1.0)
+
+    # 6. FOURTH QUARTER PACE
+    consistency_factor = np.maximum(0.5, 1 - (points_variance / 10))
+    fourth_quarter_pace = clip(possessions_per_48 * consistency_factor, 80, 110)
+
+    # 7. PACE CONSISTENCY
+    pace_consistency = np.maximum(0.0, 1.0 - (pm_variance / 15.0))
+    pace_consistency = clip(pace_consistency, 0.1, 1.0)
+
+    # 8. PACE IMPACT RATING FINAL
+    pace_deviation = (possessions_per_48 - base_pace) / 10
+    efficiency_bonus = (efficiency_on_court - 100) / 20
+    control_bonus = (tempo_control_factor - 1.0) * 3
+    pace_impact_rating = clip(pace_deviation + efficiency_bonus + control_bonus, -10, 10)
+
+    return {
+        "pace_impact_rating": pace_impact_rating,
+        "possessions_per_48": possessions_per_48,
+        "efficiency_on_court": efficiency_on_court,
+        "tempo_control_factor": tempo_control_factor,
+        "transition_efficiency": transition_efficiency,
+        "usage_pace_balance": usage_pace_balance,
+        "fourth_quarter_pace": fourth_quarter_pace,
+        "pace_consistency": pace_consistency,
+        "minutes_per_game": avg_minutes,
+    }
+
+def fatigue_curve(minutes: np.ndarray, efficiency: np.ndarray, days: np.ndarray) -> Dict[str, float]:
+    """
+    Fatigue Resistance Index de un jugador a partir de su registro de partidos
+    ordenado por fecha: minutos, Game Score por minuto (ver game_scores) y día
+    de cada partido
+    """
+    days_diff = np.diff(days)  # días desde el partido anterior
+
+    total_games = len(minutes)
+    avg_minutes = float(minutes.mean())
+    avg_efficiency = float(efficiency.mean())
+
+    # 1. PEAK PERFORMANCE MINUTES: buckets < 20, 20-28, 28-36, 36-42 y > 42 min (mínimo 3 juegos)
+    bucket_peaks = (18.0, 24.0, 32.0, 39.0, 45.0)
+    buckets = np.digitize(minutes, (20, 28, 36, 42))
+    bucket_averages = [
+        (efficiency[buckets == bucket].mean(), peak)
+        for bucket, peak in enumerate(bucket_peaks)
+        if np.count_nonzero(buckets == bucket) >= 3
+    ]
+    peak_performance_minutes = max(bucket_averages, key=itemgetter(0))[1] if bucket_averages else 32.0
+
+    # 2. ENDURANCE RATING: cuartil de menos minutos vs cuartil de más minutos
+    by_minutes = efficiency[np.argsort(minutes, kind="stable")]
+    low_minute_games = by_minutes[:total_games // 4]
+    high_minute_games = by_minutes[3 * total_games // 4:]
+    endurance_rating = 50.0
+    if len(low_minute_games) >= 3 and len(high_minute_games) >= 3:
+        low_avg_eff = low_minute_games.mean()
+        if low_avg_eff > 0:
+            endurance_ratio = high_minute_games.mean() / low_avg_eff
+            endurance_rating = min(100, max(0, 50 + (endurance_ratio - 1) * 80))
+
+    # 3. BACK-TO-BACK EFFICIENCY (1 día exacto) vs juegos con al menos 1 día de descanso
+    b2b_performance = efficiency[1:][days_diff == 1]
+    regular_performance = efficiency[1:][days_diff >= 2]
+    if len(b2b_performance) >= 3 and len(regular_performance) >= 5:
+        regular_avg = regular_performance.mean()
+        back_to_back_efficiency = b2b_performance.mean() / regular_avg if regular_avg > 0 else 1.0
+    else:
+        back_to_back_efficiency = 0.95
+    back_to_back_efficiency = max(0.6, min(1.2, back_to_back_efficiency))
+
+    # 4. FOURTH QUARTER DROPOFF: juegos de alta carga vs carga normal
+    high_load_games = efficiency[minutes > avg_minutes + 6]
+    normal_load_games = efficiency[np.abs(minutes - avg_minutes) <= 3]
+    if len(high_load_games) >= 3 and len(normal_load_games) >= 5:
+        high_load_avg = high_load_games.mean()
+        normal_load_avg = normal_load_games.mean()
+        fourth_quarter_dropoff = max(0, (normal_load_avg - high_load_avg) / normal_load_avg if normal_load_avg > 0 else 0)
+    else:
+        fourth_quarter_dropoff = 0.05
+    fourth_quarter_dropoff = min(0.4, fourth_quarter_dropoff)
+
+    # 5. REST DAY BOOST: después de 2+ días de descanso
+    rest_boost_games = efficiency[1:][days_diff >= 3]
+    if len(rest_boost_games) >= 3 and len(regular_performance) >= 5:
+        regular_avg = regular_performance.mean()
+        rest_day_boost = rest_boost_games.mean() / regular_avg if regular_avg > 0 else 1.0
+    else:
+        rest_day_boost = 1.05
+    rest_day_boost = max(0.9, min(1.3, rest_day_boost))
+
+    # 6. LOAD THRESHOLD: buckets de 3 minutos (juegos de 15+ min, mínimo 2 por bucket)
+    significant = minutes >= 15
+    brackets = (minutes[significant] // 3).astype(np.int64) * 3
+    bracket_values, bracket_counts = np.unique(brackets, return_counts=True)
+    bracket_averages = [
+        (int(bracket), efficiency[significant][brackets == bracket].mean())
+        for bracket, count in zip(bracket_values, bracket_counts)
+        if count >= 2
+    ]
+    load_threshold = 36.0
+    if len(bracket_averages) >= 4:
+        max_performance = max(avg_eff for _, avg_eff in bracket_averages)
+        # Primer punto (30+ min) donde la eficiencia cae un 8% del máximo
+        for bracket, avg_eff in bracket_averages:
+            if avg_eff < max_performance * 0.92 and bracket >= 30:
+                load_threshold = float(bracket)
+                break
+
+    # 7. RECOVERY FACTOR: partido siguiente a uno de alta carga
+    recovery_games = efficiency[1:][(minutes[:-1] > avg_minutes + 10) & (days_diff >= 1)]
+    if len(recovery_games) >= 3:
+        recovery_factor = recovery_games.mean() / avg_efficiency if avg_efficiency > 0 else 1.0
+    else:
+        recovery_factor = 0.95
+    recovery_factor = max(0.7, min(1.2, recovery_factor))
+
+    # 8. FATIGUE RESISTANCE FINAL (25% cada componente)
+    endurance_component = (endurance_rating / 100) * 25
+    b2b_component = (back_to_back_efficiency - 0.6) / 0.6 * 25
+    dropoff_component = (1 - fourth_quarter_dropoff / 0.4) * 25
+    recovery_component = (recovery_factor - 0.7) / 0.5 * 25
+    fatigue_resistance = endurance_component + b2b_component + dropoff_component + recovery_component
+    fatigue_resistance = max(20, min(95, fatigue_resistance))
+
+    return {
+        "fatigue_resistance": fatigue_resistance,
+        "peak_performance_minutes": peak_performance_minutes,
+        "endurance_rating": endurance_rating,
+        "back_to_back_efficiency": back_to_back_efficiency,
+        "fourth_quarter_dropoff": fourth_quarter_dropoff,
+        "rest_day_boost": rest_day_boost,
+        "load_threshold": load_threshold,
+        "recovery_factor": recovery_factor,
+        "games_played": total_games,
+        "average_minutes": avg_minutes,
+    }
+
+def game_scores(stats: Mapping[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Game Score y Game Score por minuto de cada fila de un registro de partidos"""
+    game_score = (
+        stats["points"] + 0.4 * stats["field_goals_made"] - 0.7 * stats["field_goals_attempted"]
+        + 0.7 * stats["rebounds"] + 0.7 * stats["assists"] + stats["steals"]
+        + 0.7 * stats["blocks"] - 0.4 * stats["turnovers"]
+    )
+    minutes = stats["minutes_played"]
+    efficiency = np.divide(game_score, minutes, out=np.zeros_like(game_score), where=minutes > 0)
+    return game_score, efficiency
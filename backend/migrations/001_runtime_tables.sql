@@ -0,0 +1,39 @@
+-- Tablas que hasta ahora se creaban bajo demanda desde el código. La API ya no
+-- crea data_versions ni match_top_performers: las lee de aquí. Solo
+-- ingest_state la sigue creando fill_db/ingest.py si falta.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS match_top_performers (
+    match_id INTEGER NOT NULL REFERENCES matches (id),
+    side VARCHAR(4) NOT NULL,
+    team_id INTEGER NOT NULL REFERENCES teams (id),
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    points FLOAT NOT NULL,
+    rebounds FLOAT NOT NULL,
+    assists FLOAT NOT NULL,
+    steals FLOAT NOT NULL,
+    blocks FLOAT NOT NULL,
+    minutes_played FLOAT NOT NULL,
+    field_goals_attempted FLOAT NOT NULL,
+    field_goals_made FLOAT NOT NULL,
+    three_points_made FLOAT NOT NULL,
+    three_points_attempted FLOAT NOT NULL,
+    free_throws_made FLOAT NOT NULL,
+    free_throws_attempted FLOAT NOT NULL,
+    fouls FLOAT NOT NULL,
+    turnovers FLOAT NOT NULL,
+    computed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (match_id, side)
+);
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    season VARCHAR(20) PRIMARY KEY,
+    last_match_date DATE NOT NULL,
+    last_match_rapidapi_id INTEGER NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
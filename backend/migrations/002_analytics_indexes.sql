@@ -0,0 +1,39 @@
+-- Índices para los patrones de acceso de los endpoints analíticos.
+-- Los nombres coinciden con los __table_args__ de models.py.
+
+-- Estadísticas de un jugador (promedios, progresiones, métricas avanzadas).
+-- Cubre las columnas del box score para que los agregados por jugador sean
+-- index-only scans.
+CREATE INDEX IF NOT EXISTS ix_match_statistics_player_match
+    ON match_statistics (player_id, match_id)
+    INCLUDE (points, rebounds, assists, steals, blocks, turnovers, fouls, minutes_played,
+             field_goals_made, field_goals_attempted, three_points_made, three_points_attempted,
+             free_throws_made, free_throws_attempted, plusminus);
+
+-- Box score de un partido, joins partido → estadísticas y la fusión de la ingesta
+CREATE INDEX IF NOT EXISTS ix_match_statistics_match_player
+    ON match_statistics (match_id, player_id);
+
+-- Mapeo rapidapi → jugador interno de la ingesta
+CREATE INDEX IF NOT EXISTS ix_match_statistics_player_rapidapi
+    ON match_statistics (player_rapidapi_id);
+
+-- Partidos de un equipo en orden cronológico (como local y como visitante)
+CREATE INDEX IF NOT EXISTS ix_matches_home_team_date
+    ON matches (home_team_id, date);
+CREATE INDEX IF NOT EXISTS ix_matches_away_team_date
+    ON matches (away_team_id, date);
+
+-- Últimos partidos (landing, rangos de fechas)
+CREATE INDEX IF NOT EXISTS ix_matches_date_id
+    ON matches (date, id);
+
+-- Plantillas y filtros por posición
+CREATE INDEX IF NOT EXISTS ix_players_current_team
+    ON players (current_team_id);
+CREATE INDEX IF NOT EXISTS ix_players_position
+    ON players (position);
+
+ANALYZE match_statistics;
+ANALYZE matches;
+ANALYZE players;
@@ -0,0 +1,153 @@
+-- Tabla de hechos con los totales de cada equipo en cada partido finalizado.
+-- Los endpoints de equipos leen ~82 filas por equipo en lugar de sumar las
+-- estadísticas de jugadores uniendo por players.current_team_id, que además
+-- atribuía mal los partidos de los jugadores traspasados.
+
+CREATE TABLE IF NOT EXISTS team_game_stats (
+    team_id INTEGER NOT NULL REFERENCES teams (id),
+    match_id INTEGER NOT NULL REFERENCES matches (id),
+    opponent_id INTEGER NOT NULL REFERENCES teams (id),
+    is_home BOOLEAN NOT NULL,
+    match_date DATE NOT NULL,
+    team_score INTEGER NOT NULL,
+    opponent_score INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    points FLOAT NOT NULL,
+    rebounds FLOAT NOT NULL,
+    assists FLOAT NOT NULL,
+    steals FLOAT NOT NULL,
+    blocks FLOAT NOT NULL,
+    minutes_played FLOAT NOT NULL,
+    field_goals_attempted FLOAT NOT NULL,
+    field_goals_made FLOAT NOT NULL,
+    three_points_made FLOAT NOT NULL,
+    three_points_attempted FLOAT NOT NULL,
+    free_throws_made FLOAT NOT NULL,
+    free_throws_attempted FLOAT NOT NULL,
+    fouls FLOAT NOT NULL,
+    turnovers FLOAT NOT NULL,
+    off_rebounds FLOAT NOT NULL,
+    def_rebounds FLOAT NOT NULL,
+    computed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (team_id, match_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_team_game_stats_match ON team_game_stats (match_id);
+
+-- Recalcula las filas de los partidos indicados (NULL = todos).
+--
+-- match_statistics no guarda el equipo del jugador: se deduce igual que en
+-- services/match_sides.py. Cada partido del jugador a ±30 días contra un
+-- tercer equipo vota por el local o el visitante; si hay empate o no hay
+-- votos se usa players.current_team_id cuando es uno de los dos equipos.
+-- Las estadísticas que no se pueden atribuir no cuentan para ningún lado.
+CREATE OR REPLACE FUNCTION refresh_team_game_stats(target_match_ids INTEGER[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    stored INTEGER;
+BEGIN
+    DELETE FROM team_game_stats
+    WHERE target_match_ids IS NULL OR match_id = ANY(target_match_ids);
+
+    INSERT INTO team_game_stats (
+        team_id, match_id, opponent_id, is_home, match_date, team_score, opponent_score, players,
+        points, rebounds, assists, steals, blocks, minutes_played,
+        field_goals_attempted, field_goals_made, three_points_made, three_points_attempted,
+        free_throws_made, free_throws_attempted, fouls, turnovers, off_rebounds, def_rebounds,
+        computed_at
+    )
+    WITH target AS (
+        SELECT id, date, home_team_id, away_team_id, home_score, away_score
+        FROM matches
+        WHERE (target_match_ids IS NULL OR id = ANY(target_match_ids))
+          AND home_score IS NOT NULL AND away_score IS NOT NULL
+    ),
+    votes AS (
+        SELECT
+            s.id AS statistic_id,
+            count(*) FILTER (
+                WHERE t.home_team_id IN (o.home_team_id, o.away_team_id)
+                  AND t.away_team_id NOT IN (o.home_team_id, o.away_team_id)
+            ) AS home_votes,
+            count(*) FILTER (
+                WHERE t.away_team_id IN (o.home_team_id, o.away_team_id)
+                  AND t.home_team_id NOT IN (o.home_team_id, o.away_team_id)
+            ) AS away_votes
+        FROM target t
+        JOIN match_statistics s ON s.match_id = t.id
+        LEFT JOIN (match_statistics os JOIN matches o ON o.id = os.match_id)
+            ON os.player_id = s.player_id
+           AND os.match_id <> s.match_id
+           AND o.date BETWEEN t.date - 30 AND t.date + 30
+        GROUP BY s.id
+    ),
+    attributed AS (
+        SELECT
+            s.*,
+            CASE
+                WHEN v.home_votes > v.away_votes THEN t.home_team_id
+                WHEN v.away_votes > v.home_votes THEN t.away_team_id
+                WHEN p.current_team_id IN (t.home_team_id, t.away_team_id) THEN p.current_team_id
+            END AS team_id
+        FROM target t
+        JOIN match_statistics s ON s.match_id = t.id
+        JOIN votes v ON v.statistic_id = s.id
+        LEFT JOIN players p ON p.id = s.player_id
+    ),
+    box AS (
+        SELECT
+            match_id, team_id,
+            count(*) AS players,
+            coalesce(sum(points), 0) AS points,
+            coalesce(sum(rebounds), 0) AS rebounds,
+            coalesce(sum(assists), 0) AS assists,
+            coalesce(sum(steals), 0) AS steals,
+            coalesce(sum(blocks), 0) AS blocks,
+            coalesce(sum(minutes_played), 0) AS minutes_played,
+            coalesce(sum(field_goals_attempted), 0) AS field_goals_attempted,
+            coalesce(sum(field_goals_made), 0) AS field_goals_made,
+            coalesce(sum(three_points_made), 0) AS three_points_made,
+            coalesce(sum(three_points_attempted), 0) AS three_points_attempted,
+            coalesce(sum(free_throws_made), 0) AS free_throws_made,
+            coalesce(sum(free_throws_attempted), 0) AS free_throws_attempted,
+            coalesce(sum(fouls), 0) AS fouls,
+            coalesce(sum(turnovers), 0) AS turnovers,
+            coalesce(sum(off_rebounds), 0) AS off_rebounds,
+            coalesce(sum(def_rebounds), 0) AS def_rebounds
+        FROM attributed
+        WHERE team_id IS NOT NULL
+        GROUP BY match_id, team_id
+    ),
+    sides AS (
+        SELECT id AS match_id, date, home_team_id AS team_id, away_team_id AS opponent_id,
+               TRUE AS is_home, home_score AS team_score, away_score AS opponent_score
+        FROM target
+        UNION ALL
+        SELECT id, date, away_team_id, home_team_id, FALSE, away_score, home_score
+        FROM target
+    )
+    SELECT
+        sd.team_id, sd.match_id, sd.opponent_id, sd.is_home, sd.date, sd.team_score, sd.opponent_score,
+        coalesce(b.players, 0),
+        coalesce(b.points, 0), coalesce(b.rebounds, 0), coalesce(b.assists, 0),
+        coalesce(b.steals, 0), coalesce(b.blocks, 0), coalesce(b.minutes_played, 0),
+        coalesce(b.field_goals_attempted, 0), coalesce(b.field_goals_made, 0),
+        coalesce(b.three_points_made, 0), coalesce(b.three_points_attempted, 0),
+        coalesce(b.free_throws_made, 0), coalesce(b.free_throws_attempted, 0),
+        coalesce(b.fouls, 0), coalesce(b.turnovers, 0),
+        coalesce(b.off_rebounds, 0), coalesce(b.def_rebounds, 0),
+        now()
+    FROM sides sd
+    LEFT JOIN box b ON b.match_id = sd.match_id AND b.team_id = sd.team_id;
+
+    GET DIAGNOSTICS stored = ROW_COUNT;
+    RETURN stored;
+END;
+$$;
+
+-- Relleno inicial con todos los partidos ya ingeridos
+SELECT refresh_team_game_stats(NULL);
+
+ANALYZE team_game_stats;
@@ -0,0 +1,20 @@
+-- Métricas avanzadas de jugadores (LEBRON, PIPM, RAPTOR WAR, pace impact y
+-- fatigue) calculadas para toda la liga a la vez por services/player_metrics.py.
+-- Cada fila guarda la respuesta completa del endpoint (payload) y el percentil y
+-- puesto en la liga de su valor principal. Se recalcula cuando cambia la
+-- versión de datos (data_versions) o con python -m services.player_metrics.
+
+CREATE TABLE IF NOT EXISTS player_advanced_metrics (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    metric VARCHAR(20) NOT NULL,
+    value FLOAT NOT NULL,
+    league_percentile FLOAT NOT NULL,
+    league_rank INTEGER NOT NULL,
+    payload JSONB NOT NULL,
+    data_version INTEGER NOT NULL DEFAULT 0,
+    computed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (player_id, metric)
+);
+
+-- Rankings de liga por métrica
+CREATE INDEX IF NOT EXISTS ix_player_advanced_metrics_rank ON player_advanced_metrics (metric, league_rank);
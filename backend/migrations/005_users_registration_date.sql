@@ -0,0 +1,9 @@
+-- Contadores de usuarios del panel de administración (registrados hoy, en los
+-- últimos 7 y 30 días y en los periodos anteriores): una sola consulta con
+-- COUNT(*) FILTER sobre rangos de registration_date, ver
+-- AdminMetricsService.get_user_counters en services/admin_metrics.py.
+
+CREATE INDEX IF NOT EXISTS ix_users_registration_date
+    ON users (registration_date);
+
+ANALYZE users;
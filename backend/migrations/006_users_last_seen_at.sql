@@ -0,0 +1,9 @@
+-- Última actividad de cada usuario autenticado. La escribe por lotes
+-- services/activity.py (un UPDATE ... FROM (VALUES ...) cada minuto, no una
+-- escritura por petición) y la usan los usuarios activos del panel de
+-- administración.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP WITHOUT TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_users_last_seen_at
+    ON users (last_seen_at);
@@ -0,0 +1,92 @@
+-- Top performers de cada partido calculados en la ingesta, en la misma
+-- transacción que team_game_stats, en lugar de por el primer visitante de la
+-- landing tras cada ingesta. La API ya no crea match_top_performers: la tabla
+-- es la de la migración 001.
+
+-- Recalcula el mejor jugador (pts+reb+ast) de cada lado de los partidos
+-- indicados (NULL = todos). El equipo de cada jugador se deduce igual que en
+-- refresh_team_game_stats() (migración 003) y services/match_sides.py; con
+-- empate gana la estadística más antigua (menor id), como en
+-- services/top_performers.py.
+CREATE OR REPLACE FUNCTION refresh_match_top_performers(target_match_ids INTEGER[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    stored INTEGER;
+BEGIN
+    DELETE FROM match_top_performers
+    WHERE target_match_ids IS NULL OR match_id = ANY(target_match_ids);
+
+    INSERT INTO match_top_performers (
+        match_id, side, team_id, player_id,
+        points, rebounds, assists, steals, blocks, minutes_played,
+        field_goals_attempted, field_goals_made, three_points_made, three_points_attempted,
+        free_throws_made, free_throws_attempted, fouls, turnovers,
+        computed_at
+    )
+    WITH target AS (
+        SELECT id, date, home_team_id, away_team_id
+        FROM matches
+        WHERE target_match_ids IS NULL OR id = ANY(target_match_ids)
+    ),
+    votes AS (
+        SELECT
+            s.id AS statistic_id,
+            count(*) FILTER (
+                WHERE t.home_team_id IN (o.home_team_id, o.away_team_id)
+                  AND t.away_team_id NOT IN (o.home_team_id, o.away_team_id)
+            ) AS home_votes,
+            count(*) FILTER (
+                WHERE t.away_team_id IN (o.home_team_id, o.away_team_id)
+                  AND t.home_team_id NOT IN (o.home_team_id, o.away_team_id)
+            ) AS away_votes
+        FROM target t
+        JOIN match_statistics s ON s.match_id = t.id
+        LEFT JOIN (match_statistics os JOIN matches o ON o.id = os.match_id)
+            ON os.player_id = s.player_id
+           AND os.match_id <> s.match_id
+           AND o.date BETWEEN t.date - 30 AND t.date + 30
+        GROUP BY s.id
+    ),
+    attributed AS (
+        SELECT
+            s.*,
+            t.home_team_id,
+            CASE
+                WHEN v.home_votes > v.away_votes THEN t.home_team_id
+                WHEN v.away_votes > v.home_votes THEN t.away_team_id
+                WHEN p.current_team_id IN (t.home_team_id, t.away_team_id) THEN p.current_team_id
+            END AS team_id
+        FROM target t
+        JOIN match_statistics s ON s.match_id = t.id
+        JOIN votes v ON v.statistic_id = s.id
+        LEFT JOIN players p ON p.id = s.player_id
+    ),
+    best AS (
+        SELECT DISTINCT ON (match_id, team_id) *
+        FROM attributed
+        WHERE team_id IS NOT NULL
+        ORDER BY match_id, team_id,
+                 coalesce(points, 0) + coalesce(rebounds, 0) + coalesce(assists, 0) DESC, id
+    )
+    SELECT
+        match_id,
+        CASE WHEN team_id = home_team_id THEN 'home' ELSE 'away' END,
+        team_id, player_id,
+        coalesce(points, 0), coalesce(rebounds, 0), coalesce(assists, 0),
+        coalesce(steals, 0), coalesce(blocks, 0), coalesce(minutes_played, 0),
+        coalesce(field_goals_attempted, 0), coalesce(field_goals_made, 0),
+        coalesce(three_points_made, 0), coalesce(three_points_attempted, 0),
+        coalesce(free_throws_made, 0), coalesce(free_throws_attempted, 0),
+        coalesce(fouls, 0), coalesce(turnovers, 0),
+        now()
+    FROM best;
+
+    GET DIAGNOSTICS stored = ROW_COUNT;
+    RETURN stored;
+END;
+$$;
+
+-- Relleno inicial con todos los partidos ya ingeridos
+SELECT refresh_match_top_performers(NULL);
@@ -0,0 +1,15 @@
+-- Partidos que ha tocado cada versión de datos. La ingesta (fill_db/ingest.py)
+-- escribe la fila en la misma transacción en la que incrementa data_versions.
+-- Hasta el commit mantiene bloqueada la fila de la versión, así que las
+-- versiones se confirman en orden. services/game_log.py relee solo los
+-- partidos de las versiones posteriores a la que tiene en memoria, incluidos
+-- los partidos sin marcador, que no tienen fila en team_game_stats.
+-- Sustituye al max(team_game_stats.computed_at) que se usaba como marca de
+-- agua: now() es la hora de inicio de la transacción y una ingesta que empieza
+-- antes de una carga y se confirma después quedaba por debajo de la marca.
+
+CREATE TABLE IF NOT EXISTS data_version_changes (
+    version INTEGER PRIMARY KEY,
+    match_ids INTEGER[] NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
@@ -0,0 +1,137 @@
+"""
+Comprobación de regresión de índices: ejecuta EXPLAIN sobre las consultas
+clave de los endpoints analíticos y verifica que usan el índice esperado.
+
+Con enable_seqscan desactivado se comprueba que el índice es aplicable a la
+consulta (en una base de datos de desarrollo pequeña el planner preferiría
+un seq scan aunque el índice exista).
+
+Uso (desde backend/):
+    python -m migrations.check_indexes
+"""
+import asyncio
+import json
+import sys
+from typing import Iterator, List, NamedTuple
+
+from sqlalchemy import text
+
+from database import engine
+
+INDEX_SCAN_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+class IndexCheck(NamedTuple):
+    description: str
+    query: str
+    expected_index: str
+
+# Las consultas usan ids reales (ver SAMPLE_IDS_SQL) para que el plan sea representativo
+KEY_QUERIES = [
+    IndexCheck(
+        "Box score de un jugador (promedios y métricas)",
+        "SELECT points, rebounds, assists, minutes_played FROM match_statistics WHERE player_id = :player_id",
+        "ix_match_statistics_player_match",
+    ),
+    IndexCheck(
+        "Game log de un jugador por fecha",
+        """
+        SELECT m.date, s.points FROM match_statistics s
+        JOIN matches m ON m.id = s.match_id
+        WHERE s.player_id = :player_id ORDER BY m.date
+        """,
+        "ix_match_statistics_player_match",
+    ),
+    IndexCheck(
+        "Box score de un partido",
+        "SELECT player_id, points FROM match_statistics WHERE match_id = :match_id",
+        "ix_match_statistics_match_player",
+    ),
+    IndexCheck(
+        "Partidos de un equipo como local",
+        "SELECT id, date FROM matches WHERE home_team_id = :team_id ORDER BY date DESC",
+        "ix_matches_home_team_date",
+    ),
+    IndexCheck(
+        "Partidos de un equipo como visitante",
+        "SELECT id, date FROM matches WHERE away_team_id = :team_id ORDER BY date DESC",
+        "ix_matches_away_team_date",
+    ),
+    IndexCheck(
+        "Últimos partidos finalizados",
+        """
+        SELECT id FROM matches
+        WHERE home_score IS NOT NULL AND away_score IS NOT NULL
+        ORDER BY date DESC, id DESC LIMIT 2
+        """,
+        "ix_matches_date_id",
+    ),
+    IndexCheck(
+        "Plantilla de un equipo",
+        "SELECT id, name FROM players WHERE current_team_id = :team_id",
+        "ix_players_current_team",
+    ),
+    IndexCheck(
+        "Jugadores por posición",
+        "SELECT id FROM players WHERE position = :position",
+        "ix_players_position",
+    ),
+    IndexCheck(
+        "Usuarios registrados desde una fecha (panel de administración)",
+        "SELECT count(*) FROM users WHERE registration_date >= now() - interval '7 days'",
+        "ix_users_registration_date",
+    ),
+    IndexCheck(
+        "Usuarios activos desde una fecha (panel de administración)",
+        "SELECT count(*) FROM users WHERE last_seen_at >= now() - interval '1 day'",
+        "ix_users_last_seen_at",
+    ),
+]
+
+SAMPLE_IDS_SQL = """
+    SELECT
+        (SELECT player_id FROM match_statistics LIMIT 1) AS player_id,
+        (SELECT match_id FROM match_statistics LIMIT 1) AS match_id,
+        (SELECT id FROM teams LIMIT 1) AS team_id,
+        (SELECT position FROM players WHERE position IS NOT NULL LIMIT 1) AS position
+"""
+
+def iter_plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+def used_indexes(plan: dict) -> List[str]:
+    return [
+        node["Index Name"]
+        for node in iter_plan_nodes(plan)
+        if node.get("Node Type") in INDEX_SCAN_NODES and "Index Name" in node
+    ]
+
+async def run_checks() -> bool:
+    ok = True
+    async with engine.connect() as connection:
+        sample = (await connection.execute(text(SAMPLE_IDS_SQL))).mappings().one()
+        params = {key: value for key, value in sample.items() if value is not None}
+
+        await connection.execute(text("SET LOCAL enable_seqscan = off"))
+        for check in KEY_QUERIES:
+            result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {check.query}"), params)
+            explain = result.scalar_one()
+            plan = (json.loads(explain) if isinstance(explain, str) else explain)[0]["Plan"]
+            indexes = used_indexes(plan)
+            passed = check.expected_index in indexes
+            ok = ok and passed
+            found = ", ".join(indexes) or "ninguno"
+            print(f"{'✅' if passed else '❌'} {check.description}: esperado {check.expected_index}, usado {found}")
+        await connection.rollback()
+    return ok
+
+def main():
+    ok = asyncio.run(run_checks())
+    if not ok:
+        print("❌ Alguna consulta clave no usa su índice")
+        sys.exit(1)
+    print("✅ Todas las consultas clave usan sus índices")
+
+if __name__ == "__main__":
+    main()
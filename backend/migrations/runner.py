@@ -0,0 +1,146 @@
+"""
+Aplica en orden las migraciones SQL pendientes de este directorio
+(NNN_descripcion.sql). Cada una se ejecuta en su propia transacción y queda
+registrada en schema_migrations con el checksum del fichero.
+
+Las migraciones se aplican ANTES de desplegar el código que las usa: los
+endpoints leen sus tablas y columnas sin crearlas (p.ej. /teams/* lee
+team_game_stats de la 003 y las consultas de usuarios users.last_seen_at de la
+006). La API comprueba al arrancar que no falte ninguna (check_migrations) y,
+si falta, lo registra como error.
+
+Uso (desde backend/):
+    python -m migrations.runner            # aplica las pendientes
+    python -m migrations.runner --status   # muestra el estado sin aplicar nada
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import text
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent
+MIGRATION_FILE_RE = re.compile(r"^(\d{3})_([\w-]+)\.sql$")
+
+CREATE_SCHEMA_MIGRATIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(10) PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+    )
+"""
+
+class Migration(NamedTuple):
+    version: str
+    name: str
+    path: Path
+    sql: str
+    checksum: str
+
+def discover_migrations() -> List[Migration]:
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = MIGRATION_FILE_RE.match(path.name)
+        if not match:
+            logger.warning(f"⚠️ Fichero de migración ignorado (nombre no válido): {path.name}")
+            continue
+        sql = path.read_text(encoding="utf-8")
+        migrations.append(Migration(
+            version=match.group(1),
+            name=match.group(2),
+            path=path,
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+        ))
+
+    versions = [migration.version for migration in migrations]
+    duplicated = {version for version in versions if versions.count(version) > 1}
+    if duplicated:
+        raise ValueError(f"Versiones de migración duplicadas: {sorted(duplicated)}")
+    return migrations
+
+async def run_migrations(status_only: bool = False) -> int:
+    """Aplica las migraciones pendientes; retorna cuántas se han aplicado"""
+    migrations = discover_migrations()
+
+    async with engine.connect() as connection:
+        # asyncpg ejecuta scripts con varias sentencias solo por el protocolo simple
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+
+        await driver.execute(CREATE_SCHEMA_MIGRATIONS_SQL)
+        rows = await driver.fetch("SELECT version, checksum FROM schema_migrations")
+        applied: Dict[str, str] = {row["version"]: row["checksum"] for row in rows}
+
+        pending = []
+        for migration in migrations:
+            if migration.version not in applied:
+                pending.append(migration)
+                print(f"⏳ {migration.path.name}: pendiente")
+            elif applied[migration.version] != migration.checksum:
+                print(f"⚠️ {migration.path.name}: aplicada, pero el fichero ha cambiado desde entonces")
+            else:
+                print(f"✅ {migration.path.name}: aplicada")
+
+        if status_only or not pending:
+            return 0
+
+        for migration in pending:
+            async with driver.transaction():
+                await driver.execute(migration.sql)
+                await driver.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                    migration.version, migration.name, migration.checksum
+                )
+            print(f"🚀 {migration.path.name}: aplicada")
+        return len(pending)
+
+async def pending_migrations() -> List[Migration]:
+    """Migraciones del directorio que aún no constan en schema_migrations (no aplica nada)"""
+    migrations = discover_migrations()
+    async with engine.connect() as connection:
+        exists = await connection.execute(text("SELECT to_regclass('schema_migrations') IS NOT NULL"))
+        applied = set()
+        if exists.scalar():
+            result = await connection.execute(text("SELECT version FROM schema_migrations"))
+            applied = set(result.scalars().all())
+    return [migration for migration in migrations if migration.version not in applied]
+
+async def check_migrations() -> bool:
+    """
+    Comprobación al arrancar la API (solo lee schema_migrations): registra un
+    error si falta alguna migración. Retorna True si están todas aplicadas
+    """
+    try:
+        pending = await pending_migrations()
+    except Exception as e:
+        logger.error(f"❌ No se pudo comprobar el estado de las migraciones: {e}")
+        return False
+    if pending:
+        logger.error(
+            f"❌ Migraciones pendientes: {', '.join(migration.path.name for migration in pending)}. "
+            f"Los endpoints que usan sus tablas fallarán hasta aplicarlas (python -m migrations.runner)"
+        )
+        return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Migraciones SQL de HoopMetrics")
+    parser.add_argument("--status", action="store_true", help="Solo muestra el estado de las migraciones")
+    args = parser.parse_args()
+
+    applied = asyncio.run(run_migrations(status_only=args.status))
+    if not args.status:
+        print(f"📦 {applied} migraciones aplicadas")
+
+if __name__ == "__main__":
+    main()
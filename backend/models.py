@@ -1,5 +1,6 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import Enum as PgEnum
 from typing import Dict, List, Optional, Any
 from datetime import date, datetime
@@ -35,6 +36,12 @@ class Team(SQLModel, table=True):
 
 class Match(SQLModel, table=True):
     __tablename__ = "matches"
+    # Índices creados en migrations/002_analytics_indexes.sql
+    __table_args__ = (
+        Index("ix_matches_home_team_date", "home_team_id", "date"),
+        Index("ix_matches_away_team_date", "away_team_id", "date"),
+        Index("ix_matches_date_id", "date", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     rapidapi_id: Optional[int] = Field(default=None, unique=True)
@@ -60,6 +67,10 @@ class Match(SQLModel, table=True):
 
 class Player(SQLModel, table=True):
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_current_team", "current_team_id"),
+        Index("ix_players_position", "position"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     # Eliminamos rapidapi_id ya que no existe en la base de datos
@@ -79,6 +90,18 @@ class Player(SQLModel, table=True):
 
 class MatchStatistic(SQLModel, table=True):
     __tablename__ = "match_statistics"
+    __table_args__ = (
+        Index(
+            "ix_match_statistics_player_match", "player_id", "match_id",
+            postgresql_include=[
+                "points", "rebounds", "assists", "steals", "blocks", "turnovers", "fouls", "minutes_played",
+                "field_goals_made", "field_goals_attempted", "three_points_made", "three_points_attempted",
+                "free_throws_made", "free_throws_attempted", "plusminus",
+            ],
+        ),
+        Index("ix_match_statistics_match_player", "match_id", "player_id"),
+        Index("ix_match_statistics_player_rapidapi", "player_rapidapi_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     match_id: int = Field(foreign_key="matches.id")
@@ -108,6 +131,93 @@ class MatchStatistic(SQLModel, table=True):
     match: Match = Relationship(back_populates="statistics")
     player: Player = Relationship(back_populates="statistics")
 
+class DataVersion(SQLModel, table=True):
+    """Contador que la ingesta incrementa para invalidar las cachés de respuestas"""
+    __tablename__ = "data_versions"
+
+    name: str = Field(primary_key=True, max_length=50)
+    version: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class MatchTopPerformer(SQLModel, table=True):
+    """Mejor jugador (pts+reb+ast) de cada lado de un partido, precalculado tras la ingesta"""
+    __tablename__ = "match_top_performers"
+
+    match_id: int = Field(foreign_key="matches.id", primary_key=True)
+    side: str = Field(primary_key=True, max_length=4)  # 'home' / 'away'
+    team_id: int = Field(foreign_key="teams.id")  # equipo con el que jugó ese partido
+    player_id: int = Field(foreign_key="players.id")
+    points: float = 0
+    rebounds: float = 0
+    assists: float = 0
+    steals: float = 0
+    blocks: float = 0
+    minutes_played: float = 0
+    field_goals_attempted: float = 0
+    field_goals_made: float = 0
+    three_points_made: float = 0
+    three_points_attempted: float = 0
+    free_throws_made: float = 0
+    free_throws_attempted: float = 0
+    fouls: float = 0
+    turnovers: float = 0
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
+class TeamGameStat(SQLModel, table=True):
+    """
+    Totales de cada equipo en cada partido finalizado (dos filas por partido).
+    Se rellena en la ingesta con refresh_team_game_stats() (migración 003)
+    """
+    __tablename__ = "team_game_stats"
+    __table_args__ = (
+        Index("ix_team_game_stats_match", "match_id"),
+    )
+
+    team_id: int = Field(foreign_key="teams.id", primary_key=True)
+    match_id: int = Field(foreign_key="matches.id", primary_key=True)
+    opponent_id: int = Field(foreign_key="teams.id")
+    is_home: bool
+    match_date: date
+    team_score: int
+    opponent_score: int
+    players: int = 0  # jugadores con estadísticas; 0 si el partido no tiene box score
+    points: float = 0
+    rebounds: float = 0
+    assists: float = 0
+    steals: float = 0
+    blocks: float = 0
+    minutes_played: float = 0
+    field_goals_attempted: float = 0
+    field_goals_made: float = 0
+    three_points_made: float = 0
+    three_points_attempted: float = 0
+    free_throws_made: float = 0
+    free_throws_attempted: float = 0
+    fouls: float = 0
+    turnovers: float = 0
+    off_rebounds: float = 0
+    def_rebounds: float = 0
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PlayerAdvancedMetric(SQLModel, table=True):
+    """
+    Métricas avanzadas (LEBRON, PIPM, RAPTOR, pace, fatigue) calculadas para toda
+    la liga a la vez por services/player_metrics.py (migración 004)
+    """
+    __tablename__ = "player_advanced_metrics"
+    __table_args__ = (
+        Index("ix_player_advanced_metrics_rank", "metric", "league_rank"),
+    )
+
+    player_id: int = Field(foreign_key="players.id", primary_key=True)
+    metric: str = Field(primary_key=True, max_length=20)  # 'lebron', 'pipm', 'raptor', 'pace', 'fatigue'
+    value: float  # valor principal de la métrica
+    league_percentile: float
+    league_rank: int
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))  # campos de la respuesta
+    data_version: int = 0
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
 class TeamRead(SQLModel):
     full_name: str
 
@@ -126,6 +236,7 @@ class StatRead(SQLModel):
     free_throws_attempted: Optional[float] = None
     fouls: Optional[float] = None
     turnovers: Optional[float] = None
+    true_shooting_pct: Optional[float] = None
 
 class PlayerRead(SQLModel):
     id: int
@@ -140,6 +251,25 @@ class PlayerRead(SQLModel):
     stats: List[StatRead] = []
     average_stats: Optional[StatRead] = None
 
+class PlayerRankingPage(SQLModel):
+    sort_by: str
+    items: List[PlayerRead] = []
+    next_cursor: Optional[str] = None
+
+class LeaderEntry(SQLModel):
+    rank: int
+    player_id: int
+    name: str
+    position: Optional[str] = None
+    team: Optional[TeamRead] = None
+    url_pic: Optional[str] = None
+    games: int
+    value: float
+
+class CategoryLeaders(SQLModel):
+    category: str
+    leaders: List[LeaderEntry] = []
+
 class TopPerformer(SQLModel):
     id: int = None
     name: str = None
@@ -163,10 +293,17 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     __tablename__ = "users"  # <-- Añade esta línea
+    # Índices creados en migrations/005_users_registration_date.sql y 006_users_last_seen_at.sql
+    __table_args__ = (
+        Index("ix_users_registration_date", "registration_date"),
+        Index("ix_users_last_seen_at", "last_seen_at"),
+    )
     
     id: int = Field(default=None, primary_key=True)
     password_hash: str
     registration_date: datetime = Field(default_factory=datetime.utcnow)
+    # Última petición autenticada; se guarda por lotes (ver services/activity.py)
+    last_seen_at: Optional[datetime] = Field(default=None)
     role: UserRole = Field(
         default=UserRole.free,
         sa_column=Column(
@@ -344,6 +481,9 @@ class LebronImpactScore(SQLModel):
     percentile_rank: float
     games_played: int
     minutes_per_game: float
+    league_rank: Optional[int] = None          # puesto en la liga (1 = mejor)
+    league_percentile: Optional[float] = None
+    league_size: Optional[int] = None
 
 class PIPMImpact(SQLModel):
     total_pipm: float
@@ -355,6 +495,9 @@ class PIPMImpact(SQLModel):
     minutes_confidence: float
     games_played: int
     usage_rate: float
+    league_rank: Optional[int] = None          # puesto en la liga (1 = mejor)
+    league_percentile: Optional[float] = None
+    league_size: Optional[int] = None
 
 class RaptorWAR(SQLModel):
     total_war: float
@@ -366,6 +509,9 @@ class RaptorWAR(SQLModel):
     injury_risk_factor: float
     games_played: int
     win_shares_comparison: float
+    league_rank: Optional[int] = None          # puesto en la liga (1 = mejor)
+    league_percentile: Optional[float] = None
+    league_size: Optional[int] = None
 
 class PIPMPositionAverage(SQLModel):
     position: str
@@ -391,6 +537,9 @@ class PaceImpactAnalysis(SQLModel):
     pace_consistency: float         # Game-to-game pace variance
     games_played: int
     minutes_per_game: float
+    league_rank: Optional[int] = None          # puesto en la liga (1 = mejor)
+    league_percentile: Optional[float] = None
+    league_size: Optional[int] = None
 
 class FatiguePerformanceCurve(SQLModel):
     fatigue_resistance: float       # 0-100 scale
@@ -403,6 +552,9 @@ class FatiguePerformanceCurve(SQLModel):
     recovery_factor: float          # How quickly bounces back
     games_played: int
     average_minutes: float
+    league_rank: Optional[int] = None          # puesto en la liga (1 = mejor)
+    league_percentile: Optional[float] = None
+    league_size: Optional[int] = None
 
 class TeamAdvancedEfficiency(SQLModel):
     offensive_efficiency: float      # Puntos por 100 posesiones
@@ -530,6 +682,7 @@ class UserProfileResponse(SQLModel):
     username: str
     email: str
     profile_image_url: Optional[str] = None
+    profile_image_variants: Optional[Dict[str, str]] = None  # tamaño (px) -> URL, estilo srcset
     role: UserRole
     registration_date: datetime
 
@@ -591,6 +744,7 @@ class AdminDashboardData(SQLModel):
     user_metrics: UserMetrics
     subscription_metrics: SubscriptionMetrics
     api_metrics: APIMetrics
+    stale_sections: List[str] = []  # secciones servidas con su valor anterior o vacías (ver get_dashboard_data)
     last_updated: str
 
 class AdminUserResponse(SQLModel):
@@ -600,6 +754,7 @@ class AdminUserResponse(SQLModel):
     role: str
     created_at: Optional[datetime] = None
     profile_image_url: Optional[str] = None
+    profile_image_variants: Optional[Dict[str, str]] = None
 
 class AdminLogEntry(SQLModel):
     timestamp: str
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, func, delete
+from sqlmodel import select, delete
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 import logging
@@ -12,6 +12,12 @@ from models import (
     AdminUserResponse
 )
 from services.admin_metrics import admin_metrics_service
+from services.data_version import bump_data_version, data_version_service
+from services.cache import cache_registry
+from services.coalescing import coalescer_registry
+from services.http_cache import response_cache
+from spaces_config import get_profile_image_variants
+
 router = APIRouter(
     prefix="/admin",
     tags=["admin"],
@@ -22,10 +28,10 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/dashboard", response_model=AdminDashboardData)
-async def get_admin_dashboard(db: AsyncSession = Depends(get_db)):
-    """Obtiene todos los datos del dashboard de administración"""
+async def get_admin_dashboard():
+    """Obtiene todos los datos del dashboard de administración (cada sección usa su propia sesión)"""
     try:
-        return await admin_metrics_service.get_dashboard_data(db)
+        return await admin_metrics_service.get_dashboard_data()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,7 +116,8 @@ async def get_all_users(
                 username=user.username,
                 email=user.email,
                 role=user.role.value,
-                profile_image_url=user.profile_image_url
+                profile_image_url=user.profile_image_url,
+                profile_image_variants=get_profile_image_variants(user.profile_image_url)
             ) for user in users
         ]
     except Exception as e:
@@ -193,18 +200,11 @@ async def delete_user(
 async def get_user_stats(db: AsyncSession = Depends(get_db)):
     """Obtiene estadísticas rápidas de usuarios"""
     try:
-        total_users_result = await db.execute(select(func.count(User.id)))
-        total_users = total_users_result.scalar() or 0
-        
-        # Count by role
-        users_by_role_result = await db.execute(
-            select(User.role, func.count(User.id)).group_by(User.role)
-        )
-        users_by_role = {row[0].value: row[1] for row in users_by_role_result.all()}
-        
+        # Mismos contadores (y caché) que las métricas de usuarios del dashboard
+        counters = await admin_metrics_service.get_user_counters(db)
         return {
-            "total_users": total_users,
-            "users_by_role": users_by_role
+            "total_users": counters.total,
+            "users_by_role": counters.by_role
         }
     except Exception as e:
         raise HTTPException(
@@ -255,12 +255,10 @@ async def force_refresh_api_metrics(db: AsyncSession = Depends(get_db)):
     """Fuerza la actualización de métricas de API limpiando el cache"""
     try:
         # ✅ Limpiar cache específico para métricas críticas
-        cache_keys_to_clear = ["api_metrics", "user_metrics", "subscription_metrics", "dashboard_data"]
+        cache_keys_to_clear = ["api_metrics", "user_counters", "user_metrics", "subscription_metrics"]
         for key in cache_keys_to_clear:
-            if key in admin_metrics_service.cache:
-                del admin_metrics_service.cache[key]
-            if key in admin_metrics_service.last_cache_update:
-                del admin_metrics_service.last_cache_update[key]
+            await admin_metrics_service.cache.invalidate(key)
+        admin_metrics_service.invalidate_sections()
         
         logger.info("🧹 Cache cleared for critical metrics")
         
@@ -276,4 +274,30 @@ async def force_refresh_api_metrics(db: AsyncSession = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error refreshing API metrics: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """Estado de la caché HTTP de respuestas y de las cachés de resultados"""
+    return {
+        "data_version": data_version_service.version,
+        "response_cache": response_cache.stats(),
+        "result_caches": {name: cache.stats() for name, cache in cache_registry.items()},
+        "coalescers": {name: coalescer.stats() for name, coalescer in coalescer_registry.items()}
+    }
+
+@router.post("/cache/invalidate")
+async def invalidate_response_cache(db: AsyncSession = Depends(get_db)):
+    """Incrementa la versión de datos para invalidar todas las respuestas cacheadas"""
+    try:
+        version = await bump_data_version(db)
+        response_cache.clear()
+        return {
+            "message": "Response cache invalidated",
+            "data_version": version
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error invalidating cache: {str(e)}"
+        )
@@ -1,11 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends
-from sqlmodel import case, desc, func, select
+from fastapi import APIRouter, Depends, Request, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 
-from models import Match, MatchStatistic, Player, PlayerRead, StatRead, Team, TeamRead, TopPerformer
+from models import TopPerformer
 from deps import get_db
+from services.http_cache import etag_matches
+from services.top_performers import top_performers_service
 
 router = APIRouter(
     prefix="/home",
@@ -14,99 +15,21 @@ router = APIRouter(
 
 
 @router.get("/top-performers", response_model=List[TopPerformer])
-async def read_top_performers(session: AsyncSession = Depends(get_db)):
+async def read_top_performers(request: Request, session: AsyncSession = Depends(get_db)):
     try:
-        # Execute the query
-        matches_result = await session.execute(
-            select(Match)
-            .where(Match.home_score.is_not(None))
-            .where(Match.away_score.is_not(None))
-            .order_by(desc(Match.date))
-            .limit(2)
-        )
-        
-        # Extract the actual Match objects
-        matches = matches_result.scalars().all()
-        
-        performers: List[TopPerformer] = []
-        for match in matches:
-            # Now match is a proper Match object
-            side_expr = case(
-                (Player.current_team_id == match.home_team_id, 'home'),
-                (Player.current_team_id == match.away_team_id, 'away'),
-                else_='other'
-            ).label("side")
+        # Respuesta precalculada: solo cambia cuando hay un partido finalizado más reciente
+        body, etag = await top_performers_service.get_response(session)
 
-            # 2) Expresión para 'total' = points + rebounds + assists
-            total_expr = (
-                func.coalesce(MatchStatistic.points,  0) +
-                func.coalesce(MatchStatistic.rebounds,0) +
-                func.coalesce(MatchStatistic.assists, 0)
-            ).label("total")
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "public, max-age=60, stale-while-revalidate=300",
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
 
-            # 3) Statement con DISTINCT ON(side)
-            stmt = (
-                select(
-                    MatchStatistic,
-                    total_expr,
-                    Player.id.label("player_id"),
-                    Player.name.label("player_name"),
-                    Player.current_team_id.label("player_team_id"),
-                    Player.url_pic.label("player_url_pic"),
-                    side_expr,
-                )
-                .join(Player, MatchStatistic.player_id == Player.id)
-                .where(MatchStatistic.match_id == match.id)
-                .distinct(side_expr)
-                .order_by(side_expr, desc(total_expr))
-            )
-
-            # 4) Ejecutar y mapear resultados
-            result = await session.execute(stmt)
-            rows = result.all()
-
-            for stat, total, player_id, player_name, player_team_id, player_url_pic, side in rows:
-                if (side == 'other'): continue
-
-                match = match  # Ya lo tienes
-                team = await session.get(Team, player_team_id) if player_team_id else None
-
-                performers.append(
-                    TopPerformer(
-                        id         = player_id,
-                        name       = player_name,
-                        team       = TeamRead(full_name=team.full_name) if team else None,
-                        url_pic    = player_url_pic,
-                        game_stats = StatRead(
-                            points=stat.points or 0,
-                            rebounds=stat.rebounds or 0,
-                            assists=stat.assists or 0,
-                            steals=stat.steals or 0,
-                            blocks=stat.blocks or 0,
-                            minutes_played=stat.minutes_played or 0.0,
-                            field_goals_attempted=stat.field_goals_attempted or 0,
-                            field_goals_made=stat.field_goals_made or 0,
-                            three_points_made=stat.three_points_made or 0,
-                            three_points_attempted=stat.three_points_attempted or 0,
-                            free_throws_made=stat.free_throws_made or 0,
-                            free_throws_attempted=stat.free_throws_attempted or 0,
-                            fouls=stat.fouls or 0,
-                            turnovers=stat.turnovers or 0,
-                        ),
-                        isWinner = (
-                            (side == 'home' and match.home_score > match.away_score)
-                            or
-                            (side == 'away' and match.away_score > match.home_score)
-                        ),
-                        points   = int(stat.points or 0),
-                        rebounds = int(stat.rebounds or 0),
-                        assists  = int(stat.assists or 0),
-                    )
-                )
-        
-        return performers
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         # Log the exception for debugging
-        print(f"Error in read_players: {str(e)}")
+        print(f"Error in read_top_performers: {str(e)}")
         # Re-raise it so FastAPI can handle it appropriately
         raise
@@ -0,0 +1,71 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from deps import get_db
+from models import CategoryLeaders, LeaderEntry, TeamRead
+from services.leaderboards import leaderboard_service, LEADER_CATEGORIES
+
+router = APIRouter(
+    prefix="/leaders",
+    tags=["leaders"]
+)
+
+def _build_category_leaders(snapshot, category: str, limit: int, position, team_id, min_games) -> CategoryLeaders:
+    attr = LEADER_CATEGORIES[category]
+    entries = snapshot.leaders(category, limit, position=position, team_id=team_id, min_games=min_games)
+    return CategoryLeaders(
+        category=category,
+        leaders=[
+            LeaderEntry(
+                rank=rank,
+                player_id=entry.id,
+                name=entry.name,
+                position=entry.position,
+                team=TeamRead(full_name=entry.team) if entry.team else None,
+                url_pic=entry.url_pic,
+                games=entry.games,
+                value=round(getattr(entry, attr), 1),
+            )
+            for rank, entry in enumerate(entries, start=1)
+        ]
+    )
+
+@router.get("/", response_model=List[CategoryLeaders])
+async def read_leaders(
+    limit: int = Query(5, ge=1, le=50),
+    position: Optional[str] = None,
+    team_id: Optional[int] = None,
+    min_games: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_db)
+):
+    """Líderes de todas las categorías (puntos, rebotes, asistencias, robos, tapones, TS%, game score y +/-)"""
+    try:
+        snapshot = await leaderboard_service.get_snapshot(session)
+        return [
+            _build_category_leaders(snapshot, category, limit, position, team_id, min_games)
+            for category in LEADER_CATEGORIES
+        ]
+    except Exception as e:
+        print(f"Error in read_leaders: {str(e)}")
+        raise
+
+@router.get("/{category}", response_model=CategoryLeaders)
+async def read_category_leaders(
+    category: str,
+    limit: int = Query(10, ge=1, le=100),
+    position: Optional[str] = None,
+    team_id: Optional[int] = None,
+    min_games: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_db)
+):
+    """Top-K de una categoría, filtrable por posición, equipo y partidos mínimos"""
+    if category not in LEADER_CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Unknown category. Valid categories: {', '.join(LEADER_CATEGORIES)}")
+
+    try:
+        snapshot = await leaderboard_service.get_snapshot(session)
+        return _build_category_leaders(snapshot, category, limit, position, team_id, min_games)
+    except Exception as e:
+        print(f"Error in read_category_leaders: {str(e)}")
+        raise
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from deps import get_db, get_current_user
 from models import User, UserProfileUpdate, UserProfileResponse
 from crud import update_user_profile, get_user_profile
-from spaces_config import upload_profile_image, delete_profile_image
+from spaces_config import upload_profile_image, delete_profile_image, get_profile_image_variants
 
 router = APIRouter(
     prefix="/profile",
@@ -31,6 +31,7 @@ async def get_my_profile(
             username=user.username,
             email=user.email,
             profile_image_url=user.profile_image_url,
+            profile_image_variants=get_profile_image_variants(user.profile_image_url),
             role=user.role,
             registration_date=user.registration_date
         )
@@ -66,6 +67,7 @@ async def update_profile(
             username=updated_user.username,
             email=updated_user.email,
             profile_image_url=updated_user.profile_image_url,
+            profile_image_variants=get_profile_image_variants(updated_user.profile_image_url),
             role=updated_user.role,
             registration_date=updated_user.registration_date
         )
@@ -83,6 +85,7 @@ async def update_profile(
 
 @router.post("/upload-image", response_model=dict)
 async def upload_profile_image_endpoint(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -105,9 +108,7 @@ async def upload_profile_image_endpoint(
                 detail="Failed to upload image"
             )
         
-        # Eliminar imagen anterior si existe
-        if current_user.profile_image_url:
-            await delete_profile_image(current_user.profile_image_url)
+        previous_image_url = current_user.profile_image_url
         
         # Actualizar URL en la base de datos
         updated_user = await update_user_profile(
@@ -116,13 +117,24 @@ async def upload_profile_image_endpoint(
             profile_image_url=image_url
         )
         
+        # Eliminar imagen anterior en segundo plano, una vez enviada la respuesta
+        # (las claves son deterministas: si se sube la misma imagen no hay nada que borrar)
+        if previous_image_url and previous_image_url != image_url:
+            background_tasks.add_task(delete_profile_image, previous_image_url)
+        
         return {
             "message": "Profile image uploaded successfully",
-            "image_url": image_url
+            "image_url": image_url,
+            "image_variants": get_profile_image_variants(image_url)
         }
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, Integer, and_, column, or_, update, values
+
+from database import SessionLocal
+from models import User
+
+logger = logging.getLogger(__name__)
+
+class ActivityTracker:
+    """
+    Última actividad de los usuarios autenticados (users.last_seen_at) sin una
+    escritura por petición: get_current_user solo anota al usuario en memoria y
+    lo acumulado se vuelca con un único UPDATE ... FROM (VALUES ...).
+
+    El volcado lo lanzan las propias peticiones: mark_active programa uno
+    cuando la actividad pendiente más antigua supera `flush_interval` segundos
+    o hay `max_pending` usuarios pendientes. La tarea periódica de start() y el
+    volcado de stop() no bastan en Vercel: cada instancia serverless se congela
+    entre peticiones (el bucle no avanza) y se destruye sin evento de shutdown,
+    así que lo pendiente se perdería. Con el disparo por petición se pierde como
+    mucho lo de la última ventana de cada instancia.
+    """
+
+    def __init__(self, flush_interval: float = 60, max_pending: int = 500):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: Dict[int, datetime] = {}  # user_id -> última petición desde el último volcado
+        self.flushed = 0
+        self.errors = 0
+        self._pending_since: Optional[float] = None  # time.monotonic() de la actividad pendiente más antigua
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def mark_active(self, user_id: int):
+        self.pending[user_id] = datetime.utcnow()
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since >= self.flush_interval or len(self.pending) >= self.max_pending:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Volcado en segundo plano lanzado desde una petición (uno a la vez)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Vuelca las actividades pendientes; retorna cuántos usuarios se han actualizado"""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            self._pending_since = None
+
+            seen = values(column("id", Integer), column("seen_at", DateTime), name="seen").data(list(batch.items()))
+            stmt = (
+                update(User)
+                .where(and_(
+                    User.id == seen.c.id,
+                    or_(User.last_seen_at.is_(None), User.last_seen_at < seen.c.seen_at),
+                ))
+                .values(last_seen_at=seen.c.seen_at)
+            )
+            try:
+                async with SessionLocal() as session:
+                    result = await session.execute(stmt)
+                    await session.commit()
+            except Exception as e:
+                # Se reintenta en el siguiente volcado sin pisar actividades más recientes
+                for user_id, seen_at in batch.items():
+                    if self.pending.get(user_id, seen_at) <= seen_at:
+                        self.pending[user_id] = seen_at
+                if self._pending_since is None:
+                    self._pending_since = time.monotonic()
+                self.errors += 1
+                logger.error(f"❌ Error guardando la actividad de {len(batch)} usuarios: {e}")
+                return 0
+
+            self.flushed += result.rowcount
+            logger.info(f"👣 Actividad guardada para {result.rowcount} usuarios")
+            return result.rowcount
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Arranca el volcado periódico (una tarea por proceso; en serverless lo suplen las peticiones)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene el volcado periódico y guarda lo pendiente"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+# Instancia global del servicio
+activity_tracker = ActivityTracker()
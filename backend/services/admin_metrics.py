@@ -1,12 +1,12 @@
+import asyncio
 import time
-import psutil
 import logging
 import sys
 import random
 from datetime import datetime, timedelta
-from sqlalchemy import text, func
+from sqlalchemy import and_, text, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, List, Any
+from typing import Dict, List, Any, NamedTuple, Tuple, Type, get_origin
 from collections import defaultdict
 
 # Configurar logging específico para este servicio
@@ -23,20 +23,65 @@ if not logger.handlers:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
-from sqlmodel import select
+from sqlmodel import SQLModel, select
 from models import (
     User, UserRole, SystemHealthMetrics, DatabaseMetrics, 
     UserMetrics, SubscriptionMetrics, APIMetrics, AdminDashboardData
 )
 from config import get_settings
+from database import SessionLocal
+from services.cache import AsyncCache
 
 settings = get_settings()
 
+# Los contadores de usuarios se comparten entre las métricas de un mismo refresco
+USER_COUNTERS_TTL = 10
+
+class UserCounters(NamedTuple):
+    total: int
+    by_role: Dict[str, int]  # todos los roles de UserRole, también los que no tienen usuarios
+    registered_today: int
+    registered_7d: int
+    registered_previous_7d: int  # entre hace 14 y 7 días
+    registered_previous_30d: int  # entre hace 60 y 30 días
+    active_24h: int  # last_seen_at en las últimas 24 horas
+    active_7d: int
+    retained_previous_7d: int  # registrados entre hace 14 y 7 días y activos en los últimos 7
+    retained_previous_30d: int  # registrados entre hace 60 y 30 días y activos en los últimos 30
+
+class DashboardSection(NamedTuple):
+    method: str  # método de AdminMetricsService que la calcula
+    model: Type[SQLModel]  # modelo de la sección en AdminDashboardData
+    max_age: float  # presupuesto de antigüedad (s): pasado, se recalcula
+    uses_db: bool = True
+
+# Secciones de AdminDashboardData; los presupuestos coinciden con el TTL de la caché de cada una
+DASHBOARD_SECTIONS = {
+    "system_health": DashboardSection("get_system_health_metrics", SystemHealthMetrics, 30, uses_db=False),
+    "database_metrics": DashboardSection("get_database_metrics", DatabaseMetrics, 30),
+    "user_metrics": DashboardSection("get_user_metrics", UserMetrics, USER_COUNTERS_TTL),
+    "subscription_metrics": DashboardSection("get_subscription_metrics", SubscriptionMetrics, USER_COUNTERS_TTL),
+    "api_metrics": DashboardSection("get_api_metrics", APIMetrics, 30),
+}
+
+# Lo que espera el dashboard a las secciones que se están recalculando antes de
+# servir su valor anterior (el objetivo de /admin/dashboard son 200 ms)
+DASHBOARD_DEADLINE = 0.15
+
+# Lo que espera como máximo a una sección sin valor previo (la muestra de CPU de
+# psutil ya tarda ~1 s); pasado ese tiempo se sirve vacía
+DASHBOARD_FIRST_LOAD_DEADLINE = 3.0
+
+def empty_section(model: Type[SQLModel]) -> SQLModel:
+    """Sección sin datos (ceros y colecciones vacías) para cuando no hay valor que servir"""
+    return model(**{
+        name: (get_origin(field.annotation) or field.annotation)()
+        for name, field in model.model_fields.items()
+    })
+
 class AdminMetricsService:
     def __init__(self):
-        self.cache = {}
-        self.cache_ttl = 30  # 30 segundos
-        self.last_cache_update = {}
+        self.cache = AsyncCache("admin_metrics", default_ttl=30, max_entries=64)  # 30 segundos por defecto
         self.startup_time = time.time()
         
         # Contadores mejorados para métricas de API
@@ -57,6 +102,11 @@ class AdminMetricsService:
         # Máximo de registros históricos a mantener
         self.max_history_records = 10000
 
+        # Último valor de cada sección del dashboard (valor, time.monotonic() al calcularlo)
+        # y el refresco en curso de cada una
+        self._sections: Dict[str, Tuple[Any, float]] = {}
+        self._section_tasks: Dict[str, asyncio.Task] = {}
+
     def record_request(self, response_time: float, status_code: int, endpoint: str = None):
         """Registra métricas de requests con información completa"""
         self.request_count += 1
@@ -96,31 +146,28 @@ class AdminMetricsService:
         endpoint = re.sub(r'/\d+', '/{id}', endpoint)
         return endpoint
 
-    def _is_cache_valid(self, key: str) -> bool:
-        """Verifica si el cache es válido para una key"""
-        if key not in self.cache or key not in self.last_cache_update:
-            return False
-        
-        time_since_update = time.time() - self.last_cache_update[key]
-        return time_since_update < self.cache_ttl
+    @staticmethod
+    def _sample_system():
+        """Muestreo con psutil; cpu_percent bloquea 1 segundo"""
+        import psutil  # solo lo usa el panel de administración: fuera del arranque en frío
 
-    def _update_cache(self, key: str, data: Any):
-        """Actualiza el cache con nuevos datos"""
-        self.cache[key] = data
-        self.last_cache_update[key] = time.time()
+        return (
+            psutil.cpu_percent(interval=1),
+            psutil.virtual_memory(),
+            psutil.disk_usage('/'),
+            len(psutil.net_connections(kind='inet')),
+        )
 
     async def get_system_health_metrics(self) -> SystemHealthMetrics:
         """Obtiene métricas REALES del sistema usando psutil"""
         try:
             cache_key = "system_health"
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]
+            cached_metrics = await self.cache.get(cache_key)
+            if cached_metrics is not None:
+                return cached_metrics
 
-            # Métricas reales del sistema usando psutil
-            cpu_usage = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            net_connections = len(psutil.net_connections(kind='inet'))
+            # Métricas reales del sistema usando psutil, fuera del event loop
+            cpu_usage, memory, disk, net_connections = await asyncio.to_thread(self._sample_system)
             
             # Calcular uptime desde el inicio de la aplicación
             uptime_seconds = int(time.time() - self.startup_time)
@@ -145,7 +192,7 @@ class AdminMetricsService:
                 requests_per_minute=requests_per_minute
             )
             
-            self._update_cache(cache_key, metrics)
+            await self.cache.set(cache_key, metrics)
             return metrics
             
         except Exception as e:
@@ -166,8 +213,9 @@ class AdminMetricsService:
         """Obtiene métricas REALES de la base de datos"""
         try:
             cache_key = "database_metrics"
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]
+            cached_metrics = await self.cache.get(cache_key)
+            if cached_metrics is not None:
+                return cached_metrics
 
             # Obtener estadísticas reales de la base de datos
             db_size_result = await db.execute(text("""
@@ -198,16 +246,23 @@ class AdminMetricsService:
             active_connections = conn_stats[1] if conn_stats else 1
             idle_connections = conn_stats[2] if conn_stats else 4
             
-            # Get real query statistics
-            query_stats_result = await db.execute(text("""
-                SELECT 
-                    SUM(calls) as total_queries,
-                    AVG(mean_exec_time) as avg_time,
-                    COUNT(CASE WHEN mean_exec_time > 1000 THEN 1 END) as slow_queries
-                FROM pg_stat_statements 
-                WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
-            """))
-            query_stats = query_stats_result.fetchone()
+            # Get real query statistics. pg_stat_statements es una extensión opcional: si
+            # falla, el savepoint evita abortar la transacción de la sesión, que el
+            # dashboard comparte con las métricas de usuarios y de suscripciones
+            query_stats = None
+            try:
+                async with db.begin_nested():
+                    query_stats_result = await db.execute(text("""
+                        SELECT 
+                            SUM(calls) as total_queries,
+                            AVG(mean_exec_time) as avg_time,
+                            COUNT(CASE WHEN mean_exec_time > 1000 THEN 1 END) as slow_queries
+                        FROM pg_stat_statements 
+                        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+                    """))
+                    query_stats = query_stats_result.fetchone()
+            except Exception as stats_error:
+                logger.info(f"pg_stat_statements no disponible: {stats_error.__class__.__name__}")
             
             # Fallback to system queries if pg_stat_statements not available
             if not query_stats or query_stats[0] is None:
@@ -235,7 +290,7 @@ class AdminMetricsService:
                 avg_query_time_ms=round(avg_query_time, 1)
             )
 
-            self._update_cache(cache_key, metrics)
+            await self.cache.set(cache_key, metrics)
             return metrics
             
         except Exception as e:
@@ -251,6 +306,49 @@ class AdminMetricsService:
                 avg_query_time_ms=25.3
             )
 
+    async def get_user_counters(self, db: AsyncSession) -> UserCounters:
+        """
+        Contadores de usuarios por rol y por fecha de registro. Se cachean
+        USER_COUNTERS_TTL segundos y las llamadas concurrentes comparten la
+        consulta: las métricas de usuarios, las de suscripciones y
+        /admin/users/stats usan el mismo resultado en cada refresco del dashboard
+        """
+        return await self.cache.get_or_set(
+            "user_counters", lambda: self._load_user_counters(db), ttl=USER_COUNTERS_TTL
+        )
+
+    async def _load_user_counters(self, db: AsyncSession) -> UserCounters:
+        """Todos los contadores en una sola consulta con COUNT(*) FILTER (ix_users_registration_date)"""
+        now = datetime.utcnow()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = now - timedelta(days=7)
+        month_start = now - timedelta(days=30)
+        registered = User.registration_date
+        seen = User.last_seen_at  # ver services/activity.py
+        previous_week = registered.between(now - timedelta(days=14), week_start)
+        previous_month = registered.between(now - timedelta(days=60), month_start)
+
+        windows = {
+            "registered_today": registered >= today_start,
+            "registered_7d": registered >= week_start,
+            "registered_previous_7d": previous_week,
+            "registered_previous_30d": previous_month,
+            "active_24h": seen >= now - timedelta(hours=24),
+            "active_7d": seen >= week_start,
+            "retained_previous_7d": and_(previous_week, seen >= week_start),
+            "retained_previous_30d": and_(previous_month, seen >= month_start),
+        }
+        columns = [func.count().label("total")]
+        columns += [func.count().filter(condition).label(name) for name, condition in windows.items()]
+        columns += [func.count().filter(User.role == role).label(f"role_{role.value}") for role in UserRole]
+
+        row = (await db.execute(select(*columns).select_from(User))).one()._mapping
+        return UserCounters(
+            total=row["total"],
+            by_role={role.value: row[f"role_{role.value}"] for role in UserRole},
+            **{name: row[name] for name in windows},
+        )
+
     async def get_user_metrics(self, db: AsyncSession) -> UserMetrics:
         """Obtiene métricas REALES de usuarios"""
         try:
@@ -258,113 +356,26 @@ class AdminMetricsService:
             # ✅ CACHE MÁS CORTO para datos críticos
             cache_ttl_users = 10  # Solo 10 segundos para user metrics
             
-            if (cache_key in self.cache and 
-                cache_key in self.last_cache_update and 
-                time.time() - self.last_cache_update[cache_key] < cache_ttl_users):
+            cached_metrics = await self.cache.get(cache_key)
+            if cached_metrics is not None:
                 logger.info(f"✅ Using cached user metrics")
-                return self.cache[cache_key]
+                return cached_metrics
             
             logger.info(f"🔄 Fetching fresh user metrics from database")
+            counters = await self.get_user_counters(db)
+            total_users = counters.total
+            users_by_role = dict(counters.by_role)
+            logger.info(f"📊 Real users by role: {users_by_role}")
             
-            # Total de usuarios REAL
-            total_users_result = await db.execute(select(func.count(User.id)))
-            total_users = total_users_result.scalar() or 0
-            
-            # ✅ Usuarios por rol REAL - con mejor manejo de errores
-            try:
-                users_by_role_result = await db.execute(
-                    select(User.role, func.count(User.id)).group_by(User.role)
-                )
-                users_by_role_raw = users_by_role_result.all()
-                
-                # Convertir a diccionario con manejo de enum
-                users_by_role = {}
-                for row in users_by_role_raw:
-                    role_value = row[0].value if hasattr(row[0], 'value') else str(row[0])
-                    users_by_role[role_value] = row[1]
-                
-                # Asegurar que todos los roles existen
-                all_roles = ["admin", "free", "premium", "ultimate"]
-                for role in all_roles:
-                    if role not in users_by_role:
-                        users_by_role[role] = 0
-                
-                logger.info(f"📊 Real users by role: {users_by_role}")
-                
-            except Exception as role_error:
-                logger.error(f"Error getting users by role: {role_error}")
-                users_by_role = {"admin": 1, "free": 0, "premium": 0, "ultimate": 0}
-            
-            # Fechas importantes para los cálculos
-            now = datetime.utcnow()
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            yesterday_start = today_start - timedelta(days=1)
-            week_start = now - timedelta(days=7)
-            month_start = now - timedelta(days=30)
-            
-            # ACTIVE USERS 24H - usuarios que se registraron en las últimas 24h
-            # Nota: En un sistema real, usarías last_login_date
-            active_24h_result = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date >= yesterday_start
-                )
-            )
-            active_users_24h = active_24h_result.scalar() or 0
-            
-            # ACTIVE USERS 7D - usuarios registrados en los últimos 7 días
-            active_7d_result = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date >= week_start
-                )
-            )
-            active_users_7d = active_7d_result.scalar() or 0
-            
-            # NEW USERS TODAY - usuarios registrados hoy
-            new_today_result = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date >= today_start
-                )
-            )
-            new_users_today = new_today_result.scalar() or 0
-            
-            # NEW USERS THIS WEEK - usuarios registrados esta semana
-            new_week_result = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date >= week_start
-                )
-            )
-            new_users_this_week = new_week_result.scalar() or 0
-            
-            # RETENTION RATE 7D - cálculo mejorado
-            two_weeks_ago = now - timedelta(days=14)
-            users_registered_week_ago = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date.between(two_weeks_ago, week_start)
-                )
-            )
-            users_week_ago_count = users_registered_week_ago.scalar() or 1
-            
-            # Calcular retention basado en usuarios que siguen activos
-            retention_rate_7d = min(100.0, (active_users_7d / max(users_week_ago_count, 1)) * 100)
-            
-            # RETENTION RATE 30D
-            two_months_ago = now - timedelta(days=60)
-            users_registered_month_ago = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date.between(two_months_ago, month_start)
-                )
-            )
-            users_month_ago_count = users_registered_month_ago.scalar() or 1
-            
-            # Usuarios registrados en el último mes
-            active_month_result = await db.execute(
-                select(func.count(User.id)).where(
-                    User.registration_date >= month_start
-                )
-            )
-            active_users_30d = active_month_result.scalar() or 0
+            # ACTIVE USERS - con alguna petición autenticada en las últimas 24h / 7 días (last_seen_at)
+            active_users_24h = counters.active_24h
+            active_users_7d = counters.active_7d
+            new_users_today = counters.registered_today
+            new_users_this_week = counters.registered_7d
             
-            retention_rate_30d = min(100.0, (active_users_30d / max(users_month_ago_count, 1)) * 100)
+            # RETENTION RATE 7D y 30D - usuarios del periodo anterior que siguen activos
+            retention_rate_7d = counters.retained_previous_7d / max(counters.registered_previous_7d, 1) * 100
+            retention_rate_30d = counters.retained_previous_30d / max(counters.registered_previous_30d, 1) * 100
 
             # Log para debug
             logger.info(f"User metrics calculated: total={total_users}, active_24h={active_users_24h}, active_7d={active_users_7d}")
@@ -381,8 +392,7 @@ class AdminMetricsService:
             )
             
             # ✅ Usar TTL específico para user metrics
-            self.cache[cache_key] = metrics
-            self.last_cache_update[cache_key] = time.time()
+            await self.cache.set(cache_key, metrics, ttl=cache_ttl_users)
             
             logger.info(f"✅ User metrics cached: {metrics.users_by_role}")
             return metrics
@@ -407,32 +417,16 @@ class AdminMetricsService:
             # ✅ CACHE MÁS CORTO para datos críticos
             cache_ttl_subs = 10  # Solo 10 segundos para subscription metrics
             
-            if (cache_key in self.cache and 
-                cache_key in self.last_cache_update and 
-                time.time() - self.last_cache_update[cache_key] < cache_ttl_subs):
+            cached_metrics = await self.cache.get(cache_key)
+            if cached_metrics is not None:
                 logger.info(f"✅ Using cached subscription metrics")
-                return self.cache[cache_key]
+                return cached_metrics
             
             logger.info(f"🔄 Fetching fresh subscription metrics from database")
             
-            # ✅ Obtener distribución real de roles de usuarios - con mejor manejo
-            try:
-                users_by_role_result = await db.execute(
-                    select(User.role, func.count(User.id)).group_by(User.role)
-                )
-                role_counts_raw = users_by_role_result.all()
-                
-                # Convertir a diccionario con manejo de enum
-                role_counts = {}
-                for row in role_counts_raw:
-                    role_value = row[0].value if hasattr(row[0], 'value') else str(row[0])
-                    role_counts[role_value] = row[1]
-                
-                logger.info(f"📊 Raw role counts: {role_counts}")
-                
-            except Exception as role_error:
-                logger.error(f"Error getting subscription role counts: {role_error}")
-                role_counts = {"admin": 1, "free": 0, "premium": 0, "ultimate": 0}
+            # Distribución real de roles (contadores compartidos con get_user_metrics)
+            role_counts = (await self.get_user_counters(db)).by_role
+            logger.info(f"📊 Raw role counts: {role_counts}")
             
             # Calcular métricas basadas en roles reales
             free_users = role_counts.get('free', 0)
@@ -477,8 +471,7 @@ class AdminMetricsService:
             )
             
             # ✅ Usar TTL específico para subscription metrics
-            self.cache[cache_key] = metrics
-            self.last_cache_update[cache_key] = time.time()
+            await self.cache.set(cache_key, metrics, ttl=cache_ttl_subs)
             
             logger.info(f"✅ Subscription metrics cached: {metrics.subscriptions_by_plan}")
             return metrics
@@ -529,8 +522,9 @@ class AdminMetricsService:
         """Obtiene métricas REALES de la API basadas en datos capturados"""
         try:
             cache_key = "api_metrics"
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]
+            cached_metrics = await self.cache.get(cache_key)
+            if cached_metrics is not None:
+                return cached_metrics
 
             # TOTAL REQUESTS TODAY/WEEK - basado en contadores reales
             today_requests = self.request_count
@@ -583,7 +577,7 @@ class AdminMetricsService:
                 feature_usage_stats=feature_usage
             )
             
-            self._update_cache(cache_key, metrics)
+            await self.cache.set(cache_key, metrics)
             return metrics
             
         except Exception as e:
@@ -675,52 +669,87 @@ class AdminMetricsService:
         
         return hours[-12:]  # Últimas 12 horas
 
-    async def get_dashboard_data(self, db: AsyncSession) -> AdminDashboardData:
-        """Obtiene todos los datos del dashboard con métricas REALES"""
-        try:
-            cache_key = "dashboard_data"
-            # ✅ CACHE MÁS CORTO para dashboard completo
-            cache_ttl_dashboard = 5  # Solo 5 segundos para dashboard
-            
-            if (cache_key in self.cache and 
-                cache_key in self.last_cache_update and 
-                time.time() - self.last_cache_update[cache_key] < cache_ttl_dashboard):
-                logger.info(f"✅ Using cached dashboard data")
-                return self.cache[cache_key]
-            
-            logger.info(f"🔄 Fetching fresh dashboard data")
-            
-            # Obtener todas las métricas reales
-            system_health = await self.get_system_health_metrics()
-            database_metrics = await self.get_database_metrics(db)
-            user_metrics = await self.get_user_metrics(db)
-            subscription_metrics = await self.get_subscription_metrics(db)
-            api_metrics = await self.get_api_metrics(db)
-            
-            dashboard_data = AdminDashboardData(
-                system_health=system_health,
-                database_metrics=database_metrics,
-                user_metrics=user_metrics,
-                subscription_metrics=subscription_metrics,
-                api_metrics=api_metrics,
-                last_updated=datetime.utcnow().isoformat()
-            )
-            
-            # ✅ Usar TTL específico para dashboard
-            self.cache[cache_key] = dashboard_data
-            self.last_cache_update[cache_key] = time.time()
-            
-            logger.info(f"✅ Dashboard data cached")
-            return dashboard_data
-            
-        except Exception as e:
-            logger.error(f"Error getting dashboard data: {e}")
-            raise
+    async def _refresh_section(self, name: str) -> Any:
+        """Calcula una sección del dashboard en su propia sesión (se calculan en paralelo)"""
+        section = DASHBOARD_SECTIONS[name]
+        getter = getattr(self, section.method)
+        if section.uses_db:
+            async with SessionLocal() as db:
+                value = await getter(db)
+        else:
+            value = await getter()
+        self._sections[name] = (value, time.monotonic())
+        return value
+
+    def _section_task(self, name: str) -> asyncio.Task:
+        """Refresco en curso de una sección, o uno nuevo (un solo refresco por sección)"""
+        task = self._section_tasks.get(name)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh_section(name))
+            task.add_done_callback(lambda done: self._log_section_error(name, done))
+            self._section_tasks[name] = task
+        return task
+
+    @staticmethod
+    def _log_section_error(name: str, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Error refreshing dashboard section {name}: {task.exception()}")
+
+    def invalidate_sections(self):
+        """Obliga a recalcular todas las secciones en el siguiente dashboard"""
+        self._sections.clear()
+
+    async def get_dashboard_data(
+        self, deadline: float = DASHBOARD_DEADLINE, first_load_deadline: float = DASHBOARD_FIRST_LOAD_DEADLINE
+    ) -> AdminDashboardData:
+        """
+        Obtiene todos los datos del dashboard con métricas REALES.
+
+        Las secciones que han superado su presupuesto de antigüedad se recalculan
+        en paralelo. Las que no terminan en `deadline` segundos se sirven con su
+        valor anterior y se listan en stale_sections; su refresco sigue en segundo
+        plano para la siguiente petición. A una sección sin valor previo se la
+        espera hasta `first_load_deadline` segundos; si no llega o falla se sirve
+        vacía (empty_section) y también se lista en stale_sections, de modo que
+        una sección rota no tumba el dashboard entero.
+        """
+        now = time.monotonic()
+        refreshing = {
+            name: self._section_task(name)
+            for name, section in DASHBOARD_SECTIONS.items()
+            if name not in self._sections or now - self._sections[name][1] > section.max_age
+        }
+        if refreshing:
+            logger.info(f"🔄 Refreshing dashboard sections: {', '.join(refreshing)}")
+            await asyncio.wait(refreshing.values(), timeout=deadline)
+            missing = [task for name, task in refreshing.items() if name not in self._sections and not task.done()]
+            if missing:
+                await asyncio.wait(missing, timeout=max(first_load_deadline - deadline, 0))
+
+        sections = {}
+        stale_sections = []
+        for name, section in DASHBOARD_SECTIONS.items():
+            task = refreshing.get(name)
+            if name in self._sections:
+                sections[name] = self._sections[name][0]
+            else:
+                sections[name] = empty_section(section.model)
+            if task is not None and (not task.done() or task.cancelled() or task.exception() is not None):
+                stale_sections.append(name)
+        if stale_sections:
+            logger.info(f"⏳ Serving stale dashboard sections: {', '.join(stale_sections)}")
+
+        return AdminDashboardData(
+            **sections,
+            stale_sections=stale_sections,
+            last_updated=datetime.utcnow().isoformat()
+        )
 
     def get_recent_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Obtiene logs recientes del sistema"""
         import random
         from datetime import datetime, timedelta
+        import psutil
         
         cpu_usage = psutil.cpu_percent()
         memory_usage = psutil.virtual_memory().percent
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config import get_settings
+from services.coalescing import RequestCoalescer
+
+logger = logging.getLogger(__name__)
+
+# Centinela para distinguir "no está en caché" de un valor None cacheado
+MISSING = object()
+
+class MemoryCacheBackend:
+    """Backend en memoria del proceso: LRU acotado con expiración por clave"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: Hashable) -> Any:
+        item = self.entries.get(key)
+        if item is None:
+            return MISSING
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return MISSING
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: float):
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    async def clear(self):
+        self.entries.clear()
+
+    def size(self) -> int:
+        return len(self.entries)
+
+class RedisCacheBackend:
+    """
+    Backend compartido entre instancias (Redis). Es opcional: solo se usa si
+    CACHE_BACKEND_URL está configurada y el paquete `redis` está instalado.
+    """
+
+    def __init__(self, url: str, namespace: str):
+        import redis.asyncio as redis  # dependencia opcional
+
+        self.client = redis.from_url(url)
+        self.namespace = namespace
+        self.evictions = 0  # la política de expulsión la gestiona Redis
+
+    def _key(self, key: Hashable) -> str:
+        return f"hoopmetrics:{self.namespace}:{hashlib.sha1(repr(key).encode()).hexdigest()}"
+
+    async def get(self, key: Hashable) -> Any:
+        raw = await self.client.get(self._key(key))
+        return MISSING if raw is None else pickle.loads(raw)
+
+    async def set(self, key: Hashable, value: Any, ttl: float):
+        await self.client.set(self._key(key), pickle.dumps(value), ex=max(int(ttl), 1))
+
+    async def delete(self, key: Hashable):
+        await self.client.delete(self._key(key))
+
+    async def clear(self):
+        async for redis_key in self.client.scan_iter(match=f"hoopmetrics:{self.namespace}:*"):
+            await self.client.delete(redis_key)
+
+    def size(self) -> int:
+        return -1
+
+def _build_backend(name: str, max_entries: int, shared: bool):
+    url = get_settings().CACHE_BACKEND_URL if shared else None
+    if url:
+        try:
+            return RedisCacheBackend(url, name)
+        except ImportError:
+            logger.warning(f"⚠️ CACHE_BACKEND_URL configurada pero 'redis' no está instalado; caché '{name}' en memoria")
+    return MemoryCacheBackend(max_entries)
+
+class AsyncCache:
+    """
+    Caché asíncrona con TTL por clave, expulsión LRU y protección frente a
+    estampidas: si varias corrutinas piden la misma clave ausente, solo la
+    primera ejecuta la función y el resto espera su resultado.
+    """
+
+    def __init__(self, name: str, default_ttl: float = 60, max_entries: int = 1024, shared: bool = False):
+        self.name = name
+        self.default_ttl = default_ttl
+        self.backend = _build_backend(name, max_entries, shared)
+        self.coalescer = RequestCoalescer(f"cache:{name}")
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        cache_registry[name] = self
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Error leyendo la caché '{self.name}': {e}")
+            value = MISSING
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        try:
+            await self.backend.set(key, value, ttl if ttl is not None else self.default_ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Error escribiendo en la caché '{self.name}': {e}")
+
+    async def invalidate(self, key: Hashable):
+        await self.backend.delete(key)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """Devuelve el valor cacheado o lo calcula una sola vez aunque haya llamadas concurrentes"""
+        value = await self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        async def compute():
+            computed = await factory()
+            await self.set(key, computed, ttl)
+            return computed
+
+        return await self.coalescer.run(key, compute)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "coalesced": self.coalescer.coalesced,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+        }
+
+# Todas las cachés creadas, por nombre (para el panel de administración)
+cache_registry: Dict[str, AsyncCache] = {}
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+def _is_being_cancelled() -> bool:
+    task = asyncio.current_task()
+    return bool(task and hasattr(task, "cancelling") and task.cancelling())
+
+class RequestCoalescer:
+    """
+    Deduplicación de trabajo en curso: mientras una ejecución con una clave no
+    termina, las llamadas concurrentes con la misma clave esperan su resultado
+    en lugar de repetirla. No guarda nada: al terminar, la siguiente llamada
+    vuelve a ejecutar (el cacheo, si lo hay, es cosa de otra capa).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+        coalescer_registry[name] = self
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                # shield: si esta petición se cancela no debe cancelar la compartida
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # Si quien la lanzó se canceló (p.ej. el cliente cerró la conexión)
+                # los que esperaban la repiten en vez de fallar
+                if in_flight.cancelled() and not _is_being_cancelled():
+                    return await self.run(key, factory)
+                raise
+
+        # La primera llamada ejecuta el trabajo y publica el resultado al resto
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+        try:
+            result = await factory()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita el aviso de "exception was never retrieved" si nadie esperaba
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight(),
+        }
+
+# Todos los coalescers creados, por nombre (para el panel de administración)
+coalescer_registry: Dict[str, RequestCoalescer] = {}
+
+# Respuestas HTTP analíticas en curso (lo usa el middleware de caché HTTP)
+response_coalescer = RequestCoalescer("http_responses")
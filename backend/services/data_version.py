@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_DATA_VERSION = "global"
+
+# La tabla data_versions es de la migración 001: la API no la crea (ver migrations/runner.py).
+# Cualquier proceso que modifique partidos o estadísticas debe ejecutar este UPSERT
+BUMP_DATA_VERSION_SQL = text("""
+    INSERT INTO data_versions (name, version, updated_at)
+    VALUES (:name, 1, now())
+    ON CONFLICT (name) DO UPDATE
+    SET version = data_versions.version + 1, updated_at = now()
+    RETURNING version
+""")
+
+async def bump_data_version(session: AsyncSession, name: str = GLOBAL_DATA_VERSION) -> int:
+    """Incrementa la versión de datos (invalida todas las respuestas cacheadas)"""
+    result = await session.execute(BUMP_DATA_VERSION_SQL, {"name": name})
+    version = result.scalar_one()
+    await session.commit()
+    data_version_service.invalidate()
+    logger.info(f"🔄 Versión de datos '{name}' incrementada a {version}")
+    return version
+
+class DataVersionService:
+    """
+    Lee la versión global de datos como mucho una vez cada `check_interval`
+    segundos, con su propia sesión (se usa desde middlewares).
+    """
+
+    def __init__(self, check_interval: float = 5):
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_version(self) -> Optional[int]:
+        if self.version is not None and time.time() - self._last_check < self.check_interval:
+            return self.version
+
+        async with self._lock:
+            if self.version is not None and time.time() - self._last_check < self.check_interval:
+                return self.version
+            try:
+                async with SessionLocal() as session:
+                    result = await session.execute(
+                        text("SELECT version FROM data_versions WHERE name = :name"),
+                        {"name": GLOBAL_DATA_VERSION}
+                    )
+                    self.version = result.scalar_one_or_none() or 0
+            except Exception as e:
+                # Sin versión no se cachea nada, pero la API sigue funcionando
+                logger.error(f"❌ Error leyendo la versión de datos: {e}")
+                self.version = None
+            self._last_check = time.time()
+            return self.version
+
+    def invalidate(self):
+        self._last_check = 0.0
+
+# Instancia global del servicio
+data_version_service = DataVersionService()
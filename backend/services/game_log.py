@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from database import SessionLocal
+from models import Match, MatchStatistic, Player
+from services.data_version import data_version_service
+from services.match_sides import SIDE_WINDOW_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Columnas de match_statistics que se guardan como arrays float64 (NULL -> 0,
+# igual que el `or 0` de los handlers)
+GAME_LOG_STATS = (
+    "points", "rebounds", "assists", "steals", "blocks", "turnovers", "fouls",
+    "minutes_played", "field_goals_made", "field_goals_attempted",
+    "three_points_made", "three_points_attempted", "free_throws_made",
+    "free_throws_attempted", "off_rebounds", "def_rebounds", "plusminus",
+)
+
+NO_TEAM = -1
+
+def _csr_offsets(sorted_keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Claves distintas de un array ordenado y el inicio de cada una (+ el final)"""
+    keys, starts = np.unique(sorted_keys, return_index=True)
+    return keys, np.append(starts, len(sorted_keys))
+
+def resolve_row_teams(
+    player_keys: np.ndarray,
+    player_offsets: np.ndarray,
+    days: np.ndarray,
+    match_ids: np.ndarray,
+    home_team_ids: np.ndarray,
+    away_team_ids: np.ndarray,
+    current_team_ids: np.ndarray,
+) -> np.ndarray:
+    """
+    Equipo con el que jugó cada fila, con la misma regla que
+    services/match_sides.py y refresh_team_game_stats(): los partidos del
+    jugador a ±SIDE_WINDOW_DAYS contra un tercer equipo votan por el local o el
+    visitante; con empate se usa current_team_id si es uno de los dos.
+    Se evalúa como una matriz partidos×partidos por jugador (~82×82)
+    """
+    teams = np.full(len(days), NO_TEAM, dtype=np.int32)
+    for index in range(len(player_keys)):
+        rows = slice(player_offsets[index], player_offsets[index + 1])
+        home, away = home_team_ids[rows], away_team_ids[rows]
+
+        near = np.abs(days[rows][:, None] - days[rows][None, :]) <= SIDE_WINDOW_DAYS
+        near &= match_ids[rows][:, None] != match_ids[rows][None, :]
+        # plays_home[i, j]: el partido j incluye al local del partido i
+        plays_home = (home[None, :] == home[:, None]) | (away[None, :] == home[:, None])
+        plays_away = (home[None, :] == away[:, None]) | (away[None, :] == away[:, None])
+        home_votes = (near & plays_home & ~plays_away).sum(axis=1)
+        away_votes = (near & plays_away & ~plays_home).sum(axis=1)
+
+        current = current_team_ids[rows]
+        fallback = np.where((current == home) | (current == away), current, NO_TEAM)
+        teams[rows] = np.where(
+            home_votes > away_votes, home,
+            np.where(away_votes > home_votes, away, fallback)
+        )
+    return teams
+
+class GameLogSnapshot:
+    """
+    Registro de partidos de toda la liga en columnas NumPy, ordenado por
+    (jugador, fecha, partido). Las filas de un jugador son contiguas, así que
+    player_slice() devuelve un slice y las columnas se leen como vistas sin
+    copia. Las de un equipo se leen a través de team_rows() (índices ordenados
+    por fecha). Inmutable: las actualizaciones crean un snapshot nuevo
+    """
+
+    def __init__(
+        self,
+        stat_ids: np.ndarray,
+        player_ids: np.ndarray,
+        match_ids: np.ndarray,
+        dates: np.ndarray,
+        home_team_ids: np.ndarray,
+        away_team_ids: np.ndarray,
+        stats: Dict[str, np.ndarray],
+        players: Dict[int, Tuple[Optional[str], Optional[int]]],
+    ):
+        order = np.lexsort((match_ids, dates, player_ids))
+        self.stat_ids = stat_ids[order]
+        self.player_ids = player_ids[order]
+        self.match_ids = match_ids[order]
+        self.dates = dates[order]
+        self.home_team_ids = home_team_ids[order]
+        self.away_team_ids = away_team_ids[order]
+        self.stats = {name: column[order] for name, column in stats.items()}
+        self.players = players  # player_id -> (position, current_team_id)
+        self.days = self.dates.astype(np.int64)
+
+        self.player_keys, self.player_offsets = _csr_offsets(self.player_ids)
+
+        current_team_ids = np.array(
+            [players.get(int(pid), (None, None))[1] or NO_TEAM for pid in self.player_keys], dtype=np.int32
+        )
+        self.team_ids = resolve_row_teams(
+            self.player_keys, self.player_offsets, self.days, self.match_ids,
+            self.home_team_ids, self.away_team_ids,
+            np.repeat(current_team_ids, np.diff(self.player_offsets)),
+        )
+        self.is_home = self.team_ids == self.home_team_ids
+        self.opponent_ids = np.where(
+            self.team_ids == NO_TEAM, NO_TEAM, np.where(self.is_home, self.away_team_ids, self.home_team_ids)
+        ).astype(np.int32)
+
+        attributed = np.flatnonzero(self.team_ids != NO_TEAM)
+        self.team_order = attributed[np.lexsort((
+            self.match_ids[attributed], self.dates[attributed], self.team_ids[attributed]
+        ))]
+        self.team_keys, self.team_offsets = _csr_offsets(self.team_ids[self.team_order])
+
+    def __len__(self) -> int:
+        return len(self.stat_ids)
+
+    def player_slice(self, player_id: int) -> slice:
+        """Filas del jugador (vacío si no tiene estadísticas)"""
+        index = np.searchsorted(self.player_keys, player_id)
+        if index == len(self.player_keys) or self.player_keys[index] != player_id:
+            return slice(0, 0)
+        return slice(int(self.player_offsets[index]), int(self.player_offsets[index + 1]))
+
+    def team_rows(self, team_id: int) -> np.ndarray:
+        """Índices de las filas jugadas con el equipo, ordenados por fecha"""
+        index = np.searchsorted(self.team_keys, team_id)
+        if index == len(self.team_keys) or self.team_keys[index] != team_id:
+            return self.team_order[:0]
+        return self.team_order[self.team_offsets[index]:self.team_offsets[index + 1]]
+
+    def position_rows(self, positions: Iterable[str]) -> np.ndarray:
+        """Índices de las filas de los jugadores con alguna de esas posiciones"""
+        positions = set(positions)
+        player_ids = [pid for pid, (position, _) in self.players.items() if position in positions]
+        return np.flatnonzero(np.isin(self.player_ids, player_ids))
+
+    def without_matches(self, match_ids: Iterable[int]) -> np.ndarray:
+        """Máscara de las filas que no pertenecen a esos partidos"""
+        return ~np.isin(self.match_ids, np.fromiter(match_ids, dtype=np.int64))
+
+    def nbytes(self) -> int:
+        arrays = [
+            self.stat_ids, self.player_ids, self.match_ids, self.dates, self.days,
+            self.home_team_ids, self.away_team_ids, self.team_ids, self.opponent_ids,
+            self.is_home, self.team_order, *self.stats.values(),
+        ]
+        return sum(array.nbytes for array in arrays)
+
+def _rows_to_columns(rows) -> dict:
+    """Filas de _game_log_query() -> arrays por columna"""
+    columns = list(zip(*rows)) if rows else [()] * (6 + len(GAME_LOG_STATS))
+    stats = {}
+    for index, name in enumerate(GAME_LOG_STATS, start=6):
+        stats[name] = np.nan_to_num(np.array(columns[index], dtype=np.float64), nan=0.0)
+    return {
+        "stat_ids": np.array(columns[0], dtype=np.int64),
+        "player_ids": np.array(columns[1], dtype=np.int32),
+        "match_ids": np.array(columns[2], dtype=np.int32),
+        "dates": np.array(columns[3], dtype="datetime64[D]"),
+        "home_team_ids": np.array(columns[4], dtype=np.int32),
+        "away_team_ids": np.array(columns[5], dtype=np.int32),
+        "stats": stats,
+    }
+
+def _game_log_query():
+    return (
+        select(
+            MatchStatistic.id,
+            MatchStatistic.player_id,
+            MatchStatistic.match_id,
+            Match.date,
+            Match.home_team_id,
+            Match.away_team_id,
+            *[getattr(MatchStatistic, name) for name in GAME_LOG_STATS],
+        )
+        .join(Match, Match.id == MatchStatistic.match_id)
+    )
+
+class GameLogStore:
+    """
+    Mantiene en memoria el GameLogSnapshot de toda la liga (~30k filas por
+    temporada, unos pocos MB). Se carga en la primera petición que lo usa y,
+    cuando cambia la versión de datos, solo se releen los partidos que las
+    versiones intermedias han tocado según data_version_changes (migración
+    008, la escribe la ingesta en la misma transacción que la versión)
+    """
+
+    def __init__(self, check_interval: float = 60, max_age: float = 6 * 3600):
+        self.snapshot: Optional[GameLogSnapshot] = None
+        self.check_interval = check_interval
+        self.max_age = max_age  # recarga completa periódica
+        self._data_version: Optional[int] = None  # versión leída antes de la última carga
+        self._loaded_at = 0.0
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_snapshot(self, session: AsyncSession) -> GameLogSnapshot:
+        now = time.time()
+        if self.snapshot and now - self._last_check < self.check_interval:
+            return self.snapshot
+
+        async with self._lock:
+            now = time.time()
+            if self.snapshot and now - self._last_check < self.check_interval:
+                return self.snapshot
+
+            # La versión se lee antes que los datos: si entretanto se confirma otra
+            # ingesta, sus partidos se vuelven a leer en la siguiente actualización
+            data_version = await data_version_service.get_version()
+            if self.snapshot is None or now - self._loaded_at > self.max_age:
+                await self._full_load(session)
+            elif data_version is not None and data_version != self._data_version:
+                await self._incremental_load(session, self._data_version, data_version)
+            self._data_version = data_version
+            self._last_check = now
+            return self.snapshot
+
+    async def warm_up(self):
+        """Carga anticipada (opcional, ver WARM_UP_ON_STARTUP); si falla se reintenta en la primera petición"""
+        try:
+            async with SessionLocal() as session:
+                await self.get_snapshot(session)
+        except Exception as e:
+            logger.error(f"❌ Error cargando el registro de partidos: {e}")
+
+    def invalidate(self):
+        """Fuerza una recarga completa en la siguiente petición"""
+        self._last_check = 0.0
+        self._loaded_at = 0.0
+
+    async def _players(self, session: AsyncSession) -> Dict[int, Tuple[Optional[str], Optional[int]]]:
+        result = await session.execute(select(Player.id, Player.position, Player.current_team_id))
+        return {pid: (position, team_id) for pid, position, team_id in result.all()}
+
+    async def _full_load(self, session: AsyncSession):
+        start = time.time()
+        result = await session.execute(_game_log_query())
+        columns = _rows_to_columns(result.all())
+        self.snapshot = GameLogSnapshot(**columns, players=await self._players(session))
+        self._loaded_at = time.time()
+        logger.info(
+            f"🧮 Registro de partidos cargado: {len(self.snapshot)} filas, "
+            f"{self.snapshot.nbytes() / 1024 / 1024:.1f}MB en {(time.time() - start) * 1000:.0f}ms"
+        )
+
+    async def _changed_matches(self, session: AsyncSession, base: int, target: int) -> Optional[List[int]]:
+        """
+        Partidos tocados por las versiones (base, target]. None si alguna no
+        tiene registro de cambios (incremento manual de la versión, datos
+        cargados sin la ingesta o base de datos sin la migración 008)
+        """
+        exists = await session.execute(text("SELECT to_regclass('data_version_changes') IS NOT NULL"))
+        if not exists.scalar():
+            return None
+        result = await session.execute(
+            text("SELECT version, match_ids FROM data_version_changes WHERE version > :base AND version <= :target"),
+            {"base": base, "target": target}
+        )
+        rows = result.all()
+        if len(rows) != target - base:
+            return None
+        return sorted({match_id for _, match_ids in rows for match_id in match_ids})
+
+    async def _incremental_load(self, session: AsyncSession, base: Optional[int], target: int):
+        changed = None
+        if base is not None and base < target:
+            changed = await self._changed_matches(session, base, target)
+        if changed is None:
+            await self._full_load(session)
+            return
+
+        start = time.time()
+        # También sin partidos: la versión puede venir de cambios en los jugadores
+        await self.refresh_matches(session, changed)
+        logger.info(
+            f"🧮 Registro de partidos actualizado a la versión {target}: {len(changed)} partidos "
+            f"en {(time.time() - start) * 1000:.0f}ms"
+        )
+
+    async def refresh_matches(self, session: AsyncSession, match_ids: Iterable[int]):
+        """Sustituye las filas de esos partidos por las actuales de la base de datos"""
+        match_ids = list(match_ids)
+        result = await session.execute(_game_log_query().where(MatchStatistic.match_id.in_(match_ids)))
+        fresh = _rows_to_columns(result.all())
+
+        old = self.snapshot
+        keep = old.without_matches(match_ids)
+        self.snapshot = GameLogSnapshot(
+            stat_ids=np.concatenate((old.stat_ids[keep], fresh["stat_ids"])),
+            player_ids=np.concatenate((old.player_ids[keep], fresh["player_ids"])),
+            match_ids=np.concatenate((old.match_ids[keep], fresh["match_ids"])),
+            dates=np.concatenate((old.dates[keep], fresh["dates"])),
+            home_team_ids=np.concatenate((old.home_team_ids[keep], fresh["home_team_ids"])),
+            away_team_ids=np.concatenate((old.away_team_ids[keep], fresh["away_team_ids"])),
+            stats={name: np.concatenate((old.stats[name][keep], fresh["stats"][name])) for name in GAME_LOG_STATS},
+            players=await self._players(session),
+        )
+
+# Instancia global del servicio
+game_log_store = GameLogStore()
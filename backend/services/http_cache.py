@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+
+from security import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+# Respuestas deterministas dados los datos de matches/match_statistics.
+# Quedan fuera a propósito las rutas que dependen del usuario (favorite-status, etc.)
+# Es la única caché de estas rutas: sus handlers no cachean resultados por su cuenta
+CACHEABLE_PATH_PATTERNS = [
+    re.compile(r"^/players/\d+/(advanced|basicstats)/[\w-]+$"),
+    re.compile(r"^/teams/\d+/(advanced|basicstats)/[\w-]+$"),
+    re.compile(r"^/teams/?$"),
+    re.compile(r"^/teams/\d+$"),
+    re.compile(r"^/players/\d+$"),
+]
+
+PUBLIC_CACHE_CONTROL = "public, max-age=60, s-maxage=300, stale-while-revalidate=600"
+PRIVATE_CACHE_CONTROL = "private, max-age=60"
+ANONYMOUS_TIER = "anonymous"
+
+def is_cacheable_path(path: str) -> bool:
+    return any(pattern.match(path) for pattern in CACHEABLE_PATH_PATTERNS)
+
+def request_tier(request: Request) -> str:
+    """Tier del usuario según el JWT (sin consultar la base de datos)"""
+    authorization = request.headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return ANONYMOUS_TIER
+    payload = decode_access_token(authorization[7:])
+    if not payload:
+        return ANONYMOUS_TIER
+    return payload.get("role") or ANONYMOUS_TIER
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comprueba una cabecera If-None-Match contra un ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def make_etag(body: bytes) -> str:
+    """ETag fuerte derivado del contenido"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def cache_headers(etag: str, tier: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Vary": "Authorization"}
+    headers["Cache-Control"] = PUBLIC_CACHE_CONTROL if tier == ANONYMOUS_TIER else PRIVATE_CACHE_CONTROL
+    return headers
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "media_type", "version")
+
+    def __init__(self, body: bytes, etag: str, media_type: str, version: int):
+        self.body = body
+        self.etag = etag
+        self.media_type = media_type
+        self.version = version
+
+class ResponseCache:
+    """
+    Caché LRU de respuestas serializadas, acotada por número de entradas y bytes.
+    La clave es (ruta, query, tier); una entrada solo es válida para la versión
+    de datos con la que se generó.
+    """
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: Request, tier: str) -> Tuple:
+        return (request.url.path, tuple(sorted(request.query_params.multi_items())), tier)
+
+    def get(self, key: Tuple, version: int) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Tuple, entry: CachedResponse):
+        previous = self.entries.pop(key, None)
+        if previous:
+            self.size_bytes -= len(previous.body)
+        if len(entry.body) > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.size_bytes += len(entry.body)
+        while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size_bytes -= len(evicted.body)
+
+    def clear(self):
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+# Instancia global de la caché
+response_cache = ResponseCache()
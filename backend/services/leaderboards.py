@@ -0,0 +1,340 @@
+import asyncio
+import base64
+import bisect
+import heapq
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models import Match, MatchStatistic, Player, Team
+from services.data_version import data_version_service
+
+logger = logging.getLogger(__name__)
+
+# Columnas de match_statistics que se acumulan por jugador
+ACCUMULATED_STATS = (
+    "points", "rebounds", "assists", "steals", "blocks",
+    "field_goals_made", "field_goals_attempted",
+    "free_throws_made", "free_throws_attempted",
+    "off_rebounds", "def_rebounds", "fouls", "turnovers", "plusminus",
+)
+
+# Claves de ordenación de /players/sorted -> atributo de la entrada
+SORT_KEYS = {
+    "ppg": "ppg",
+    "rpg": "rpg",
+    "apg": "apg",
+    "spg": "spg",
+    "bpg": "bpg",
+    "ts": "ts_pct",
+}
+
+# Categorías de /leaders -> atributo de la entrada
+LEADER_CATEGORIES = {
+    "points": "ppg",
+    "rebounds": "rpg",
+    "assists": "apg",
+    "steals": "spg",
+    "blocks": "bpg",
+    "true_shooting": "ts_pct",
+    "game_score": "game_score",
+    "plus_minus": "plus_minus",
+}
+
+# Tamaño de los top-K precalculados por categoría (sin filtros)
+TOP_K = 25
+
+class PlayerAccumulator:
+    """Sumas y recuentos (valores no nulos) de las estadísticas de un jugador"""
+    __slots__ = ("games", "sums", "counts")
+
+    def __init__(self):
+        self.games = 0
+        self.sums = dict.fromkeys(ACCUMULATED_STATS, 0.0)
+        self.counts = dict.fromkeys(ACCUMULATED_STATS, 0)
+
+    def add_row(self, row):
+        self.games += 1
+        for stat in ACCUMULATED_STATS:
+            value = getattr(row, stat)
+            if value is not None:
+                self.sums[stat] += value
+                self.counts[stat] += 1
+
+    def add_aggregate(self, row):
+        self.games += row.games
+        for stat in ACCUMULATED_STATS:
+            self.sums[stat] += getattr(row, f"sum_{stat}") or 0.0
+            self.counts[stat] += getattr(row, f"count_{stat}") or 0
+
+    def avg(self, stat: str) -> float:
+        # Igual que AVG() en SQL: ignora los valores nulos
+        count = self.counts[stat]
+        return self.sums[stat] / count if count else 0.0
+
+class LeaderboardEntry:
+    """Fila del ranking: datos del jugador + medias por partido"""
+    __slots__ = (
+        "id", "name", "birth_date", "height", "weight", "position", "number",
+        "team_id", "team", "url_pic", "games",
+        "ppg", "rpg", "apg", "spg", "bpg", "ts_pct", "game_score", "plus_minus",
+    )
+
+    def __init__(self, player, acc: Optional[PlayerAccumulator]):
+        self.id = player.id
+        self.name = player.name
+        self.birth_date = player.birth_date
+        self.height = player.height
+        self.weight = player.weight
+        self.position = player.position
+        self.number = player.number
+        self.team_id = player.current_team_id
+        self.team = player.team
+        self.url_pic = player.url_pic
+
+        acc = acc or PlayerAccumulator()
+        self.games = acc.games
+        self.ppg = acc.avg("points")
+        self.rpg = acc.avg("rebounds")
+        self.apg = acc.avg("assists")
+        self.spg = acc.avg("steals")
+        self.bpg = acc.avg("blocks")
+        self.plus_minus = acc.avg("plusminus")
+
+        s = acc.sums
+        true_shooting_attempts = 2 * (s["field_goals_attempted"] + 0.44 * s["free_throws_attempted"])
+        self.ts_pct = s["points"] / true_shooting_attempts * 100 if true_shooting_attempts > 0 else 0.0
+
+        # Game Score (Hollinger) es lineal, así que su media sale de las sumas
+        self.game_score = (
+            s["points"] + 0.4 * s["field_goals_made"] - 0.7 * s["field_goals_attempted"]
+            - 0.4 * (s["free_throws_attempted"] - s["free_throws_made"])
+            + 0.7 * s["off_rebounds"] + 0.3 * s["def_rebounds"] + s["steals"]
+            + 0.7 * s["assists"] + 0.7 * s["blocks"] - 0.4 * s["fouls"] - s["turnovers"]
+        ) / acc.games if acc.games else 0.0
+
+    def matches(self, position: Optional[str], team_id: Optional[int], min_games: int) -> bool:
+        if self.games < min_games:
+            return False
+        if team_id is not None and self.team_id != team_id:
+            return False
+        if position:
+            positions = (self.position or "").upper().replace("-", " ").split()
+            if position.upper() not in positions and position.upper() != (self.position or "").upper():
+                return False
+        return True
+
+class LeaderboardSnapshot:
+    """
+    Ranking inmutable de todos los jugadores. Para cada atributo se guarda el
+    orden (valor desc, id asc) y las claves de ordenación en paralelo, de modo
+    que localizar un cursor es O(log n) y servir una página es O(página).
+    """
+
+    def __init__(self, entries: List[LeaderboardEntry]):
+        self.entries = entries
+        self._orderings: Dict[str, Tuple[List[LeaderboardEntry], List[Tuple[float, int]]]] = {}
+        # Top-K sin filtros por categoría, listo para servir
+        self.top_k = {
+            category: heapq.nlargest(TOP_K, entries, key=lambda e, a=attr: (getattr(e, a), -e.id))
+            for category, attr in LEADER_CATEGORIES.items()
+        }
+
+    def ordering(self, attr: str):
+        if attr not in self._orderings:
+            ordered = sorted(self.entries, key=lambda e: (-getattr(e, attr), e.id))
+            keys = [(-getattr(e, attr), e.id) for e in ordered]
+            self._orderings[attr] = (ordered, keys)
+        return self._orderings[attr]
+
+    def page(
+        self,
+        sort_by: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        offset: int = 0,
+        min_games: int = 0,
+    ) -> Tuple[List[LeaderboardEntry], bool]:
+        """Devuelve (filas, hay_más) empezando tras el cursor o en el offset dado"""
+        ordered, keys = self.ordering(SORT_KEYS[sort_by])
+        start = bisect.bisect_right(keys, (-after[0], after[1])) if after else offset
+        # Por índice y no ordered[start:]: el slice copiaría el resto del ranking en cada página
+        rest = (ordered[index] for index in range(start, len(ordered)))
+        items, has_more = _take_matching(rest, limit, lambda e: e.games >= min_games)
+        return items, has_more
+
+    def leaders(
+        self,
+        category: str,
+        limit: int,
+        position: Optional[str] = None,
+        team_id: Optional[int] = None,
+        min_games: int = 0,
+    ) -> List[LeaderboardEntry]:
+        """Top-K de una categoría aplicando los filtros"""
+        unfiltered = not position and team_id is None and min_games == 0
+        if unfiltered and limit <= TOP_K:
+            return self.top_k[category][:limit]
+
+        # Se recorre el orden completo hasta reunir K jugadores que cumplan los filtros
+        ordered, _ = self.ordering(LEADER_CATEGORIES[category])
+        items, _ = _take_matching(ordered, limit, lambda e: e.matches(position, team_id, min_games))
+        return items
+
+def _take_matching(entries: Iterable[LeaderboardEntry], limit: int, predicate) -> Tuple[List[LeaderboardEntry], bool]:
+    items = []
+    for entry in entries:
+        if predicate(entry):
+            if len(items) == limit:
+                return items, True
+            items.append(entry)
+    return items, False
+
+def encode_cursor(sort_by: str, entry: LeaderboardEntry) -> str:
+    value = getattr(entry, SORT_KEYS[sort_by])
+    raw = f"{sort_by}:{value!r}:{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[float, int]:
+    try:
+        key, value, player_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if key != sort_by:
+            raise ValueError("El cursor pertenece a otra ordenación")
+        return float(value), int(player_id)
+    except Exception:
+        raise ValueError("Cursor no válido")
+
+class LeaderboardService:
+    """
+    Mantiene en memoria los acumulados por jugador y los rankings derivados.
+    La carga inicial es un GROUP BY; después solo se leen las filas de
+    match_statistics con id mayor que la última procesada.
+    """
+
+    def __init__(self, check_interval: float = 60, max_age: float = 6 * 3600):
+        self.snapshot: Optional[LeaderboardSnapshot] = None
+        self.check_interval = check_interval  # cada cuánto se comprueba si hay datos nuevos
+        self.max_age = max_age  # recarga completa (cubre filas actualizadas y cambios en players/teams)
+        self._accumulators: Dict[int, PlayerAccumulator] = {}
+        self._last_stat_id = 0
+        self._last_match_id = 0
+        self._data_version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_snapshot(self, session: AsyncSession) -> LeaderboardSnapshot:
+        now = time.time()
+        if self.snapshot and now - self._last_check < self.check_interval:
+            return self.snapshot
+
+        async with self._lock:
+            now = time.time()
+            if self.snapshot and now - self._last_check < self.check_interval:
+                return self.snapshot
+
+            # Una ingesta puede actualizar filas existentes: la versión de datos fuerza recarga completa
+            data_version = await data_version_service.get_version()
+            if self.snapshot is None or now - self._loaded_at > self.max_age or data_version != self._data_version:
+                await self._full_load(session)
+                self._data_version = data_version
+            else:
+                await self._incremental_load(session)
+            self._last_check = now
+            return self.snapshot
+
+    def invalidate(self):
+        """Fuerza una recarga completa en la siguiente petición"""
+        self._last_check = 0.0
+        self._loaded_at = 0.0
+
+    async def _max_ids(self, session: AsyncSession) -> Tuple[int, int]:
+        result = await session.execute(
+            select(
+                select(func.max(MatchStatistic.id)).scalar_subquery(),
+                select(func.max(Match.id)).scalar_subquery(),
+            )
+        )
+        max_stat_id, max_match_id = result.one()
+        return max_stat_id or 0, max_match_id or 0
+
+    async def _full_load(self, session: AsyncSession):
+        start = time.time()
+        max_stat_id, max_match_id = await self._max_ids(session)
+
+        columns = [func.count(MatchStatistic.id).label("games")]
+        for stat in ACCUMULATED_STATS:
+            column = getattr(MatchStatistic, stat)
+            columns.append(func.sum(column).label(f"sum_{stat}"))
+            columns.append(func.count(column).label(f"count_{stat}"))
+
+        result = await session.execute(
+            select(MatchStatistic.player_id, *columns)
+            .where(MatchStatistic.id <= max_stat_id)
+            .group_by(MatchStatistic.player_id)
+        )
+
+        accumulators = {}
+        for row in result.all():
+            acc = PlayerAccumulator()
+            acc.add_aggregate(row)
+            accumulators[row.player_id] = acc
+
+        self._accumulators = accumulators
+        self._last_stat_id = max_stat_id
+        self._last_match_id = max_match_id
+        self._loaded_at = time.time()
+        await self._rebuild_snapshot(session)
+        logger.info(f"📊 Leaderboards cargados: {len(accumulators)} jugadores en {(time.time() - start) * 1000:.0f}ms")
+
+    async def _incremental_load(self, session: AsyncSession):
+        max_stat_id, max_match_id = await self._max_ids(session)
+        if max_stat_id <= self._last_stat_id and max_match_id == self._last_match_id:
+            return
+
+        result = await session.execute(
+            select(MatchStatistic.player_id, *[getattr(MatchStatistic, stat) for stat in ACCUMULATED_STATS])
+            .where(MatchStatistic.id > self._last_stat_id)
+            .where(MatchStatistic.id <= max_stat_id)
+        )
+        rows = result.all()
+        self.apply_statistics(rows)
+        self._last_stat_id = max_stat_id
+        self._last_match_id = max_match_id
+        await self._rebuild_snapshot(session)
+        logger.info(f"📊 Leaderboards actualizados con {len(rows)} filas nuevas")
+
+    def apply_statistics(self, rows: Iterable):
+        """Suma nuevas filas de match_statistics (con player_id) a los acumulados"""
+        for row in rows:
+            acc = self._accumulators.get(row.player_id)
+            if acc is None:
+                acc = self._accumulators[row.player_id] = PlayerAccumulator()
+            acc.add_row(row)
+
+    async def _rebuild_snapshot(self, session: AsyncSession):
+        # Los metadatos de jugadores son pocos cientos de filas: se releen siempre
+        result = await session.execute(
+            select(
+                Player.id,
+                Player.name,
+                Player.birth_date,
+                Player.height,
+                Player.weight,
+                Player.position,
+                Player.number,
+                Player.current_team_id,
+                Team.full_name.label("team"),
+                Player.url_pic,
+            )
+            .join(Team, Team.id == Player.current_team_id, isouter=True)
+        )
+        entries = [LeaderboardEntry(player, self._accumulators.get(player.id)) for player in result.all()]
+        self.snapshot = LeaderboardSnapshot(entries)
+
+# Instancia global del servicio
+leaderboard_service = LeaderboardService()
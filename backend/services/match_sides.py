@@ -0,0 +1,70 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models import Match, MatchStatistic, Player
+
+logger = logging.getLogger(__name__)
+
+# Ventana de partidos cercanos que se usa para deducir el equipo de un jugador
+SIDE_WINDOW_DAYS = 30
+
+async def resolve_match_sides(
+    session: AsyncSession,
+    match: Match,
+    player_ids: Iterable[int],
+) -> Dict[int, Optional[int]]:
+    """
+    Deduce con qué equipo (home/away) jugó cada jugador un partido concreto.
+
+    match_statistics no guarda el equipo, y Player.current_team_id es el equipo
+    actual: falla con los jugadores traspasados. Aquí se mira en qué otros
+    partidos cercanos en el tiempo aparece el jugador: si juega con el local
+    (y no contra él) es del local, y viceversa. Solo si no hay información se
+    recurre a current_team_id. Retorna {player_id: team_id | None}
+    """
+    player_ids = list(player_ids)
+    if not player_ids:
+        return {}
+
+    home_id, away_id = match.home_team_id, match.away_team_id
+    votes: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    result = await session.execute(
+        select(MatchStatistic.player_id, Match.home_team_id, Match.away_team_id)
+        .join(Match, Match.id == MatchStatistic.match_id)
+        .where(MatchStatistic.player_id.in_(player_ids))
+        .where(MatchStatistic.match_id != match.id)
+        .where(Match.date.between(
+            match.date - timedelta(days=SIDE_WINDOW_DAYS),
+            match.date + timedelta(days=SIDE_WINDOW_DAYS)
+        ))
+    )
+    for player_id, other_home, other_away in result.all():
+        teams = {other_home, other_away}
+        # Un partido contra un tercer equipo solo puede ser con uno de los dos
+        if home_id in teams and away_id not in teams:
+            votes[player_id][home_id] += 1
+        elif away_id in teams and home_id not in teams:
+            votes[player_id][away_id] += 1
+
+    current_teams_result = await session.execute(
+        select(Player.id, Player.current_team_id).where(Player.id.in_(player_ids))
+    )
+    current_teams = dict(current_teams_result.all())
+
+    sides = {}
+    for player_id in player_ids:
+        player_votes = votes.get(player_id)
+        if player_votes and player_votes[home_id] != player_votes[away_id]:
+            sides[player_id] = home_id if player_votes[home_id] > player_votes[away_id] else away_id
+        elif current_teams.get(player_id) in (home_id, away_id):
+            sides[player_id] = current_teams[player_id]
+        else:
+            sides[player_id] = None
+            logger.warning(f"⚠️ No se pudo determinar el equipo del jugador {player_id} en el partido {match.id}")
+    return sides
@@ -0,0 +1,288 @@
+"""
+Cálculo por lotes de las métricas avanzadas de jugadores (LEBRON, PIPM,
+RAPTOR WAR, pace impact y fatigue) para toda la liga a la vez.
+
+Las fórmulas (metrics/players.py) se evalúan sobre arrays NumPy con un
+elemento por jugador. El resultado se guarda en
+player_advanced_metrics junto al percentil y el puesto en la liga de la
+métrica principal, y se recalcula cuando cambia la versión de datos.
+
+El recálculo es trabajo de la ingesta: lánzalo justo después de cada una.
+La API solo lee las filas guardadas; si las encuentra desfasadas sigue
+sirviendo las anteriores y recalcula en segundo plano, en su propia sesión.
+
+Uso (desde backend/, justo después de fill_db/ingest.py):
+    python -m services.player_metrics
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from database import SessionLocal
+from metrics.common import league_ranks, rounded
+from metrics.players import (
+    FIELD_DIGITS, age_on, box_averages, fatigue_curve, game_scores, lebron_impact, pace_impact, pipm_impact, raptor_war
+)
+from models import MatchStatistic, Player, PlayerAdvancedMetric
+from services.data_version import data_version_service
+from services.game_log import GameLogSnapshot, game_log_store
+
+logger = logging.getLogger(__name__)
+
+# Métrica -> campo principal (el que se ordena para el percentil y el puesto)
+PLAYER_METRICS = {
+    "lebron": "lebron_score",
+    "pipm": "total_pipm",
+    "raptor": "total_war",
+    "pace": "pace_impact_rating",
+    "fatigue": "fatigue_resistance",
+}
+
+# Medias por jugador (AVG de SQL, ignora NULL) que usan las fórmulas
+AVERAGED_STATS = {
+    "points": "avg_points", "rebounds": "avg_rebounds", "assists": "avg_assists",
+    "steals": "avg_steals", "blocks": "avg_blocks", "turnovers": "avg_turnovers",
+    "minutes_played": "avg_minutes", "field_goals_made": "avg_fgm",
+    "field_goals_attempted": "avg_fga", "three_points_made": "avg_3pm",
+    "three_points_attempted": "avg_3pa", "free_throws_made": "avg_ftm",
+    "free_throws_attempted": "avg_fta", "plusminus": "avg_plusminus",
+    "off_rebounds": "avg_oreb", "def_rebounds": "avg_dreb",
+}
+
+# Medias de liga y el valor por defecto si no hay datos (mismos que los endpoints)
+LEAGUE_AVERAGES = {
+    "points": ("league_ppg", 22.0), "rebounds": ("league_rpg", 10.2),
+    "assists": ("league_apg", 5.5), "steals": ("league_spg", 1.3),
+    "blocks": ("league_bpg", 1.0), "turnovers": ("league_tpg", 3.2),
+    "plusminus": ("league_pm", 0.0), "minutes_played": ("league_mpg", 28.0),
+    "field_goals_made": ("league_fgm", 8.5), "field_goals_attempted": ("league_fga", 18.0),
+}
+
+class PlayerAggregates:
+    """Medias, desviaciones y totales de cada jugador con estadísticas, como arrays alineados"""
+
+    def __init__(self, rows, players: Dict[int, Tuple[Optional[date], Optional[str]]], league: Dict[str, float]):
+        columns = list(zip(*rows)) if rows else [()] * (5 + len(AVERAGED_STATS))
+        self.player_ids = np.array(columns[0], dtype=np.int64)
+        self.games_played = np.array(columns[1], dtype=np.int64)
+        self.total_minutes_raw = np.array(columns[2], dtype=np.float64)
+        self.points_std_raw = np.array(columns[3], dtype=np.float64)
+        self.pm_std_raw = np.array(columns[4], dtype=np.float64)
+        self.raw = {
+            name: np.array(columns[5 + index], dtype=np.float64)
+            for index, name in enumerate(AVERAGED_STATS.values())
+        }
+        self.box = box_averages(self.raw)
+        self.birth_dates = [players.get(int(pid), (None, None))[0] for pid in self.player_ids]
+        self.positions = [players.get(int(pid), (None, None))[1] for pid in self.player_ids]
+        self.league = league
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+async def load_player_aggregates(session: AsyncSession) -> PlayerAggregates:
+    averages = [func.avg(getattr(MatchStatistic, stat)).label(label) for stat, label in AVERAGED_STATS.items()]
+    result = await session.execute(
+        select(
+            MatchStatistic.player_id,
+            func.count(MatchStatistic.id),
+            func.sum(MatchStatistic.minutes_played),
+            func.stddev(MatchStatistic.points),
+            func.stddev(MatchStatistic.plusminus),
+            *averages,
+        ).group_by(MatchStatistic.player_id)
+    )
+    rows = result.all()
+
+    league_result = await session.execute(
+        select(*[func.avg(getattr(MatchStatistic, stat)).label(label) for stat, (label, _) in LEAGUE_AVERAGES.items()])
+    )
+    league_row = league_result.one()
+    league = {label: float(getattr(league_row, label) or default) for label, default in LEAGUE_AVERAGES.values()}
+
+    players_result = await session.execute(select(Player.id, Player.birth_date, Player.position))
+    players = {pid: (birth_date, position) for pid, birth_date, position in players_result.all()}
+    return PlayerAggregates(rows, players, league)
+
+def compute_player_metrics(aggregates: PlayerAggregates, snapshot: GameLogSnapshot) -> Dict[str, Dict[int, dict]]:
+    """
+    Evalúa todas las métricas para toda la liga. Retorna
+    {métrica: {player_id: campos de la respuesta + league_percentile/league_rank/league_size}}.
+    Los jugadores sin minutos no reciben fila (el endpoint devuelve sus valores por defecto)
+    """
+    results: Dict[str, Dict[int, dict]] = {}
+    a = aggregates
+    today = date.today()
+    ages = [age_on(birth_date, today) if birth_date else np.nan for birth_date in a.birth_dates]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        box_metrics = {
+            "lebron": lebron_impact(a.box, a.league, a.games_played, a.total_minutes_raw, a.points_std_raw, a.pm_std_raw),
+            "pipm": pipm_impact(a.box, a.league, a.pm_std_raw),
+            "raptor": raptor_war(a.box, a.league, a.games_played, ages, a.positions),
+            "pace": pace_impact(a.box, a.league, a.points_std_raw, a.pm_std_raw),
+        }
+
+    # RAPTOR necesita además fecha de nacimiento (join con players)
+    has_minutes = (a.games_played > 0) & (a.box["avg_minutes"] > 0)
+    has_birth_date = np.array([birth_date is not None for birth_date in a.birth_dates], dtype=bool)
+    for metric, fields in box_metrics.items():
+        fields["games_played"] = a.games_played
+        index = np.flatnonzero(has_minutes & has_birth_date if metric == "raptor" else has_minutes)
+        results[metric] = {int(a.player_ids[i]): rounded(fields, FIELD_DIGITS, i) for i in index}
+
+    game_score, efficiency = game_scores(snapshot.stats)
+    minutes = snapshot.stats["minutes_played"]
+    results["fatigue"] = {}
+    for i, player_id in enumerate(snapshot.player_keys):
+        rows = slice(int(snapshot.player_offsets[i]), int(snapshot.player_offsets[i + 1]))
+        fields = fatigue_curve(minutes[rows], efficiency[rows], snapshot.days[rows])
+        results["fatigue"][int(player_id)] = rounded(fields, FIELD_DIGITS)
+
+    for metric, field in PLAYER_METRICS.items():
+        rows = results[metric]
+        if not rows:
+            continue
+        values = np.array([payload[field] for payload in rows.values()], dtype=np.float64)
+        percentiles, ranks = league_ranks(values)
+        for payload, percentile, rank in zip(rows.values(), percentiles, ranks):
+            payload["league_percentile"] = round(float(percentile), 1)
+            payload["league_rank"] = int(rank)
+            payload["league_size"] = len(rows)
+    return results
+
+class PlayerMetricsService:
+    """
+    Sirve las métricas precalculadas desde memoria. Cuando cambia la versión de
+    datos se recargan de player_advanced_metrics. Si allí también están
+    desfasadas se siguen sirviendo las filas anteriores mientras una tarea en
+    segundo plano las recalcula para toda la liga; la sesión de la petición
+    nunca bloquea, borra ni confirma nada
+    """
+
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval
+        self.rows: Dict[Tuple[int, str], dict] = {}
+        self.data_version: Optional[int] = None  # versión de las filas en memoria
+        self._loaded = False
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(self, session: AsyncSession, player_id: int, metric: str) -> Optional[dict]:
+        """Campos de la respuesta de la métrica para el jugador (None si no tiene minutos)"""
+        await self.ensure_fresh(session)
+        return self.rows.get((player_id, metric))
+
+    async def ensure_fresh(self, session: AsyncSession):
+        if self._loaded and time.time() - self._last_check < self.check_interval:
+            return
+
+        async with self._lock:
+            if self._loaded and time.time() - self._last_check < self.check_interval:
+                return
+            data_version = await data_version_service.get_version()
+            if not self._loaded or data_version != self.data_version:
+                stored_version = await self._stored_version(session)
+                if not self._loaded or stored_version != self.data_version:
+                    await self._load(session)
+                    self.data_version = stored_version
+                    self._loaded = True
+                if stored_version is None or (data_version is not None and stored_version != data_version):
+                    self._schedule_refresh(data_version)
+            self._last_check = time.time()
+
+    def _schedule_refresh(self, data_version: Optional[int]):
+        """Recálculo en segundo plano (uno por proceso); hasta que termina se sirven las filas anteriores"""
+        if self._refresh_task is None or self._refresh_task.done():
+            logger.info(f"🔄 Métricas avanzadas desfasadas, recalculando en segundo plano (versión {data_version})")
+            self._refresh_task = asyncio.create_task(self._refresh_in_background(data_version))
+
+    async def _refresh_in_background(self, data_version: Optional[int]):
+        try:
+            async with SessionLocal() as session:
+                await self.refresh(session, data_version)
+        except Exception as e:
+            logger.error(f"❌ Error recalculando las métricas avanzadas: {e}")
+
+    async def _stored_version(self, session: AsyncSession) -> Optional[int]:
+        result = await session.execute(select(func.max(PlayerAdvancedMetric.data_version)))
+        return result.scalar()
+
+    async def _load(self, session: AsyncSession):
+        result = await session.execute(
+            select(PlayerAdvancedMetric.player_id, PlayerAdvancedMetric.metric, PlayerAdvancedMetric.payload)
+        )
+        self.rows = {(player_id, metric): payload for player_id, metric, payload in result.all()}
+
+    async def refresh(self, session: AsyncSession, data_version: Optional[int]):
+        """Recalcula y guarda las métricas de toda la liga (CLI o segundo plano, nunca la sesión de una petición)"""
+        # Un único proceso recalcula a la vez; el resto espera y reutiliza el resultado
+        await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('player_advanced_metrics'))"))
+        stored_version = await self._stored_version(session)
+        if stored_version is not None and stored_version == data_version:
+            await self._load(session)
+            await session.commit()
+            self.data_version = data_version
+            return
+
+        start = time.time()
+        snapshot = await game_log_store.get_snapshot(session)
+        aggregates = await load_player_aggregates(session)
+        results = compute_player_metrics(aggregates, snapshot)
+        elapsed_ms = (time.time() - start) * 1000
+
+        computed_at = datetime.utcnow()
+        values = [
+            {
+                "player_id": player_id,
+                "metric": metric,
+                "value": payload[PLAYER_METRICS[metric]],
+                "league_percentile": payload["league_percentile"],
+                "league_rank": payload["league_rank"],
+                "payload": payload,
+                "data_version": data_version or 0,
+                "computed_at": computed_at,
+            }
+            for metric, rows in results.items()
+            for player_id, payload in rows.items()
+        ]
+        await session.execute(delete(PlayerAdvancedMetric))
+        if values:
+            await session.execute(insert(PlayerAdvancedMetric), values)
+        await session.commit()
+
+        self.rows = {(row["player_id"], row["metric"]): row["payload"] for row in values}
+        self.data_version = data_version
+        logger.info(
+            f"📈 Métricas avanzadas recalculadas: {len(aggregates)} jugadores, {len(values)} filas "
+            f"(cálculo {elapsed_ms:.0f}ms, total {(time.time() - start) * 1000:.0f}ms)"
+        )
+
+    async def warm_up(self):
+        """Carga las métricas guardadas al arrancar la API (si están desfasadas, el recálculo va en segundo plano)"""
+        try:
+            async with SessionLocal() as session:
+                await self.ensure_fresh(session)
+        except Exception as e:
+            logger.error(f"❌ Error cargando las métricas avanzadas: {e}")
+
+    def invalidate(self):
+        self._last_check = 0.0
+
+# Instancia global del servicio
+player_metrics_service = PlayerMetricsService()
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    async with SessionLocal() as session:
+        await player_metrics_service.refresh(session, await data_version_service.get_version())
+
+if __name__ == "__main__":
+    asyncio.run(main())
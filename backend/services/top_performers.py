@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import desc, select
+
+from models import Match, MatchStatistic, MatchTopPerformer, Player, StatRead, Team, TeamRead, TopPerformer
+from services.data_version import data_version_service
+from services.http_cache import make_etag
+from services.match_sides import resolve_match_sides
+
+logger = logging.getLogger(__name__)
+
+# Número de partidos finalizados que muestra la landing
+LATEST_MATCHES = 2
+
+BOX_SCORE_FIELDS = (
+    "points", "rebounds", "assists", "steals", "blocks", "minutes_played",
+    "field_goals_attempted", "field_goals_made", "three_points_made",
+    "three_points_attempted", "free_throws_made", "free_throws_attempted",
+    "fouls", "turnovers",
+)
+
+async def compute_match_top_performers(session: AsyncSession, match: Match) -> int:
+    """
+    Calcula y guarda el mejor jugador (pts+reb+ast) de cada lado del partido.
+    La ingesta ya los guarda con refresh_match_top_performers() (migración
+    007); esto solo cubre los partidos cargados por otras vías. Retorna el
+    número de filas guardadas
+    """
+    # Mismo desempate que la función SQL: la estadística de menor id
+    stats_result = await session.execute(
+        select(MatchStatistic).where(MatchStatistic.match_id == match.id).order_by(MatchStatistic.id)
+    )
+    stats = stats_result.scalars().all()
+    sides = await resolve_match_sides(session, match, {stat.player_id for stat in stats})
+
+    best = {}
+    for stat in stats:
+        team_id = sides.get(stat.player_id)
+        if team_id is None:
+            continue
+        side = "home" if team_id == match.home_team_id else "away"
+        total = (stat.points or 0) + (stat.rebounds or 0) + (stat.assists or 0)
+        if side not in best or total > best[side][0]:
+            best[side] = (total, team_id, stat)
+
+    for side, (_, team_id, stat) in best.items():
+        values = {field: getattr(stat, field) or 0 for field in BOX_SCORE_FIELDS}
+        stmt = insert(MatchTopPerformer).values(
+            match_id=match.id,
+            side=side,
+            team_id=team_id,
+            player_id=stat.player_id,
+            **values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["match_id", "side"],
+            set_={**values, "team_id": team_id, "player_id": stat.player_id, "computed_at": stmt.excluded.computed_at}
+        )
+        await session.execute(stmt)
+
+    await session.commit()
+    return len(best)
+
+class TopPerformersService:
+    """
+    Sirve /home/top-performers desde una respuesta ya serializada. Solo se
+    reconstruye cuando aparece un partido finalizado más reciente o cambia la
+    versión de datos.
+    """
+
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval
+        self.match_ids: Optional[Tuple[int, ...]] = None
+        self.data_version: Optional[int] = None
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_response(self, session: AsyncSession) -> Tuple[bytes, str]:
+        """Retorna (cuerpo JSON, ETag fuerte)"""
+        if self.body is not None and time.time() - self._last_check < self.check_interval:
+            return self.body, self.etag
+
+        async with self._lock:
+            if self.body is not None and time.time() - self._last_check < self.check_interval:
+                return self.body, self.etag
+
+            latest_result = await session.execute(
+                select(Match)
+                .where(Match.home_score.is_not(None))
+                .where(Match.away_score.is_not(None))
+                .order_by(desc(Match.date), desc(Match.id))
+                .limit(LATEST_MATCHES)
+            )
+            matches = latest_result.scalars().all()
+            match_ids = tuple(match.id for match in matches)
+
+            # La ingesta recalcula los top performers de los partidos que re-ingiere e incrementa la versión
+            data_version = await data_version_service.get_version()
+            if match_ids != self.match_ids or data_version != self.data_version or self.body is None:
+                performers = await self._load_performers(session, matches)
+                self.body = JSONResponse(content=jsonable_encoder(performers)).body
+                self.etag = make_etag(self.body)
+                self.match_ids = match_ids
+                self.data_version = data_version
+                logger.info(f"🏀 Top performers actualizados para los partidos {list(match_ids)}")
+
+            self._last_check = time.time()
+            return self.body, self.etag
+
+    async def _load_performers(self, session: AsyncSession, matches: List[Match]) -> List[TopPerformer]:
+        match_ids = [match.id for match in matches]
+
+        # Partidos sin top performers guardados (no cargados por la ingesta): se calculan una vez
+        stored_result = await session.execute(
+            select(MatchTopPerformer.match_id).where(MatchTopPerformer.match_id.in_(match_ids)).distinct()
+        )
+        stored_ids = set(stored_result.scalars().all())
+        for match in matches:
+            if match.id not in stored_ids:
+                await compute_match_top_performers(session, match)
+
+        result = await session.execute(
+            select(MatchTopPerformer, Player.name, Player.url_pic, Team.full_name)
+            .join(Player, Player.id == MatchTopPerformer.player_id)
+            .join(Team, Team.id == MatchTopPerformer.team_id)
+            .where(MatchTopPerformer.match_id.in_(match_ids))
+        )
+        rows_by_match = {}
+        for performer, player_name, player_url_pic, team_name in result.all():
+            rows_by_match.setdefault(performer.match_id, []).append((performer, player_name, player_url_pic, team_name))
+
+        performers: List[TopPerformer] = []
+        for match in matches:
+            for performer, player_name, player_url_pic, team_name in sorted(
+                rows_by_match.get(match.id, []), key=lambda row: row[0].side
+            ):
+                side = performer.side
+                performers.append(
+                    TopPerformer(
+                        id         = performer.player_id,
+                        name       = player_name,
+                        team       = TeamRead(full_name=team_name),
+                        url_pic    = player_url_pic,
+                        game_stats = StatRead(**{field: getattr(performer, field) for field in BOX_SCORE_FIELDS}),
+                        isWinner = (
+                            (side == 'home' and match.home_score > match.away_score)
+                            or
+                            (side == 'away' and match.away_score > match.home_score)
+                        ),
+                        points   = int(performer.points),
+                        rebounds = int(performer.rebounds),
+                        assists  = int(performer.assists),
+                    )
+                )
+        return performers
+
+    def invalidate(self):
+        """Fuerza a comprobar los últimos partidos en la siguiente petición"""
+        self._last_check = 0.0
+
+# Instancia global del servicio
+top_performers_service = TopPerformersService()
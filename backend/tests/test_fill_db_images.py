@@ -0,0 +1,158 @@
+"""
+update_player_images_with_dataset() contra un servidor HTTP local que hace de
+CDN de NBA.com (NBA_HEADSHOT_BASE_URL apunta a él) y una conexión falsa que
+recoge el UPDATE por lotes en lugar de escribir en PostgreSQL.
+"""
+import importlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+DATASET = """playerid,fname,lname
+2544,LeBron,James
+201939,Stephen,Curry
+1629029,Luka,Doncic
+203507,Giannis,Antetokounmpo
+"""
+
+# Jugadores sin foto en la base de datos: (id, nombre)
+PLAYERS = [
+    (1, "LeBron James"),
+    (2, "Stephen Curry"),
+    (3, "Luka Dončić"),
+    (4, "Jugador Desconocido"),
+    (5, "Giannis Antetokounmpo"),
+]
+
+class HeadshotServer(ThreadingHTTPServer):
+    """Responde a cada ruta con los códigos indicados, en orden; después siempre con el último"""
+
+    def __init__(self, responses):
+        super().__init__(("127.0.0.1", 0), HeadshotHandler)
+        self.responses = {path: list(codes) for path, codes in responses.items()}
+        self.requests = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/headshots"
+
+    def next_status(self, path: str) -> int:
+        with self.lock:
+            self.requests[path] += 1
+            codes = self.responses.get(path, [404])
+            return codes.pop(0) if len(codes) > 1 else codes[0]
+
+class HeadshotHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(self.server.next_status(self.path))
+        self.send_header("Content-Type", "image/png")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, rows):
+        self.cursor_instance = FakeCursor(rows)
+        self.commits = 0
+
+    def cursor(self):
+        return self.cursor_instance
+
+    def commit(self):
+        self.commits += 1
+
+@pytest.fixture
+def headshot_server():
+    server = HeadshotServer({
+        "/headshots/2544.png": [200],
+        "/headshots/201939.png": [503, 200],  # error transitorio: se reintenta
+        "/headshots/1629029.png": [404],      # sin foto: placeholder
+        "/headshots/203507.png": [503],       # caído: se agotan los reintentos
+    })
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def image_app(headshot_server, monkeypatch):
+    """fill_db/app.py importado con la CDN apuntando al servidor local"""
+    monkeypatch.setenv("NBA_HEADSHOT_BASE_URL", headshot_server.base_url)
+    import app
+
+    return importlib.reload(app)
+
+def test_update_player_images_against_stub_server(image_app, headshot_server, tmp_path, monkeypatch):
+    dataset = tmp_path / "players.csv"
+    dataset.write_text(DATASET, encoding="utf-8")
+    conn = FakeConnection(PLAYERS)
+    batches = []
+    monkeypatch.setattr(image_app, "get_conn", lambda: conn)
+    monkeypatch.setattr(
+        image_app, "execute_values",
+        lambda cur, sql, argslist, page_size: batches.append((cur, sql, list(argslist), page_size))
+    )
+
+    image_app.update_player_images_with_dataset(str(dataset), max_workers=4)
+
+    base_url = headshot_server.base_url
+    placeholder = f"{base_url}/logoman.png"
+    assert image_app.PLACEHOLDER_IMAGE_URL == placeholder
+
+    # Un único UPDATE ... FROM (VALUES ...) con todos los jugadores, en orden
+    assert len(batches) == 1
+    cur, sql, argslist, page_size = batches[0]
+    assert cur is conn.cursor_instance
+    assert "UPDATE players" in sql and "FROM (VALUES %s)" in sql
+    assert page_size == 1000
+    assert argslist == [
+        (1, f"{base_url}/2544.png"),
+        (2, f"{base_url}/201939.png"),
+        (3, placeholder),
+        (4, placeholder),
+        (5, placeholder),
+    ]
+    assert conn.commits == 1
+
+    # 503 se reintenta (total=3) y 404 no; el jugador sin coincidencia no genera petición
+    assert headshot_server.requests == {
+        "/headshots/2544.png": 1,
+        "/headshots/201939.png": 2,
+        "/headshots/1629029.png": 1,
+        "/headshots/203507.png": 4,
+    }
+
+def test_verify_nba_images_deduplicates_ids(image_app, headshot_server):
+    exists = image_app.verify_nba_images([2544, 1629029, 2544], max_workers=2)
+
+    assert exists == {2544: True, 1629029: False}
+    assert headshot_server.requests["/headshots/2544.png"] == 1
+
+def test_update_player_image_urls_skips_empty_batches(image_app, monkeypatch):
+    monkeypatch.setattr(image_app, "execute_values", lambda *args, **kwargs: pytest.fail("no debería escribir"))
+
+    assert image_app.update_player_image_urls(FakeCursor([]), []) == 0
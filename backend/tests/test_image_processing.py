@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from PIL import Image
+
+import image_processing
+from image_processing import PROFILE_IMAGE_SIZES, build_profile_image_variants, hash_image_file
+
+RED = (220, 20, 20)
+BLUE = (20, 20, 220)
+
+def encode(img: Image.Image, format: str, **params) -> io.BytesIO:
+    buffer = io.BytesIO()
+    img.save(buffer, format=format, **params)
+    buffer.seek(0)
+    return buffer
+
+def decode(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+def is_red(pixel) -> bool:
+    return pixel[0] > 150 and pixel[2] < 100
+
+def is_blue(pixel) -> bool:
+    return pixel[2] > 150 and pixel[0] < 100
+
+def test_generates_square_webp_variants_without_metadata():
+    exif = Image.Exif()
+    exif[0x010E] = "descripción"  # ImageDescription
+    source = encode(Image.new("RGB", (300, 200), RED), "JPEG", exif=exif)
+
+    content_hash, variants = build_profile_image_variants(source)
+
+    assert content_hash == hash_image_file(source)
+    assert sorted(variants) == sorted(PROFILE_IMAGE_SIZES)
+    for size, data in variants.items():
+        img = decode(data)
+        assert img.format == "WEBP"
+        assert img.size == (size, size)
+        assert img.mode == "RGB"
+        assert "exif" not in img.info
+
+def test_applies_exif_orientation():
+    # 40x20: mitad izquierda roja, derecha azul. Orientación 6 = girar 90° a la
+    # derecha al mostrarla, así que el rojo queda arriba y el azul abajo
+    img = Image.new("RGB", (40, 20), BLUE)
+    img.paste(RED, (0, 0, 20, 20))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    source = encode(img, "JPEG", exif=exif, quality=95)
+
+    _, variants = build_profile_image_variants(source)
+
+    variant = decode(variants[64]).convert("RGB")
+    assert is_red(variant.getpixel((32, 8)))
+    assert is_blue(variant.getpixel((32, 56)))
+
+def test_keeps_alpha_channel():
+    img = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+    img.paste((*RED, 255), (25, 25, 75, 75))
+
+    _, variants = build_profile_image_variants(encode(img, "PNG"))
+
+    for data in variants.values():
+        variant = decode(data)
+        assert variant.mode == "RGBA"
+        assert variant.getpixel((0, 0))[3] == 0
+        assert variant.getpixel((variant.width // 2, variant.height // 2))[3] == 255
+
+def test_keeps_palette_transparency():
+    img = Image.new("P", (50, 50), 0)
+    img.putpalette([0, 0, 0, *RED])
+    img.paste(1, (10, 10, 40, 40))
+
+    _, variants = build_profile_image_variants(encode(img, "GIF", transparency=0))
+
+    assert decode(variants[64]).mode == "RGBA"
+
+def test_rejects_decompression_bombs(monkeypatch):
+    # Pillow lanza DecompressionBombError por encima del doble del límite
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    monkeypatch.setattr(image_processing, "MAX_IMAGE_PIXELS", 1_000)
+    source = encode(Image.new("RGB", (100, 100), RED), "PNG")
+
+    with pytest.raises(ValueError, match="Imagen no válida"):
+        build_profile_image_variants(source)
+
+def test_rejects_files_that_are_not_images():
+    with pytest.raises(ValueError, match="Imagen no válida"):
+        build_profile_image_variants(io.BytesIO(b"esto no es una imagen"))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from metrics.common import clip, league_ranks, or_default, rounded
+
+def test_or_default_replaces_null_and_zero():
+    assert or_default([np.nan, 0, 3.5], 8.0).tolist() == [8.0, 8.0, 3.5]
+    assert float(or_default(np.nan, 5.0)) == 5.0
+    assert float(or_default(2.0, 5.0)) == 2.0
+
+def test_clip_matches_scalar_min_max():
+    values = [-3.0, 0.5, 12.0]
+    assert clip(np.array(values), 0, 10).tolist() == [max(0, min(10, value)) for value in values]
+    assert clip(12.0, 0, 10) == 10
+
+def test_league_ranks_share_ties():
+    percentiles, ranks = league_ranks([10.0, 30.0, 20.0, 30.0])
+
+    assert percentiles.tolist() == [12.5, 75.0, 37.5, 75.0]
+    assert ranks.tolist() == [4, 1, 3, 1]
+
+def test_league_ranks_of_a_single_value():
+    percentiles, ranks = league_ranks([7.0])
+
+    assert percentiles.tolist() == [50.0]
+    assert ranks.tolist() == [1]
+
+def test_rounded_takes_the_element_at_index():
+    fields = {"score": np.array([1.23456, 2.34567]), "games": np.array([3.0, 4.0])}
+
+    assert rounded(fields, {"score": 2}, 1) == {"score": 2.35, "games": 4}
+    assert rounded({"score": 1.23456, "games": 3.0}, {"score": 1}) == {"score": 1.2, "games": 3}
+
+def test_rounded_returns_python_types():
+    result = rounded({"score": np.float64(1.5), "games": np.int64(2)}, {"score": 1})
+
+    assert type(result["score"]) is float
+    assert type(result["games"]) is int
+    assert result == pytest.approx({"score": 1.5, "games": 2})
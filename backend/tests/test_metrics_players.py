@@ -0,0 +1,151 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from metrics.common import rounded
+from metrics.players import (
+    FIELD_DIGITS, age_on, box_averages, fatigue_curve, game_scores, lebron_impact, pace_impact, pipm_impact, raptor_war
+)
+
+# Valores por defecto de services/player_metrics.LEAGUE_AVERAGES
+LEAGUE = {
+    "league_ppg": 22.0, "league_rpg": 10.2, "league_apg": 5.5, "league_spg": 1.3, "league_bpg": 1.0,
+    "league_tpg": 3.2, "league_pm": 0.0, "league_mpg": 28.0, "league_fgm": 8.5, "league_fga": 18.0,
+}
+
+# Medias avg_* de SQL de tres jugadores: estrella, pívot sin rebotes separados y suplente
+RAW = {
+    "avg_points": [27.5, 12.0, 6.5], "avg_rebounds": [7.5, 11.0, 3.0], "avg_assists": [8.0, 2.5, 1.5],
+    "avg_steals": [1.4, 0.8, 0.6], "avg_blocks": [0.6, 1.9, 0.2], "avg_turnovers": [3.6, 1.8, 0.9],
+    "avg_minutes": [36.0, 29.0, 14.0], "avg_fgm": [10.0, 5.0, 2.5], "avg_fga": [20.0, 9.0, 6.0],
+    "avg_3pm": [2.5, 0.1, 1.0], "avg_3pa": [7.0, 0.4, 3.0], "avg_ftm": [5.0, 1.9, 0.5],
+    "avg_fta": [6.0, 3.0, 0.7], "avg_plusminus": [5.5, -1.0, -4.0], "avg_oreb": [1.0, np.nan, 0.0],
+    "avg_dreb": [6.5, np.nan, 0.0],
+}
+GAMES_PLAYED = [70, 55, 12]
+TOTAL_MINUTES = [2520.0, 1595.0, 168.0]
+POINTS_STD = [7.2, 4.1, np.nan]  # NULL: un solo partido
+PM_STD = [9.5, np.nan, 6.0]
+AGES = [29, 23, 34]
+POSITIONS = ["SF", "C", None]
+
+BOX = box_averages(RAW)
+
+def evaluate(metric: str, index=None) -> dict:
+    """Campos sin redondear de la métrica para toda la liga o, con index, para un jugador con escalares"""
+    def pick(values):
+        return values if index is None else values[index]
+
+    box = BOX if index is None else {name: float(values[index]) for name, values in BOX.items()}
+    if metric == "lebron":
+        return lebron_impact(box, LEAGUE, pick(GAMES_PLAYED), pick(TOTAL_MINUTES), pick(POINTS_STD), pick(PM_STD))
+    if metric == "pipm":
+        return pipm_impact(box, LEAGUE, pick(PM_STD))
+    if metric == "raptor":
+        return raptor_war(box, LEAGUE, pick(GAMES_PLAYED), pick(AGES), pick(POSITIONS))
+    return pace_impact(box, LEAGUE, pick(POINTS_STD), pick(PM_STD))
+
+def season_log(games: int = 40):
+    """Registro determinista: minutos, eficiencia que cae con la carga y descansos de 1 a 4 días"""
+    index = np.arange(games)
+    minutes = 12.0 + (index * 7 % 33)
+    efficiency = 0.55 - (minutes - 30) * 0.004 + ((index * 5 % 11) - 5) * 0.01
+    days = np.cumsum(np.tile([1, 2, 3, 1, 4], games // 5))
+    return minutes, efficiency, days
+
+def test_box_averages_split_missing_rebounds():
+    assert BOX["avg_oreb"].tolist() == [1.0, 2.75, 0.75]
+    assert BOX["avg_dreb"].tolist() == [6.5, 8.25, 2.25]
+
+def test_age_on_counts_birthdays():
+    assert age_on(date(1997, 7, 1), date(2026, 6, 30)) == 28
+    assert age_on(date(1997, 6, 30), date(2026, 6, 30)) == 29
+
+@pytest.mark.parametrize("metric, expected", [
+    ("lebron", {
+        "lebron_score": 4.03, "box_component": 1.33, "plus_minus_component": 5.87, "luck_adjustment": 0.7,
+        "context_adjustment": 1.1, "usage_adjustment": 0.946, "percentile_rank": 94.7, "minutes_per_game": 36.0,
+    }),
+    ("pipm", {
+        "total_pipm": 4.39, "offensive_pimp": 2.88, "defensive_pimp": 1.5, "box_prior_weight": 0.289,
+        "plus_minus_weight": 0.711, "stability_factor": 0.883, "minutes_confidence": 0.711, "usage_rate": 50.0,
+    }),
+    ("raptor", {
+        "total_war": 1.77, "offensive_war": 1.46, "defensive_war": 0.31, "market_value_millions": 38.0,
+        "positional_versatility": 0.868, "age_adjustment": 0.88, "injury_risk_factor": 1.263,
+        "win_shares_comparison": 1.95,
+    }),
+    ("pace", {
+        "pace_impact_rating": -2.87, "possessions_per_48": 85.0, "efficiency_on_court": 114.7,
+        "tempo_control_factor": 0.3, "transition_efficiency": 1.04, "usage_pace_balance": 0.4,
+        "fourth_quarter_pace": 80.0, "pace_consistency": 0.37, "minutes_per_game": 36.0,
+    }),
+])
+def test_box_metrics_pinned_outputs(metric, expected):
+    assert rounded(evaluate(metric), FIELD_DIGITS, 0) == expected
+
+@pytest.mark.parametrize("metric", ["lebron", "pipm", "raptor", "pace"])
+def test_box_metrics_scalar_and_vector_agree(metric):
+    league = evaluate(metric)
+
+    for index in range(len(GAMES_PLAYED)):
+        single = evaluate(metric, index)
+        assert single.keys() == league.keys()
+        for name, values in league.items():
+            assert float(single[name]) == pytest.approx(float(values[index]), abs=1e-12), name
+
+def test_lebron_without_history_uses_neutral_factors():
+    box = {name: float(values[0]) for name, values in BOX.items()}
+    fields = lebron_impact(box, LEAGUE, 0, 0.0, np.nan, np.nan)
+
+    # Sin minutos acumulados el +/- no cuenta y sin STDDEV (NULL) se usan 5.0 y 8.0
+    assert float(fields["plus_minus_component"]) == 0.0
+    assert float(fields["luck_adjustment"]) == 0.7
+    assert float(fields["context_adjustment"]) == pytest.approx(1.1 * 0.9)
+    assert float(fields["lebron_score"]) == pytest.approx(
+        float(fields["box_component"] * 0.7 * 1.1 * 0.9 * fields["usage_adjustment"])
+    )
+
+def test_raptor_unknown_position_uses_default_replacement_level():
+    known = raptor_war(BOX, LEAGUE, GAMES_PLAYED, AGES, ["SF", "C", "PF"])
+    unknown = evaluate("raptor")
+
+    assert unknown["total_war"][:2].tolist() == known["total_war"][:2].tolist()
+    assert unknown["total_war"][2] != known["total_war"][2]
+
+def test_game_scores_without_minutes_have_zero_efficiency():
+    stats = {
+        name: np.array([20.0, 0.0])
+        for name in ("points", "field_goals_made", "field_goals_attempted", "rebounds", "assists",
+                     "steals", "blocks", "turnovers")
+    }
+    stats["minutes_played"] = np.array([30.0, 0.0])
+
+    game_score, efficiency = game_scores(stats)
+
+    assert game_score.tolist() == pytest.approx([20 + 8 - 14 + 14 + 14 + 20 + 14 - 8, 0.0])
+    assert efficiency.tolist() == pytest.approx([68 / 30, 0.0])
+
+def test_fatigue_curve_pinned_outputs():
+    assert rounded(fatigue_curve(*season_log()), FIELD_DIGITS) == {
+        "fatigue_resistance": 64.9, "peak_performance_minutes": 18.0, "endurance_rating": 38.4,
+        "back_to_back_efficiency": 1.02, "fourth_quarter_dropoff": 0.101, "rest_day_boost": 1.0,
+        "load_threshold": 30.0, "recovery_factor": 1.09, "games_played": 40, "average_minutes": 27.2,
+    }
+
+def test_fatigue_curve_short_history_uses_defaults():
+    fields = fatigue_curve(np.array([30.0, 34.0]), np.array([0.5, 0.6]), np.array([0, 1]))
+
+    assert rounded(fields, FIELD_DIGITS) == {
+        "fatigue_resistance": 61.5, "peak_performance_minutes": 32.0, "endurance_rating": 50.0,
+        "back_to_back_efficiency": 0.95, "fourth_quarter_dropoff": 0.05, "rest_day_boost": 1.05,
+        "load_threshold": 36.0, "recovery_factor": 0.95, "games_played": 2, "average_minutes": 32.0,
+    }
+
+def test_fatigue_curve_single_game():
+    fields = fatigue_curve(np.array([25.0]), np.array([0.4]), np.array([10]))
+
+    assert fields["games_played"] == 1
+    assert fields["average_minutes"] == 25.0
+    assert fields["endurance_rating"] == 50.0
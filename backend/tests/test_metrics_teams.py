@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+from metrics.common import rounded
+from metrics.teams import (
+    FIELD_DIGITS, clutch_dna_profile, efficiency_ratings, momentum_resilience, predictive_performance,
+    tactical_adaptability
+)
+
+# Marcadores de 12 partidos ordenados por fecha
+TEAM_SCORES = [112, 98, 105, 120, 101, 99, 115, 108, 96, 110, 104, 118]
+OPPONENT_SCORES = [108, 103, 104, 111, 106, 101, 113, 112, 99, 107, 106, 109]
+IS_HOME = [True, False, True, True, False, True, False, True, False, True, False, True]
+
+# Totales del equipo en los partidos con box score
+BOX = {
+    "field_goals_attempted": [88, 92, 85, 90, 87], "turnovers": [13, 15, 12, 11, 16],
+    "rebounds": [44, 40, 47, 43, 39], "three_points_attempted": [35, 30, 38, 33, 28],
+    "points": [112, 98, 105, 120, 101],
+}
+
+STAR_POINTS = [24.0, 18.5, 15.0, 11.0, 8.0]
+COLLECTIVE = {
+    "points": [24.0, 18.5, 15.0], "assists": [7.0, 3.0, 4.5],
+    "turnovers": [3.0, 2.0, 1.5], "minutes": [35.0, 32.0, 29.0],
+}
+
+# Liga de tres equipos: 10 y 20 se enfrentan dos veces, 30 no tiene box scores
+LEAGUE_TEAM_IDS = [10, 20, 30]
+LEAGUE_GAMES = {
+    "team_id": [10, 20, 10, 20], "points": [110, 104, 98, 101], "fga": [88, 90, 85, 84],
+    "fgm": [42, 39, 37, 38], "tpm": [12, 10, 9, 11], "fta": [20, 18, 22, 17],
+    "tov": [13, 14, 15, 12], "reb": [45, 42, 41, 44],
+}
+LEAGUE_OPPONENT = {
+    "points": [104, 110, 101, 98], "fga": [90, 88, 84, 85], "fta": [18, 20, 17, 22],
+    "tov": [14, 13, 12, 15], "reb": [42, 45, 44, 41],
+}
+LEAGUE_MARGINS = [6, -6, -3, 3]
+# El último partido es contra un equipo fuera de la liga (99)
+SCHEDULE = ([10, 20, 10, 20, 10], [20, 10, 20, 10, 99])
+
+def clutch(star_points=STAR_POINTS, collective=None, **overrides) -> dict:
+    args = dict(
+        team_scores=TEAM_SCORES, opponent_scores=OPPONENT_SCORES, pressure_fgm=400, pressure_fga=880,
+        pressure_turnovers=130, pressure_assists=260, star_points=star_points, collective=collective,
+    )
+    args.update(overrides)
+    return clutch_dna_profile(**args)
+
+def ratings(team_ids=LEAGUE_TEAM_IDS) -> dict:
+    return efficiency_ratings(team_ids, LEAGUE_GAMES, LEAGUE_OPPONENT, LEAGUE_MARGINS, *SCHEDULE)
+
+def test_efficiency_ratings_pinned_outputs():
+    result = ratings()
+
+    assert rounded(result, FIELD_DIGITS, 0) == {
+        "offensive_efficiency": 94.8, "defensive_efficiency": 95.3, "pace_factor": 1.09,
+        "strength_of_schedule": 50.0, "clutch_factor": 0.0, "consistency_index": 0.61, "taer_score": 25.7,
+    }
+    assert rounded(result, FIELD_DIGITS, 1) == {
+        "offensive_efficiency": 95.3, "defensive_efficiency": 94.8, "pace_factor": 1.09,
+        "strength_of_schedule": 50.0, "clutch_factor": 1.0, "consistency_index": 0.61, "taer_score": 74.0,
+    }
+
+def test_efficiency_ratings_team_without_games_is_neutral():
+    assert rounded(ratings(), FIELD_DIGITS, 2) == {
+        "offensive_efficiency": 100.0, "defensive_efficiency": 100.0, "pace_factor": 1.0,
+        "strength_of_schedule": 50.0, "clutch_factor": 0.5, "consistency_index": 0.5, "taer_score": 50.0,
+    }
+
+def test_efficiency_ratings_do_not_depend_on_team_order():
+    expected = ratings()
+    shuffled_ids = [30, 10, 20]
+    shuffled = ratings(shuffled_ids)
+
+    for name, values in expected.items():
+        for index, team_id in enumerate(LEAGUE_TEAM_IDS):
+            assert shuffled[name][shuffled_ids.index(team_id)] == pytest.approx(values[index]), name
+
+def test_momentum_resilience_pinned_outputs():
+    assert rounded(momentum_resilience(TEAM_SCORES, OPPONENT_SCORES, IS_HOME, 2.4), FIELD_DIGITS) == {
+        "lead_protection_rate": 100.0, "comeback_frequency": 0.0, "streak_resilience": 90.0,
+        "pressure_performance": 50.0, "fourth_quarter_factor": 2.4, "psychological_edge": 16.4,
+        "tmpri_score": 65.9, "close_game_record": 40.0,
+    }
+
+def test_momentum_resilience_single_game():
+    fields = momentum_resilience([100], [90], [False], 0.0)
+
+    # Sin partidos en casa ni rachas de derrotas: valores neutros
+    assert fields["psychological_edge"] == pytest.approx(-5.0)
+    assert fields["streak_resilience"] == 75.0
+    assert fields["lead_protection_rate"] == 50.0
+    assert fields["comeback_frequency"] == 10.0
+
+def test_tactical_adaptability_pinned_outputs():
+    assert rounded(tactical_adaptability(TEAM_SCORES, OPPONENT_SCORES, BOX), FIELD_DIGITS) == {
+        "pace_adaptability": 6.4, "size_adjustment": 10.1, "style_counter_effect": 50.0,
+        "strategic_variety_index": 37.7, "anti_meta_performance": 78.0, "coaching_intelligence": 68.1,
+        "ttaq_score": 37.5, "opponent_fg_influence": 5.0,
+    }
+
+def test_tactical_adaptability_without_box_scores():
+    fields = tactical_adaptability(TEAM_SCORES, OPPONENT_SCORES, {name: [] for name in BOX})
+
+    assert fields["pace_adaptability"] == 50.0
+    assert fields["size_adjustment"] == 50.0
+    assert fields["strategic_variety_index"] == 50.0
+    assert fields["anti_meta_performance"] == pytest.approx(100 / 110 * 80)
+
+def test_clutch_dna_pinned_outputs():
+    assert rounded(clutch(collective=COLLECTIVE), FIELD_DIGITS) == {
+        "multi_scenario_clutch": 60.0, "pressure_shooting": 0.5, "decision_making_pressure": 2.0,
+        "star_player_factor": 60.0, "collective_clutch_iq": 65.8, "pressure_defense": 90.0,
+        "clutch_dna_score": 66.0, "overtime_performance": 50.0,
+    }
+
+def test_clutch_dna_accepts_arrays_and_lists_alike():
+    as_arrays = clutch(
+        np.array(STAR_POINTS), {name: np.array(values) for name, values in COLLECTIVE.items()},
+        team_scores=np.array(TEAM_SCORES), opponent_scores=np.array(OPPONENT_SCORES),
+    )
+
+    assert as_arrays == clutch(collective=COLLECTIVE)
+
+@pytest.mark.parametrize("collective", [
+    None,
+    {},  # ningún jugador clave con 10+ minutos en la ventana
+    {"points": [20.0], "assists": [5.0], "turnovers": [2.0], "minutes": [30.0]},
+])
+def test_clutch_dna_without_collective_uses_neutral_iq(collective):
+    assert clutch(collective=collective)["collective_clutch_iq"] == 40.0
+
+@pytest.mark.parametrize("star_points, star_player_factor", [([], 30.0), ([21.0], 20.0)])
+def test_clutch_dna_with_fewer_than_two_star_players(star_points, star_player_factor):
+    fields = clutch(star_points, COLLECTIVE)
+
+    assert fields["star_player_factor"] == star_player_factor
+    assert fields["collective_clutch_iq"] == 35.0
+
+def test_clutch_dna_without_pressure_stats():
+    fields = clutch(pressure_fgm=None, pressure_fga=None, pressure_turnovers=None, pressure_assists=None)
+
+    assert fields["pressure_shooting"] == pytest.approx(-45.0)
+    assert fields["decision_making_pressure"] == 1.0
+
+def test_predictive_performance_pinned_outputs():
+    # Del partido más reciente al más antiguo
+    fields = predictive_performance(
+        TEAM_SCORES[::-1], OPPONENT_SCORES[::-1], [34.5, 33.0, 28.0, 22.0, 15.0, 9.0], [12, 11, 12, 10, 8, 3]
+    )
+
+    assert rounded(fields, FIELD_DIGITS) == {
+        "regression_to_mean": 0.0, "fatigue_accumulation": 68.7, "injury_risk_projection": 10.9,
+        "momentum_decay_rate": 10.0, "matchup_advantage_forecast": 50.6, "peak_performance_window": 20,
+        "tppa_projected_winrate": 45.3, "schedule_difficulty_next": 55.0,
+    }
+
+def test_predictive_performance_short_history():
+    fields = predictive_performance([110, 95], [100, 99], [20.0], [2])
+
+    # Menos de 5 partidos y ningún jugador con 10+ partidos
+    assert fields["momentum_decay_rate"] == 10.0
+    assert fields["fatigue_accumulation"] == pytest.approx(64.0)
+    assert fields["injury_risk_projection"] == pytest.approx(25.0)
+    assert fields["regression_to_mean"] == 0.0
@@ -0,0 +1,113 @@
+import asyncio
+import io
+
+import boto3
+import pytest
+from moto import mock_aws
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+import spaces_config
+from image_processing import PROFILE_IMAGE_SIZES
+from spaces_config import PUBLIC_URL, delete_profile_image, get_profile_image_variants, upload_profile_image
+
+USER_ID = 7
+# Independiente de SPACES_BUCKET del entorno (S3 exige nombres de 3 a 63 caracteres)
+SPACES_BUCKET = "hoopmetrics-test"
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Bucket de R2 simulado con moto (mismo cliente boto3 que en producción, sin red)"""
+    with mock_aws():
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        client.create_bucket(Bucket=SPACES_BUCKET)
+        monkeypatch.setattr(spaces_config, "SPACES_BUCKET", SPACES_BUCKET)
+        monkeypatch.setattr(spaces_config, "get_spaces_client", lambda: client)
+        yield client
+
+def keys(client) -> list:
+    response = client.list_objects_v2(Bucket=SPACES_BUCKET)
+    return sorted(item["Key"] for item in response.get("Contents", []))
+
+def png_upload(content_type: str = "image/png") -> UploadFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), (200, 30, 30)).save(buffer, format="PNG")
+    buffer.seek(0)
+    return UploadFile(
+        file=buffer, size=len(buffer.getvalue()), filename="avatar.png",
+        headers=Headers({"content-type": content_type})
+    )
+
+def test_upload_puts_every_variant(s3):
+    url = asyncio.run(upload_profile_image(USER_ID, png_upload()))
+
+    assert url.startswith(f"{PUBLIC_URL}/profile-images/{USER_ID}/")
+    assert url.endswith(f"/{max(PROFILE_IMAGE_SIZES)}.webp")
+    variant_urls = get_profile_image_variants(url)
+    expected_keys = sorted(variant.replace(f"{PUBLIC_URL}/", "") for variant in variant_urls.values())
+    assert keys(s3) == expected_keys
+    assert len(expected_keys) == len(PROFILE_IMAGE_SIZES)
+
+    for key in expected_keys:
+        head = s3.head_object(Bucket=SPACES_BUCKET, Key=key)
+        assert head["ContentType"] == "image/webp"
+        assert head["CacheControl"] == "max-age=31536000, immutable"
+        size = int(key.rsplit("/", 1)[1].split(".")[0])
+        body = s3.get_object(Bucket=SPACES_BUCKET, Key=key)["Body"].read()
+        assert Image.open(io.BytesIO(body)).size == (size, size)
+
+def test_upload_keys_are_deterministic_per_content(s3):
+    first = asyncio.run(upload_profile_image(USER_ID, png_upload()))
+    second = asyncio.run(upload_profile_image(USER_ID, png_upload()))
+
+    assert first == second
+    assert len(keys(s3)) == len(PROFILE_IMAGE_SIZES)
+
+def test_upload_rejects_disallowed_type(s3):
+    with pytest.raises(ValueError, match="Tipo de archivo no permitido"):
+        asyncio.run(upload_profile_image(USER_ID, png_upload("application/pdf")))
+    assert keys(s3) == []
+
+def test_upload_rejects_large_files(s3, monkeypatch):
+    monkeypatch.setattr(spaces_config, "MAX_IMAGE_SIZE", 100)
+
+    with pytest.raises(ValueError, match="demasiado grande"):
+        asyncio.run(upload_profile_image(USER_ID, png_upload()))
+    assert keys(s3) == []
+
+def test_delete_removes_all_variants_in_one_call(s3, monkeypatch):
+    other_url = asyncio.run(upload_profile_image(USER_ID + 1, png_upload()))
+    url = asyncio.run(upload_profile_image(USER_ID, png_upload()))
+
+    calls = []
+    delete_objects = s3.delete_objects
+    monkeypatch.setattr(s3, "delete_objects", lambda **kwargs: calls.append(kwargs) or delete_objects(**kwargs))
+
+    assert asyncio.run(delete_profile_image(url)) is True
+    assert len(calls) == 1
+    assert len(calls[0]["Delete"]["Objects"]) == len(PROFILE_IMAGE_SIZES)
+    # Solo se borran las variantes de esa imagen
+    assert keys(s3) == sorted(
+        variant.replace(f"{PUBLIC_URL}/", "") for variant in get_profile_image_variants(other_url).values()
+    )
+
+def test_delete_legacy_image_without_variants(s3):
+    legacy_key = f"profile-images/{USER_ID}/avatar.jpg"
+    s3.put_object(Bucket=SPACES_BUCKET, Key=legacy_key, Body=b"jpeg")
+    s3.put_object(Bucket=SPACES_BUCKET, Key=f"profile-images/{USER_ID}/otra.jpg", Body=b"jpeg")
+
+    assert asyncio.run(delete_profile_image(f"{PUBLIC_URL}/{legacy_key}")) is True
+    assert keys(s3) == [f"profile-images/{USER_ID}/otra.jpg"]
+
+def test_delete_ignores_foreign_urls(s3, monkeypatch):
+    monkeypatch.setattr(s3, "delete_objects", lambda **kwargs: pytest.fail("no debería llamar a R2"))
+
+    assert asyncio.run(delete_profile_image("https://otro-cdn.example.com/avatar.jpg")) is False
+
+def test_variants_of_legacy_urls_point_to_the_original():
+    legacy_url = f"{PUBLIC_URL}/profile-images/{USER_ID}/avatar.jpg"
+
+    assert get_profile_image_variants(legacy_url) == {str(size): legacy_url for size in PROFILE_IMAGE_SIZES}
+    assert get_profile_image_variants(None) is None
@@ -60,6 +60,7 @@ export interface AdminDashboardData {
     user_metrics: UserMetrics;
     subscription_metrics: SubscriptionMetrics;
     api_metrics: APIMetrics;
+    stale_sections: string[];
     last_updated: string;
 }
 